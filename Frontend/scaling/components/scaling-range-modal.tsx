@@ -1,12 +1,13 @@
 "use client"
 
-import { useState, useEffect, useCallback } from "react"
+import { useState, useEffect, useCallback, useRef } from "react"
 import { X, Minus, Square, Move3D } from "lucide-react"
 import { Input } from "@/components/ui/input"
 import { Label } from "@/components/ui/label"
 import { RadioGroup, RadioGroupItem } from "@/components/ui/radio-group"
 import { Checkbox } from "@/components/ui/checkbox"
 import { cn } from "@/lib/utils"
+import { LiveScalingClient, type ScalingRequest, type ScalingResponse } from "@/lib/scaling-socket"
 
 interface ScalingRangeModalProps {
   isOpen?: boolean
@@ -27,6 +28,31 @@ interface ScalingRangeData {
 }
 
 interface HistoryEntry {
+  id: number;
+  timestamp: string;
+  range_key: string;
+  x1: string;
+  x2: string;
+  y1: string;
+  y2: string;
+  z1: string;
+  z2: string;
+  scale_from: "x" | "y" | "z";
+  input_value: string;
+  output_x: string;
+  output_y: string;
+  output_z: string;
+  z_in_hex: boolean;
+}
+
+interface HistoryPage {
+  entries: HistoryEntry[];
+  total: number;
+  next_cursor: number | null;
+}
+
+// Entries saved by older versions in localStorage, newest first
+interface LegacyHistoryEntry {
   timestamp: string;
   x1: string;
   x2: string;
@@ -43,28 +69,10 @@ interface HistoryEntry {
   zInHex: boolean;
 }
 
-const HISTORY_KEY = 'scaling_history';
-const MAX_HISTORY_ENTRIES = 100;
-
-interface ScalingRequest {
-  x_input: string
-  y_input: string
-  z_input: string
-  x1: string
-  x2: string
-  y1: string
-  y2: string
-  z1: string
-  z2: string
-  scale_from: string
-  z_in_hex: boolean
-}
-
-interface ScalingResponse {
-  x: string
-  y: string
-  z: string
-}
+const LEGACY_HISTORY_KEY = 'scaling_history';
+const HISTORY_URL = "http://127.0.0.1:8001/history";
+const HISTORY_PAGE_SIZE = 50;
+const MAX_HTTP_CACHE_ENTRIES = 100;
 
 export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingRangeModalProps) {
   const [rangeValues, setRangeValues] = useState({
@@ -81,8 +89,16 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
   const [zInHex, setZInHex] = useState(false)
   const [isLoading, setIsLoading] = useState(false)
   const [history, setHistory] = useState<HistoryEntry[]>([])
+  const [historyTotal, setHistoryTotal] = useState(0)
+  const [historyCursor, setHistoryCursor] = useState<number | null>(null)
+  const [historyLoading, setHistoryLoading] = useState(false)
   const [activeTab, setActiveTab] = useState<"calculator" | "history">("calculator")
   const [debounceTimer, setDebounceTimer] = useState<NodeJS.Timeout | null>(null)
+  const liveClient = useRef<LiveScalingClient | null>(null)
+  // Calculations still waiting for a response; live requests may overlap
+  const inFlight = useRef(0)
+  // Last response and ETag per request body, for If-None-Match revalidation
+  const httpCache = useRef(new Map<string, { etag: string; result: ScalingResponse }>())
 
   const triggerChange = (
     updates: Partial<{
@@ -113,7 +129,10 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
   }
 
    const performScalingCalculation = useCallback(async (currentAxisValues: { x: string; y: string; z: string }) => {
-    if (isLoading) return
+    // Over the live channel every keystroke is sent and the client's sequence
+    // numbers drop stale responses; the HTTP fallback sends one at a time
+    const useLive = liveClient.current?.isOpen ?? false
+    if (inFlight.current > 0 && !useLive) return
     
     // Check if there's a valid input value for the selected axis
     const inputValue = currentAxisValues[selectedAxis];
@@ -126,6 +145,7 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
       return;
     }
 
+    inFlight.current += 1
     setIsLoading(true)
     
     try {
@@ -145,16 +165,49 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
         z_in_hex: zInHex
       }
 
+      // Prefer the live channel, which only sends the fields that changed
+      if (useLive && liveClient.current) {
+        try {
+          const result = await liveClient.current.scale(request)
+          // A newer request superseded this one; its response will update the view
+          if (result === null) return
+
+          setAxisValues(result)
+          triggerChange({ axisValues: result })
+          logToHistory(inputValue, result);
+          return
+        } catch (error) {
+          console.error("Live scaling failed, falling back to HTTP:", error)
+        }
+      }
+
+      const body = JSON.stringify(request)
+      const cached = httpCache.current.get(body)
       const response = await fetch("http://127.0.0.1:8001/scale", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          ...(cached ? { "If-None-Match": cached.etag } : {}),
         },
-        body: JSON.stringify(request),
+        body,
       })
 
-      if (response.ok) {
-        const result: ScalingResponse = await response.json()
+      if (response.ok || (response.status === 304 && cached)) {
+        let result: ScalingResponse
+        if (response.status === 304 && cached) {
+          result = cached.result
+        } else {
+          result = await response.json()
+          const etag = response.headers.get("ETag")
+          if (etag) {
+            httpCache.current.delete(body)
+            httpCache.current.set(body, { etag, result })
+            if (httpCache.current.size > MAX_HTTP_CACHE_ENTRIES) {
+              // Maps iterate in insertion order, so the first key is the oldest
+              httpCache.current.delete(httpCache.current.keys().next().value!)
+            }
+          }
+        }
         setAxisValues(result)
         triggerChange({ axisValues: result })
         
@@ -172,57 +225,117 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
       console.error("Error calling scaling API:", error)
       setAxisValues({ x: "", y: "", z: "" });
     } finally {
-      setIsLoading(false)
+      inFlight.current -= 1
+      setIsLoading(inFlight.current > 0)
     }
-  }, [rangeValues, selectedAxis, zInHex, isLoading, triggerChange])
+  }, [rangeValues, selectedAxis, zInHex, triggerChange])
 
   const logToHistory = (inputValue: string, outputs: ScalingResponse) => {
-    const newEntry: HistoryEntry = {
-      timestamp: new Date().toISOString(),
-      x1: rangeValues.x1 || "-",
-      x2: rangeValues.x2 || "-",
-      y1: rangeValues.y1 || "-",
-      y2: rangeValues.y2 || "-",
-      z1: rangeValues.z1 || "-",
-      z2: rangeValues.z2 || "-",
-      inputAxis: selectedAxis,
-      inputValue: inputValue,
-      outputX: outputs.x,
-      outputY: outputs.y,
-      outputZ: outputs.z,
-      selectedAxis: selectedAxis,
-      zInHex: zInHex
-    };
-
-    const updatedHistory = [newEntry, ...history];
-    
-    // Keep only the last 100 entries
-    if (updatedHistory.length > MAX_HISTORY_ENTRIES) {
-      updatedHistory.splice(MAX_HISTORY_ENTRIES);
+    // The backend stores the entry; the history tab reloads it from there
+    fetch(HISTORY_URL, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        ...rangeValues,
+        scale_from: selectedAxis,
+        input_value: inputValue,
+        output_x: outputs.x,
+        output_y: outputs.y,
+        output_z: outputs.z,
+        z_in_hex: zInHex,
+      }),
+    })
+      .then((response) => {
+        if (response.ok) setHistoryTotal((total) => total + 1)
+      })
+      .catch((error) => console.error("Error saving history entry:", error))
+  }
+
+  // Move history saved in localStorage by older versions to the backend, oldest
+  // first so it keeps its order. The key is rewritten after every entry so an
+  // interrupted import resumes where it stopped, and removed once done.
+  const migrateLegacyHistory = async () => {
+    let pending: LegacyHistoryEntry[]
+    try {
+      const stored = localStorage.getItem(LEGACY_HISTORY_KEY)
+      if (!stored) return
+      pending = JSON.parse(stored)
+      if (!Array.isArray(pending)) throw new Error("not a list")
+    } catch (error) {
+      console.error("Discarding unreadable local history:", error)
+      localStorage.removeItem(LEGACY_HISTORY_KEY)
+      return
     }
 
-    setHistory(updatedHistory);
-    
-    // Save to localStorage
-    localStorage.setItem(HISTORY_KEY, JSON.stringify(updatedHistory));
+    const blank = (value: string) => (value === "-" ? "" : value ?? "")
+    while (pending.length > 0) {
+      const entry = pending[pending.length - 1]
+      try {
+        const response = await fetch(HISTORY_URL, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({
+            x1: blank(entry.x1),
+            x2: blank(entry.x2),
+            y1: blank(entry.y1),
+            y2: blank(entry.y2),
+            z1: blank(entry.z1),
+            z2: blank(entry.z2),
+            scale_from: entry.inputAxis ?? entry.selectedAxis,
+            input_value: entry.inputValue ?? "",
+            output_x: entry.outputX ?? "",
+            output_y: entry.outputY ?? "",
+            output_z: entry.outputZ ?? "",
+            z_in_hex: Boolean(entry.zInHex),
+            timestamp: entry.timestamp,
+          }),
+        })
+        // Entries the backend rejects are dropped; anything else is retried next time
+        if (!response.ok && response.status !== 400 && response.status !== 422) return
+      } catch (error) {
+        console.error("Error importing local history:", error)
+        return
+      }
+      pending = pending.slice(0, -1)
+      if (pending.length > 0) {
+        localStorage.setItem(LEGACY_HISTORY_KEY, JSON.stringify(pending))
+      } else {
+        localStorage.removeItem(LEGACY_HISTORY_KEY)
+      }
+    }
   }
 
-  const loadHistoryFromStorage = () => {
+  // Load the newest page, or the page after cursor to append to the list
+  const loadHistoryPage = async (cursor: number | null = null) => {
+    setHistoryLoading(true)
     try {
-      const storedHistory = localStorage.getItem(HISTORY_KEY);
-      if (storedHistory) {
-        const parsedHistory: HistoryEntry[] = JSON.parse(storedHistory);
-        setHistory(parsedHistory);
+      const params = new URLSearchParams({ limit: String(HISTORY_PAGE_SIZE) })
+      if (cursor !== null) params.set("cursor", String(cursor))
+      const response = await fetch(`${HISTORY_URL}?${params}`)
+      if (!response.ok) {
+        console.error("Error loading history:", await response.text())
+        return
       }
+      const page: HistoryPage = await response.json()
+      setHistory((entries) => (cursor === null ? page.entries : [...entries, ...page.entries]))
+      setHistoryTotal(page.total)
+      setHistoryCursor(page.next_cursor)
     } catch (error) {
-      console.error("Error loading history from storage:", error);
-      setHistory([]);
+      console.error("Error loading history:", error)
+    } finally {
+      setHistoryLoading(false)
     }
   }
 
-  const clearHistory = () => {
-    setHistory([]);
-    localStorage.removeItem(HISTORY_KEY);
+  const clearHistory = async () => {
+    try {
+      await fetch(HISTORY_URL, { method: "DELETE" })
+      setHistory([])
+      setHistoryTotal(0)
+      setHistoryCursor(null)
+    } catch (error) {
+      console.error("Error clearing history:", error)
+    }
   }
 
   const handleAxisValueChange = (axis: string, value: string) => {
@@ -268,11 +381,29 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
     }
   }, [])
 
-  // Load history from localStorage on initial render
+  // Keep one live scaling connection open while the modal is mounted
+  useEffect(() => {
+    const client = new LiveScalingClient()
+    client.connect()
+    liveClient.current = client
+    return () => {
+      client.close()
+      liveClient.current = null
+    }
+  }, [])
+
+  // Import any history left in localStorage once, then show the newest page
   useEffect(() => {
-    loadHistoryFromStorage();
+    migrateLegacyHistory().finally(() => loadHistoryPage())
   }, []);
 
+  // Reload the newest history page whenever the history tab is opened
+  useEffect(() => {
+    if (activeTab === "history") {
+      loadHistoryPage()
+    }
+  }, [activeTab]);
+
   if (!isOpen) return null
 
   const axisConfig = [
@@ -336,7 +467,7 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
             )}
             onClick={() => setActiveTab("history")}
           >
-            History ({history.length}/100)
+            History ({historyTotal})
           </button>
         </div>
 
@@ -468,32 +599,41 @@ export function ScalingRangeModal({ isOpen = true, onClose, onChange }: ScalingR
                         </tr>
                       </thead>
                       <tbody>
-                        {history.slice(0, 50).map((entry, index) => (
-                          <tr key={index} className="border-t border-border/50 hover:bg-secondary/20">
+                        {history.map((entry) => (
+                          <tr key={entry.id} className="border-t border-border/50 hover:bg-secondary/20">
                             <td className="px-2 py-1 font-mono text-xs">{new Date(entry.timestamp).toLocaleTimeString()}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.x1}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.x2}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.y1}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.y2}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.z1}</td>
-                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.z2}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.x1 || "-"}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.x2 || "-"}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.y1 || "-"}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.y2 || "-"}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.z1 || "-"}</td>
+                            <td className="px-2 py-1 text-blue-600 font-medium">{entry.z2 || "-"}</td>
                             <td className={cn("px-2 py-1 font-medium", 
-                              entry.selectedAxis === 'x' ? "text-red-500" : "text-green-600")}>
-                              {entry.outputX}
+                              entry.scale_from === 'x' ? "text-red-500" : "text-green-600")}>
+                              {entry.output_x}
                             </td>
                             <td className={cn("px-2 py-1 font-medium", 
-                              entry.selectedAxis === 'y' ? "text-red-500" : "text-green-600")}>
-                              {entry.outputY}
+                              entry.scale_from === 'y' ? "text-red-500" : "text-green-600")}>
+                              {entry.output_y}
                             </td>
                             <td className={cn("px-2 py-1 font-medium", 
-                              entry.selectedAxis === 'z' ? "text-red-500" : "text-green-600")}>
-                              {entry.outputZ}
+                              entry.scale_from === 'z' ? "text-red-500" : "text-green-600")}>
+                              {entry.output_z}
                             </td>
                           </tr>
                         ))}
                       </tbody>
                     </table>
                   </div>
+                  {historyCursor !== null && (
+                    <button
+                      onClick={() => loadHistoryPage(historyCursor)}
+                      disabled={historyLoading}
+                      className="w-full px-3 py-1 text-xs rounded-md bg-secondary/30 hover:bg-secondary/50 text-foreground disabled:opacity-50 transition-colors"
+                    >
+                      {historyLoading ? "Loading..." : `Load more (${history.length} of ${historyTotal})`}
+                    </button>
+                  )}
                 </>
               ) : (
                 <div className="text-center py-8 text-muted-foreground">
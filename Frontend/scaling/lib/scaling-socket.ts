@@ -0,0 +1,111 @@
+export interface ScalingRequest {
+  x_input: string
+  y_input: string
+  z_input: string
+  x1: string
+  x2: string
+  y1: string
+  y2: string
+  z1: string
+  z2: string
+  scale_from: string
+  z_in_hex: boolean
+}
+
+export interface ScalingResponse {
+  x: string
+  y: string
+  z: string
+}
+
+interface LiveScalingMessage extends Partial<ScalingResponse> {
+  seq: number
+  error?: string
+}
+
+interface PendingRequest {
+  resolve: (result: ScalingResponse | null) => void
+  reject: (error: Error) => void
+}
+
+// Delta mode: responses hold only the coordinates that changed
+export const LIVE_SCALING_URL = "ws://127.0.0.1:8001/ws/scale?delta=1"
+
+/**
+ * Persistent connection to the backend's live scaling channel.
+ *
+ * Only the fields that changed since the previous request are sent. Every
+ * request carries a sequence number, and responses to requests that were
+ * superseded by a newer one resolve to null so callers can ignore them.
+ * Responses carry only the coordinates that changed and are merged into
+ * the last result in arrival order.
+ */
+export class LiveScalingClient {
+  private socket: WebSocket | null = null
+  private lastSent: Partial<ScalingRequest> = {}
+  private lastResult: ScalingResponse = { x: "", y: "", z: "" }
+  private seq = 0
+  private pending = new Map<number, PendingRequest>()
+
+  constructor(private url: string = LIVE_SCALING_URL) {}
+
+  get isOpen(): boolean {
+    return this.socket?.readyState === WebSocket.OPEN
+  }
+
+  connect(): void {
+    if (this.socket && this.socket.readyState <= WebSocket.OPEN) return
+
+    const socket = new WebSocket(this.url)
+    socket.onmessage = (event) => this.handleMessage(JSON.parse(event.data))
+    socket.onclose = () => {
+      // The server starts from empty state on the next connection
+      this.socket = null
+      this.lastSent = {}
+      this.lastResult = { x: "", y: "", z: "" }
+      this.pending.forEach(({ reject }) => reject(new Error("Live scaling connection closed")))
+      this.pending.clear()
+    }
+    this.socket = socket
+  }
+
+  close(): void {
+    this.socket?.close()
+  }
+
+  scale(request: ScalingRequest): Promise<ScalingResponse | null> {
+    if (!this.socket || !this.isOpen) {
+      return Promise.reject(new Error("Live scaling connection is not open"))
+    }
+
+    const changes: Partial<ScalingRequest> = {}
+    for (const key of Object.keys(request) as (keyof ScalingRequest)[]) {
+      if (this.lastSent[key] !== request[key]) {
+        Object.assign(changes, { [key]: request[key] })
+      }
+    }
+    this.lastSent = { ...request }
+
+    const seq = ++this.seq
+    this.socket.send(JSON.stringify({ seq, ...changes }))
+    return new Promise((resolve, reject) => this.pending.set(seq, { resolve, reject }))
+  }
+
+  private handleMessage(message: LiveScalingMessage): void {
+    const request = this.pending.get(message.seq)
+    if (!request) return
+    this.pending.delete(message.seq)
+
+    const { seq, error, ...changes } = message
+    if (error !== undefined) {
+      // The server rejected the update, so resend every field next time
+      this.lastSent = {}
+      request.reject(new Error(error))
+      return
+    }
+
+    // Superseded responses still move the server's baseline, so merge them too
+    this.lastResult = { ...this.lastResult, ...changes }
+    request.resolve(seq < this.seq ? null : { ...this.lastResult })
+  }
+}
@@ -0,0 +1,83 @@
+"""
+Benchmark of the bulk hex Z codec against the per-value path
+Compares validate_and_convert_input / convert_to_hex_if_needed called once per
+value with parse_hex_array / format_hex_array, and shows the precision lost by
+the float round-trip above 2**53
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import convert_to_hex_if_needed, format_hex_array, parse_hex_array, validate_and_convert_input
+
+
+def _best_time(function, repeat):
+    """Run function repeat times and return the fastest wall time."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(count=100000, repeat=5, seed=0):
+    """
+    Time per-value and bulk hex parsing and formatting.
+
+    Args:
+        count: Number of hex values
+        repeat: Runs per measurement; the fastest is kept
+        seed: Random seed for the test values
+
+    Returns:
+        dict: Seconds per run for each path and the number of values that
+        changed after a float round-trip
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 2 ** 64 - 1, size=count, dtype=np.uint64, endpoint=True)
+    strings = [hex(int(v)) for v in values]
+
+    results = {
+        'count': count,
+        'parse_per_value': _best_time(lambda: [validate_and_convert_input(s, is_hex=True) for s in strings], repeat),
+        'parse_bulk': _best_time(lambda: parse_hex_array(strings), repeat),
+        'format_per_value': _best_time(lambda: [convert_to_hex_if_needed(float(v), True) for v in values], repeat),
+        'format_bulk': _best_time(lambda: format_hex_array(values), repeat),
+    }
+
+    round_trip = [convert_to_hex_if_needed(validate_and_convert_input(s, is_hex=True), True) for s in strings]
+    exact = format_hex_array(parse_hex_array(strings)[0]).tolist()
+    results['float_round_trip_mismatches'] = sum(a != b for a, b in zip(round_trip, strings))
+    results['bulk_round_trip_mismatches'] = sum(a != b for a, b in zip(exact, strings))
+    return results
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark bulk hex parsing and formatting")
+    parser.add_argument("--count", type=int, default=100000, help="Number of hex values")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.count, args.repeat)
+    print(f"{results['count']} random 64-bit values")
+    print(f"{'':<8}{'per value':>12}{'bulk':>12}{'speedup':>10}")
+    for stage in ('parse', 'format'):
+        single = results[f'{stage}_per_value']
+        bulk = results[f'{stage}_bulk']
+        print(f"{stage:<8}{single * 1000:>10.1f}ms{bulk * 1000:>10.1f}ms{single / bulk:>9.1f}x")
+    print(f"Values changed by a float round-trip: {results['float_round_trip_mismatches']}")
+    print(f"Values changed by a bulk round-trip:  {results['bulk_round_trip_mismatches']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Micro-benchmarks for the scaling_logic hot paths with regression gates
+Covers the per-call validation and scaling chains and the bulk paths at several
+input sizes. Results are saved as JSON baselines, and the compare command fails
+when ops/sec drops by more than a threshold
+
+Usage:
+    python bench_scaling.py run --save baseline.json
+    python bench_scaling.py compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import (
+    calculate_scaled_value,
+    format_hex_array,
+    get_piecewise_transform,
+    get_scaling_transform,
+    parse_hex_array,
+    scale_coordinates,
+    scale_coordinates_batch,
+    validate_and_convert_input,
+    validate_range_inputs,
+)
+
+RANGES = dict(x1="0", x2="10", y1="0", y2="100", z1="0", z2="50")
+BULK_SIZES = (1000, 100000, 1000000)
+DEFAULT_THRESHOLD = 0.10
+# Minimum wall time of one measurement, so fast calls are timed in loops
+MIN_MEASURE_TIME = 0.05
+
+
+def _single_call_benchmarks():
+    """Benchmarks of one call per operation, as (name, function) pairs."""
+    inputs = {'x': ("5", "", ""), 'y': ("", "50", ""), 'z': ("", "", "25")}
+    benchmarks = [
+        ("calculate_scaled_value", lambda: calculate_scaled_value(5.0, 0.0, 10.0, 0.0, 100.0)),
+        ("validate_and_convert_input/decimal", lambda: validate_and_convert_input("123.456")),
+        ("validate_and_convert_input/hex", lambda: validate_and_convert_input("0x1f4a", is_hex=True)),
+        ("validate_range_inputs", lambda: validate_range_inputs("0", "10", "0", "100", "0", "50")),
+    ]
+    for axis, values in inputs.items():
+        benchmarks.append((
+            f"scale_coordinates/{axis}",
+            lambda values=values, axis=axis: scale_coordinates(*values, scale_from=axis, **RANGES)
+        ))
+    benchmarks.append((
+        "scale_coordinates/z_hex",
+        lambda: scale_coordinates("", "", "0x19", scale_from='z', z_in_hex=True, **RANGES)
+    ))
+    return benchmarks
+
+
+def _bulk_benchmarks(size, seed=0):
+    """Benchmarks of the bulk paths for one input size, as (name, function) pairs."""
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0, 10, size)
+    decimal_strings = values.astype(str)
+    hex_values = rng.integers(0, 2 ** 48, size=size, dtype=np.uint64)
+    hex_strings = format_hex_array(hex_values)
+    points = np.column_stack([values, np.zeros(size), np.zeros(size)])
+    affine = get_scaling_transform(*RANGES.values()).affine('x')
+    curve = get_piecewise_transform({'x': np.linspace(0, 10, 256), 'y': np.linspace(0, 100, 256) ** 1.5})
+
+    return [
+        (f"scale_coordinates_batch/float/{size}",
+         lambda: scale_coordinates_batch(values, None, None, scale_from='x', **RANGES)),
+        (f"scale_coordinates_batch/decimal_strings/{size}",
+         lambda: scale_coordinates_batch(decimal_strings, None, None, scale_from='x', **RANGES)),
+        (f"scale_coordinates_batch/hex_strings/{size}",
+         lambda: scale_coordinates_batch(None, None, hex_strings, scale_from='z', z_in_hex=True, **RANGES)),
+        (f"parse_hex_array/{size}", lambda: parse_hex_array(hex_strings)),
+        (f"format_hex_array/{size}", lambda: format_hex_array(hex_values)),
+        (f"piecewise_scale_batch/{size}", lambda: curve.scale_batch(values, None, None, scale_from='x')),
+        (f"affine_apply/{size}", lambda: affine.apply(points)),
+    ]
+
+
+def measure(function, repeat=5):
+    """
+    Time a function and return the best seconds per call.
+
+    The call count per measurement is doubled until one measurement takes
+    at least MIN_MEASURE_TIME, then the fastest of repeat measurements is
+    kept.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_MEASURE_TIME:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / loops
+
+
+def run_benchmarks(sizes=BULK_SIZES, repeat=5, pattern=None):
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: Input sizes for the bulk paths
+        repeat: Measurements per benchmark; the fastest is kept
+        pattern: Optional regular expression selecting benchmark names
+
+    Returns:
+        dict: 'meta' with environment details and 'results' mapping each
+        benchmark name to its seconds per call, operations per call and ops/sec
+    """
+    benchmarks = [(name, function, 1) for name, function in _single_call_benchmarks()]
+    for size in sizes:
+        benchmarks += [(name, function, size) for name, function in _bulk_benchmarks(size)]
+
+    results = {}
+    for name, function, operations in benchmarks:
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        seconds = measure(function, repeat)
+        results[name] = {
+            'seconds': seconds,
+            'operations': operations,
+            'ops_per_sec': operations / seconds,
+        }
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two benchmark runs.
+
+    Args:
+        baseline: Earlier run_benchmarks output
+        current: New run_benchmarks output
+        threshold: Largest allowed relative drop in ops/sec (0.10 = 10%)
+
+    Returns:
+        list: (name, baseline ops/sec, current ops/sec, relative change,
+        regressed) for every benchmark present in both runs
+    """
+    rows = []
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            continue
+        change = after['ops_per_sec'] / before['ops_per_sec'] - 1.0
+        rows.append((name, before['ops_per_sec'], after['ops_per_sec'], change, change < -threshold))
+    return rows
+
+
+def _print_results(results):
+    print(f"{'benchmark':<48}{'ops/sec':>16}{'time/call':>14}")
+    for name, result in results['results'].items():
+        print(f"{name:<48}{result['ops_per_sec']:>16,.0f}{result['seconds'] * 1e6:>12.2f}us")
+
+
+def _print_comparison(rows, threshold):
+    print(f"{'benchmark':<48}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<48}{before:>14,.0f}{after:>14,.0f}{change:>+9.1%}{flag}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} of {len(rows)} benchmarks slower than the {threshold:.0%} threshold")
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Benchmark scaling_logic hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and print the results")
+    compare = commands.add_parser("compare", help="Compare against a baseline and fail on regressions")
+    compare.add_argument("baseline", help="Baseline JSON file")
+    compare.add_argument("current", nargs="?", help="Results JSON file (runs the suite when omitted)")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Largest allowed relative drop in ops/sec (default 0.10)")
+    for command in (run, compare):
+        command.add_argument("--save", help="Write the new results to this JSON file")
+        command.add_argument("--sizes", type=int, nargs="+", default=list(BULK_SIZES), help="Bulk input sizes")
+        command.add_argument("--repeat", type=int, default=5, help="Measurements per benchmark")
+        command.add_argument("--filter", help="Regular expression selecting benchmark names")
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "compare" and args.current:
+        current = _load(args.current)
+    else:
+        current = run_benchmarks(args.sizes, args.repeat, args.filter)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.command == "run":
+        _print_results(current)
+        return 0
+
+    rows = compare_results(_load(args.baseline), current, args.threshold)
+    _print_comparison(rows, args.threshold)
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Latency comparison of the backend transports
+Starts the backend once per transport (HTTP on a loopback port, JSON-RPC on a
+Unix domain socket and JSON-RPC over stdio) and times /scale-equivalent
+requests one at a time and with several in flight, reporting throughput and
+p50/p95/p99 latency
+
+Usage:
+    python bench_transports.py --requests 2000 --depth 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+# Add the backend directory to the path so we can import rpc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import PERCENTILES, LocalServer, RANGES
+from rpc import RpcClient, read_frame
+
+TRANSPORTS = ('http', 'unix', 'stdio')
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tauri_backend.py")
+
+
+def scale_params(index):
+    """A /scale request with a different input each time, so the response cache never answers."""
+    return {"x_input": str(index * 0.001), "y_input": "", "z_input": "", "scale_from": "x", **RANGES}
+
+
+async def _start_rpc_backend(transport, socket_path):
+    """Start a JSON-RPC backend and connect to it once it is ready."""
+    if transport == 'unix':
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, BACKEND, "--transport", "unix", "--socket", socket_path,
+            stdout=asyncio.subprocess.PIPE
+        )
+        await asyncio.wait_for(process.stdout.readline(), 30)
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, BACKEND, "--transport", "stdio",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+        # The first frame is the "ready" notification
+        await asyncio.wait_for(read_frame(process.stdout), 30)
+        reader, writer = process.stdout, process.stdin
+    return process, RpcClient(reader, writer)
+
+
+async def _timed_run(call, requests, depth):
+    """Send requests through call with depth of them in flight; returns (latencies, elapsed)."""
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for index in counter:
+            start = time.perf_counter()
+            await call(scale_params(index))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(depth)))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_rpc(transport, requests=1000, depth=16, warmup=50):
+    """
+    Time the JSON-RPC "scale" method over a Unix socket or stdio.
+
+    Returns:
+        dict: Summary rows keyed by 'sequential' and 'pipelined'
+    """
+    socket_path = os.path.join(tempfile.mkdtemp(), "backend.sock")
+    process, client = await _start_rpc_backend(transport, socket_path)
+    try:
+        def call(params):
+            return client.call("scale", params)
+        await _timed_run(call, warmup, 1)
+        return {
+            'sequential': summarize(*await _timed_run(call, requests, 1)),
+            'pipelined': summarize(*await _timed_run(call, requests, depth)),
+        }
+    finally:
+        await client.close()
+        if transport == 'stdio':
+            process.stdin.close()
+        else:
+            process.terminate()
+        await process.wait()
+
+
+async def bench_http(url, requests=1000, depth=16, warmup=50):
+    """
+    Time POST /scale over loopback HTTP; depth requests in flight use a keep-alive connection pool.
+
+    Returns:
+        dict: Summary rows keyed by 'sequential' and 'pipelined'
+    """
+    async with httpx.AsyncClient(base_url=url, limits=httpx.Limits(max_connections=depth)) as client:
+        async def call(params):
+            response = await client.post("/scale", json=params)
+            response.raise_for_status()
+            return response.json()
+        await _timed_run(call, warmup, 1)
+        return {
+            'sequential': summarize(*await _timed_run(call, requests, 1)),
+            'pipelined': summarize(*await _timed_run(call, requests, depth)),
+        }
+
+
+def summarize(latencies, elapsed):
+    """
+    Reduce latencies to throughput and percentiles.
+
+    Returns:
+        dict: requests, throughput (requests per second) and latency percentiles in ms
+    """
+    row = {'requests': len(latencies), 'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0}
+    for percentile in PERCENTILES:
+        row[f"p{percentile}_ms"] = np.percentile(latencies, percentile) * 1000 if latencies else None
+    return row
+
+
+def run(transports=TRANSPORTS, requests=1000, depth=16):
+    """
+    Benchmark each transport against its own backend process.
+
+    Returns:
+        dict: Per transport, the 'sequential' and 'pipelined' summaries
+    """
+    results = {}
+    for transport in transports:
+        if transport == 'http':
+            with LocalServer() as server:
+                results[transport] = asyncio.run(bench_http(server.url, requests, depth))
+        else:
+            results[transport] = asyncio.run(bench_rpc(transport, requests, depth))
+    return results
+
+
+def format_table(results, depth):
+    """Render benchmark results as a text table."""
+    header = f"{'transport':<10}{'mode':<12}{'requests':>10}{'req/s':>12}" + "".join(
+        f"{f'p{percentile} ms':>10}" for percentile in PERCENTILES
+    )
+    lines = [f"pipelined = {depth} requests in flight", header]
+    for transport, modes in results.items():
+        for mode, row in modes.items():
+            line = f"{transport:<10}{mode:<12}{row['requests']:>10}{row['throughput']:>12,.1f}"
+            for percentile in PERCENTILES:
+                line += f"{row[f'p{percentile}_ms']:>10.3f}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Compare HTTP and JSON-RPC transport latency")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS), help="Comma-separated transports to run")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode")
+    parser.add_argument("--depth", type=int, default=16, help="Requests in flight in the pipelined mode")
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON to this file (- for stdout)")
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    transports = [name.strip() for name in args.transports.split(",") if name.strip()]
+    unknown = set(transports) - set(TRANSPORTS)
+    if unknown or not transports:
+        print(f"Error: transports must be among {', '.join(TRANSPORTS)}", file=sys.stderr)
+        return 1
+
+    results = run(transports, args.requests, args.depth)
+    if args.json_path == "-":
+        print(json.dumps(results, indent=2))
+        return 0
+    print(format_table(results, args.depth))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
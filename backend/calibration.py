@@ -0,0 +1,367 @@
+"""
+Least-squares calibration from measured (input, output) sample pairs
+Samples are folded into running means and co-moments (Welford updates for
+single pairs, Chan's pairwise merge for chunks and partial fits), so fitting
+takes one pass and constant memory however many pairs there are. The fitted
+line comes out as a range set that scale_coordinates and the endpoints accept
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, get_scaling_transform, parse_input_array
+from profiles import RANGE_KEYS
+from point_cloud import DEFAULT_WINDOW, DTYPES, open_points
+from scale_file import BINARY_FORMATS, DEFAULT_CHUNK_SIZE, FORMATS, detect_format, read_chunks
+
+
+def format_range_value(value):
+    """
+    Format a float as a plain decimal string accepted as a range value.
+
+    Range values must not use exponent notation, so 1e-05 becomes "0.00001".
+    The shortest digits that round-trip are used.
+    """
+    return np.format_float_positional(value, trim='-')
+
+
+class LinearFit:
+    """
+    Running least-squares fit of output = slope * input + intercept.
+
+    Pairs where either value is missing or not finite are skipped and
+    counted. Fits of separate parts of the data can be merged into the fit
+    of the whole, so chunks can be fitted in parallel.
+    """
+
+    __slots__ = ('count', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy', 'min_x', 'max_x', 'skipped')
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        # Sums of squared deviations from the means, and of their products
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+        self.min_x = math.inf
+        self.max_x = -math.inf
+        self.skipped = 0
+
+    def add(self, x, y):
+        """Add one sample pair."""
+        if not (math.isfinite(x) and math.isfinite(y)):
+            self.skipped += 1
+            return
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+        self.min_x = min(self.min_x, x)
+        self.max_x = max(self.max_x, x)
+
+    def update(self, inputs, outputs):
+        """
+        Add a chunk of sample pairs.
+
+        Args:
+            inputs, outputs: Equal-length sequences or arrays; strings are
+                parsed like scale_coordinates_batch inputs
+
+        Returns:
+            LinearFit: self
+
+        Raises:
+            ValueError: If the lengths differ
+        """
+        x, x_valid = parse_input_array(inputs)
+        y, y_valid = parse_input_array(outputs)
+        if x.shape != y.shape:
+            raise ValueError(f"Got {x.shape[0]} inputs but {y.shape[0]} outputs")
+        valid = x_valid & y_valid
+        self.skipped += int(valid.size - np.count_nonzero(valid))
+        if not valid.all():
+            x, y = x[valid], y[valid]
+        if x.size == 0:
+            return self
+
+        chunk = LinearFit()
+        chunk.count = int(x.size)
+        chunk.mean_x = float(x.mean())
+        chunk.mean_y = float(y.mean())
+        dx = x - chunk.mean_x
+        dy = y - chunk.mean_y
+        chunk.m2_x = float(np.dot(dx, dx))
+        chunk.m2_y = float(np.dot(dy, dy))
+        chunk.c_xy = float(np.dot(dx, dy))
+        chunk.min_x = float(x.min())
+        chunk.max_x = float(x.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Fold another fit into this one, as if its pairs had been added here.
+
+        Returns:
+            LinearFit: self
+        """
+        self.skipped += other.skipped
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            for name in ('count', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy', 'min_x', 'max_x'):
+                setattr(self, name, getattr(other, name))
+            return self
+
+        count = self.count + other.count
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.count * other.count / count
+        self.mean_x += dx * other.count / count
+        self.mean_y += dy * other.count / count
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.min_x = min(self.min_x, other.min_x)
+        self.max_x = max(self.max_x, other.max_x)
+        self.count = count
+        return self
+
+    def _line(self):
+        if self.count < 2 or self.m2_x == 0:
+            raise ValueError("At least two distinct input values are needed to fit a line")
+        slope = self.c_xy / self.m2_x
+        return slope, self.mean_y - slope * self.mean_x
+
+    def result(self):
+        """
+        Get the fitted line and its residual statistics.
+
+        Returns:
+            dict: count, skipped, slope, intercept, r_squared, rmse (root
+            mean squared residual), residual_std, slope_stderr and
+            intercept_stderr (None with only two pairs), input_min and
+            input_max
+
+        Raises:
+            ValueError: If fewer than two distinct input values were added
+        """
+        slope, intercept = self._line()
+        # Clamped, because rounding can leave a tiny negative sum for exact fits
+        ss_res = max(self.m2_y - slope * self.c_xy, 0.0)
+        residual_std = math.sqrt(ss_res / (self.count - 2)) if self.count > 2 else None
+        slope_stderr = residual_std / math.sqrt(self.m2_x) if residual_std is not None else None
+        return {
+            'count': self.count,
+            'skipped': self.skipped,
+            'slope': slope,
+            'intercept': intercept,
+            'r_squared': 1.0 - ss_res / self.m2_y if self.m2_y > 0 else 1.0,
+            'rmse': math.sqrt(ss_res / self.count),
+            'residual_std': residual_std,
+            'slope_stderr': slope_stderr,
+            'intercept_stderr': (
+                slope_stderr * math.sqrt(self.m2_x / self.count + self.mean_x ** 2)
+                if slope_stderr is not None else None
+            ),
+            'input_min': self.min_x,
+            'input_max': self.max_x,
+        }
+
+    def ranges(self, source='x', target='y', base=None):
+        """
+        Express the fitted line as a range set.
+
+        The source range spans the smallest to the largest input seen and the
+        target range holds the fitted outputs at those ends, so scaling from
+        source to target (or back) follows the fitted line.
+
+        Args:
+            source: Axis the inputs were measured on
+            target: Axis the outputs were measured on
+            base: Optional dict of range values for the remaining axis
+
+        Returns:
+            dict: x1..z2 as strings
+
+        Raises:
+            ValueError: If the axes are invalid or the fit is underdetermined
+        """
+        if source not in AXES or target not in AXES or source == target:
+            raise ValueError("source and target must be two different axes of 'x', 'y', 'z'")
+        slope, intercept = self._line()
+        ranges = {key: "" for key in RANGE_KEYS}
+        ranges.update(base or {})
+        ranges[f"{source}1"] = format_range_value(self.min_x)
+        ranges[f"{source}2"] = format_range_value(self.max_x)
+        ranges[f"{target}1"] = format_range_value(slope * self.min_x + intercept)
+        ranges[f"{target}2"] = format_range_value(slope * self.max_x + intercept)
+        return ranges
+
+    def transform(self, source='x', target='y', base=None, z_in_hex=False):
+        """
+        Get the compiled ScalingTransform for the fitted range set.
+
+        Returns:
+            ScalingTransform: Transform built from ranges(source, target, base)
+        """
+        ranges = self.ranges(source, target, base)
+        return get_scaling_transform(*(ranges[key] for key in RANGE_KEYS), z_in_hex=z_in_hex)
+
+
+def fit_stream(input_stream, fmt, input_column, output_column, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fit the sample pairs of a CSV or NDJSON stream.
+
+    Args:
+        input_stream: Text stream to read from
+        fmt: 'csv' or 'ndjson'
+        input_column: Column name (CSV header or NDJSON key) of the inputs
+        output_column: Column name of the outputs
+        chunk_size: Number of records folded in per chunk
+
+    Returns:
+        LinearFit: The fit of every record
+
+    Raises:
+        ValueError: If the format or a column is invalid, or an NDJSON line is not an object
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    fit = LinearFit()
+    if fmt == 'csv':
+        reader = csv.reader(input_stream)
+        header = next(reader, None)
+        if header is None:
+            return fit
+        for name in (input_column, output_column):
+            if name not in header:
+                raise ValueError(f"Column '{name}' not found in CSV header")
+        columns = (header.index(input_column), header.index(output_column))
+        for chunk in read_chunks(reader, chunk_size):
+            fit.update(*([row[column] if column < len(row) else None for row in chunk] for column in columns))
+    else:
+        for chunk in read_chunks(input_stream, chunk_size):
+            records = [json.loads(line) for line in chunk if line.strip()]
+            if not all(isinstance(record, dict) for record in records):
+                raise ValueError("NDJSON records must be objects")
+            fit.update([record.get(input_column) for record in records],
+                       [record.get(output_column) for record in records])
+    return fit
+
+
+def _fit_point_slice(path, input_dtype, columns, start, stop, window):
+    """Fit rows start..stop of a point cloud; runs in a worker process."""
+    points = open_points(path, raw_dtype=input_dtype)
+    fit = LinearFit()
+    for offset in range(start, stop, window):
+        block = points[offset:min(offset + window, stop)]
+        fit.update(block[:, columns[0]], block[:, columns[1]])
+    return fit
+
+
+def fit_point_file(path, source='x', target='y', input_dtype=None, window=DEFAULT_WINDOW, workers=1):
+    """
+    Fit one axis of a binary point cloud against another.
+
+    Args:
+        path: .npy file, or raw xyz buffer when input_dtype is given
+        source: Axis holding the inputs
+        target: Axis holding the outputs
+        input_dtype: 'float32' or 'float64' for raw buffers
+        window: Points folded in per step
+        workers: Processes fitting contiguous parts of the file, whose fits
+            are merged (0 = one per CPU)
+
+    Returns:
+        LinearFit: The fit of every point
+    """
+    if source not in AXES or target not in AXES:
+        raise ValueError("source and target must be 'x', 'y', or 'z'")
+    columns = (AXES.index(source), AXES.index(target))
+    total = open_points(path, raw_dtype=input_dtype).shape[0]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or total < 2 * window:
+        return _fit_point_slice(path, input_dtype, columns, 0, total, window)
+
+    bounds = np.linspace(0, total, workers + 1).astype(int)
+    fit = LinearFit()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = [
+            executor.submit(_fit_point_slice, path, input_dtype, columns, int(start), int(stop), window)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        for part in parts:
+            fit.merge(part.result())
+    return fit
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Fit a range set to measured (input, output) sample pairs")
+    parser.add_argument("input", help="CSV, NDJSON or binary point cloud file, or - for stdin (text formats only)")
+    parser.add_argument("--format", choices=FORMATS + BINARY_FORMATS, help="File format (detected from the extension by default)")
+    parser.add_argument("--source", choices=AXES, default='x', help="Axis of the measured inputs")
+    parser.add_argument("--target", choices=AXES, default='y', help="Axis of the measured outputs")
+    parser.add_argument("--input-column", help="Column holding the inputs (defaults to the source axis name)")
+    parser.add_argument("--output-column", help="Column holding the outputs (defaults to the target axis name)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per chunk")
+    parser.add_argument("--input-dtype", choices=DTYPES, default='float64', help="Element type of raw input buffers")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for binary formats (0 = one per CPU)")
+    parser.add_argument("--json", action="store_true", help="Print the fit and range set as JSON")
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    try:
+        fmt = args.format or detect_format(args.input)
+        if fmt in BINARY_FORMATS:
+            fit = fit_point_file(
+                args.input, args.source, args.target,
+                input_dtype=args.input_dtype if fmt == 'raw' else None, workers=args.workers
+            )
+        else:
+            input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+            try:
+                fit = fit_stream(
+                    input_stream, fmt, args.input_column or args.source, args.output_column or args.target,
+                    chunk_size=args.chunk_size
+                )
+            finally:
+                if input_stream is not sys.stdin:
+                    input_stream.close()
+        result = fit.result()
+        ranges = fit.ranges(args.source, args.target)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps({'fit': result, 'ranges': ranges}, indent=2))
+        return 0
+    print(f"{result['count']} pairs ({result['skipped']} skipped)")
+    print(f"slope {result['slope']!r}, intercept {result['intercept']!r}")
+    print(f"r^2 {result['r_squared']:.9f}, rmse {result['rmse']:.6g}")
+    flags = [f"--{key} {ranges[key]}" for key in RANGE_KEYS if ranges[key]]
+    print("ranges: " + " ".join(flags))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+"""
+Bilinear and trilinear interpolation over regular 2D and 3D grids
+A grid is an array of correction values sampled at origin + index * spacing
+along each axis. Query points are interpolated in vectorized chunks from the
+grid's flat buffer, so grids loaded as memory-mapped .npy files are read
+straight from the page cache; very large query sets can be spread over a
+process pool
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Add the backend directory to the path so we can import parallel_scaling
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from parallel_scaling import ParallelScaler, _open_buffer
+
+DEFAULT_CHUNK_SIZE = 16384  # query points per vectorized step, small enough to stay in cache
+GRID_DIMENSIONS = (2, 3)
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".scaling-range", "grids")
+
+
+class RegularGrid:
+    """
+    A regular grid of values with multilinear interpolation.
+
+    The element strides of the value array and the flat offsets of the
+    2**ndim corners of a cell are worked out once, so interpolating a chunk
+    is one cell lookup per point, one gather per corner and ndim rounds of
+    linear blending.
+    """
+
+    __slots__ = ('values', 'origin', 'spacing', 'path', 'shape', 'ndim', 'strides', 'corner_offsets', '_flat')
+
+    def __init__(self, values, origin=None, spacing=None, path=None):
+        """
+        Args:
+            values: 2D or 3D array of grid values, indexed [x, y] or [x, y, z]
+            origin: Coordinates of values[0, 0(, 0)] (defaults to zeros)
+            spacing: Distance between neighbouring grid points along each
+                axis (defaults to ones)
+            path: .npy file the values were loaded from, which lets worker
+                processes map the grid instead of receiving a copy
+
+        Raises:
+            ValueError: If the grid shape, origin or spacing is invalid
+        """
+        values = np.asarray(values)
+        if values.ndim not in GRID_DIMENSIONS:
+            raise ValueError(f"Grids must have 2 or 3 dimensions, got {values.ndim}")
+        if min(values.shape) < 2:
+            raise ValueError(f"Grids need at least two points along each axis, got shape {values.shape}")
+        if values.dtype.kind not in 'fiu':
+            raise ValueError(f"Grid values must be numeric, got {values.dtype}")
+        if values.dtype.kind != 'f':
+            values = values.astype(np.float64)
+        values = np.ascontiguousarray(values)
+
+        self.ndim = values.ndim
+        self.shape = values.shape
+        self.origin = self._vector(origin, 0.0, "origin")
+        self.spacing = self._vector(spacing, 1.0, "spacing")
+        if not (self.spacing > 0).all():
+            raise ValueError("spacing must be positive along every axis")
+        self.values = values
+        self.path = path
+        self._flat = values.reshape(-1)
+
+        self.strides = np.array(values.strides, dtype=np.intp) // values.itemsize
+        # Corners ordered with the last axis varying fastest, so neighbouring
+        # pairs differ along the last axis and can be blended pairwise
+        self.corner_offsets = tuple(
+            int(np.dot(corner, self.strides)) for corner in itertools.product((0, 1), repeat=self.ndim)
+        )
+
+    def _vector(self, value, default, name):
+        """Check an origin or spacing argument and get it as a float array."""
+        if value is None:
+            return np.full(self.ndim, default)
+        vector = np.asarray(value, dtype=np.float64).reshape(-1)
+        if vector.shape[0] != self.ndim:
+            raise ValueError(f"{name} needs {self.ndim} values, got {vector.shape[0]}")
+        if not np.isfinite(vector).all():
+            raise ValueError(f"{name} values must be finite")
+        return vector
+
+    @property
+    def bounds(self):
+        """(lower, upper) coordinates covered by the grid along each axis"""
+        return self.origin, self.origin + self.spacing * (np.array(self.shape) - 1)
+
+    def interpolate(self, points, extrapolate=True, chunk_size=DEFAULT_CHUNK_SIZE, out=None):
+        """
+        Interpolate the grid at an array of query points.
+
+        Args:
+            points: (N, ndim) array of query coordinates
+            extrapolate: Extend the edge cells linearly beyond the grid;
+                otherwise points outside are clamped to the nearest edge
+            chunk_size: Points interpolated per vectorized step
+            out: Optional (N,) float64 array to write into
+
+        Returns:
+            numpy.ndarray: (N,) interpolated values, NaN for points with a
+            missing or non-finite coordinate
+
+        Raises:
+            ValueError: If points does not have one column per grid axis
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != self.ndim:
+            raise ValueError(f"Expected an (N, {self.ndim}) array of points, got shape {points.shape}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if out is None:
+            out = np.empty(points.shape[0])
+        for start in range(0, points.shape[0], chunk_size):
+            stop = start + chunk_size
+            out[start:stop] = self._interpolate_chunk(points[start:stop], extrapolate)
+        return out
+
+    def _interpolate_chunk(self, points, extrapolate):
+        """Interpolate one chunk of query points."""
+        position = (points - self.origin) / self.spacing
+        valid = np.isfinite(position).all(axis=1)
+        position[~valid] = 0.0
+        upper = np.array(self.shape) - 1
+        if not extrapolate:
+            np.clip(position, 0, upper, out=position)
+
+        # The cell's lower corner; edge cells are extended when extrapolating
+        cell = np.clip(np.floor(position), 0, upper - 1)
+        fraction = position - cell
+        base = cell.astype(np.intp) @ self.strides
+
+        corners = [self._flat[base + offset] for offset in self.corner_offsets]
+        for axis in reversed(range(self.ndim)):
+            weight = fraction[:, axis]
+            corners = [low + weight * (high - low) for low, high in zip(corners[0::2], corners[1::2])]
+        result = corners[0].astype(np.float64, copy=False)
+        result[~valid] = np.nan
+        return result
+
+    def describe(self):
+        """Get the shape and placement of the grid as plain values."""
+        return {
+            'shape': list(self.shape),
+            'dtype': self.values.dtype.name,
+            'origin': self.origin.tolist(),
+            'spacing': self.spacing.tolist(),
+        }
+
+
+def load_grid(path, origin=None, spacing=None, mmap=True):
+    """
+    Load a grid from a .npy file.
+
+    Args:
+        path: .npy file of grid values
+        origin, spacing: Grid placement, as for RegularGrid
+        mmap: Map the file instead of reading it into memory
+
+    Returns:
+        RegularGrid: The grid
+
+    Raises:
+        ValueError: If the file is not a valid grid
+    """
+    try:
+        values = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read grid {path}: {e}")
+    return RegularGrid(values, origin, spacing, path=str(path) if mmap else None)
+
+
+def _interpolate_shard(grid_source, origin, spacing, points_source, out_source, start, stop, extrapolate):
+    """
+    Worker entry point: interpolate points[start:stop] into the output buffer.
+
+    Returns:
+        tuple: (start, stop) of the finished shard
+    """
+    values, grid_block = _open_buffer(grid_source, writable=False)
+    points, in_block = _open_buffer(points_source, writable=False)
+    out, out_block = _open_buffer(out_source, writable=True)
+    grid = None
+    try:
+        grid = RegularGrid(values, origin, spacing)
+        grid.interpolate(points[start:stop], extrapolate, out=out[start:stop])
+    finally:
+        del grid, values, points, out
+        for block in (grid_block, in_block, out_block):
+            if block is not None:
+                block.close()
+    return start, stop
+
+
+def interpolate_parallel(grid, points, extrapolate=True, scaler=None, workers=None, chunk_size=None):
+    """
+    Interpolate a grid at a large array of points on a process pool.
+
+    Query points and results pass through shared memory. Workers map a grid
+    loaded from a file themselves; other grids are copied into shared memory
+    once.
+
+    Args:
+        grid: RegularGrid to interpolate
+        points: (N, ndim) array of query coordinates
+        extrapolate: As for RegularGrid.interpolate
+        scaler: ParallelScaler whose pool and shard size to use (a
+            temporary pool of workers processes is started otherwise)
+        workers: Worker processes for the temporary pool
+        chunk_size: Points per shard (defaults to the scaler's)
+
+    Returns:
+        numpy.ndarray: (N,) values, as from RegularGrid.interpolate
+    """
+    if scaler is None:
+        with ParallelScaler(workers=workers) as scaler:
+            return interpolate_parallel(grid, points, extrapolate, scaler, chunk_size=chunk_size)
+
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != grid.ndim:
+        raise ValueError(f"Expected an (N, {grid.ndim}) array of points, got shape {points.shape}")
+    count = points.shape[0]
+    chunk_size = chunk_size or scaler.chunk_size
+    if count == 0:
+        return np.empty(0)
+
+    blocks = []
+    try:
+        def share(array):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            return ('shm', block.name, array.shape, array.dtype.str)
+
+        points_source = share(points)
+        out_source = share(np.empty(count))
+        grid_source = ('npy', grid.path) if grid.path else share(grid.values)
+        futures = [
+            scaler.executor.submit(
+                _interpolate_shard, grid_source, grid.origin.tolist(), grid.spacing.tolist(),
+                points_source, out_source, start, min(start + chunk_size, count), extrapolate
+            )
+            for start in range(0, count, chunk_size)
+        ]
+        for future in futures:
+            future.result()
+        result = np.ndarray((count,), dtype=np.float64, buffer=blocks[1].buf).copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return result
+
+
+def interpolate_batch(grid, x_inputs, y_inputs, z_inputs=None, extrapolate=True, scaler=None):
+    """
+    Interpolate a grid at query points given as one input list per axis.
+
+    Args:
+        grid: RegularGrid to interpolate
+        x_inputs, y_inputs: Query coordinates; None entries give invalid points
+        z_inputs: Query Z coordinates, required for 3D grids only
+        extrapolate: As for RegularGrid.interpolate
+        scaler: ParallelScaler to run the points on, or None to interpolate
+            in this process
+
+    Returns:
+        dict: 'values' array (0.0 where invalid) and 'valid' mask
+
+    Raises:
+        ValueError: If the inputs do not match the grid's axes or each other
+    """
+    columns = [x_inputs, y_inputs, z_inputs][:grid.ndim]
+    if grid.ndim == 2 and z_inputs is not None:
+        raise ValueError("z_inputs are not used with a 2D grid")
+    if any(column is None for column in columns):
+        names = " and ".join(f"{axis}_inputs" for axis in "xyz"[:grid.ndim])
+        raise ValueError(f"{names} are required for a {grid.ndim}D grid")
+    if len({len(column) for column in columns}) > 1:
+        raise ValueError("Input lists must have the same length")
+
+    points = np.empty((len(columns[0]), grid.ndim))
+    for axis, column in enumerate(columns):
+        points[:, axis] = np.asarray(column, dtype=np.float64)
+    if scaler is None:
+        values = grid.interpolate(points, extrapolate)
+    else:
+        values = interpolate_parallel(grid, points, extrapolate, scaler)
+    valid = np.isfinite(values)
+    return {'values': np.where(valid, values, 0.0), 'valid': valid}
+
+
+def grid_id_for(values, origin, spacing):
+    """
+    Derive a stable grid ID from the values and placement of a grid.
+
+    Returns:
+        str: 12-character hex ID
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(values.shape), values.dtype.str, list(origin), list(spacing)]).encode("utf-8"))
+    digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()[:12]
+
+
+class GridStore:
+    """
+    Thread-safe registry of named grids kept in a directory.
+
+    Each grid's values are a .npy file that is memory-mapped when the grid
+    is used; names and placements are kept in an index.json file that is
+    rewritten atomically on every change.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        """
+        Args:
+            directory: Directory holding the index and the value files
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._grids = {}
+        self._load()
+
+    def _load(self):
+        """
+        Read the index from disk, skipping entries whose value file is gone.
+
+        Raises:
+            ValueError: If the index cannot be read or is not a list of grid entries
+        """
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read grid store {self.index_path}: {e}")
+        if not isinstance(entries, list) or not all(
+            isinstance(entry, dict) and isinstance(entry.get('id'), str) for entry in entries
+        ):
+            raise ValueError(f"Cannot read grid store {self.index_path}: expected a list of grid entries")
+
+        for entry in entries:
+            if os.path.exists(self._values_path(entry['id'])):
+                self._entries[entry['id']] = entry
+
+    def _save(self):
+        """Write the index to disk atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.values()), f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _values_path(self, grid_id):
+        return os.path.join(self.directory, f"{grid_id}.npy")
+
+    def register(self, name, values, origin=None, spacing=None):
+        """
+        Validate and store a grid.
+
+        Args:
+            name: Display name for the grid
+            values: 2D or 3D array (or nested lists) of grid values
+            origin, spacing: Grid placement, as for RegularGrid
+
+        Returns:
+            dict: The stored grid's description
+
+        Raises:
+            ValueError: If the grid is invalid
+        """
+        try:
+            values = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Grid values must be a rectangular array of numbers")
+        grid = RegularGrid(values, origin, spacing)
+        grid_id = grid_id_for(grid.values, grid.origin.tolist(), grid.spacing.tolist())
+
+        with self._lock:
+            if grid_id not in self._entries:
+                os.makedirs(self.directory, exist_ok=True)
+                temp_path = self._values_path(grid_id) + ".tmp"
+                with open(temp_path, "wb") as f:
+                    np.save(f, grid.values)
+                os.replace(temp_path, self._values_path(grid_id))
+            self._entries[grid_id] = {'id': grid_id, 'name': name, **grid.describe()}
+            self._save()
+            return dict(self._entries[grid_id])
+
+    def get(self, grid_id):
+        """
+        Get a stored grid, memory-mapped from its value file.
+
+        Raises:
+            KeyError: If the grid does not exist
+        """
+        with self._lock:
+            entry = self._entries.get(grid_id)
+            if entry is None:
+                raise KeyError(f"Unknown grid: {grid_id}")
+            grid = self._grids.get(grid_id)
+            if grid is None:
+                grid = load_grid(self._values_path(grid_id), entry['origin'], entry['spacing'])
+                self._grids[grid_id] = grid
+            return grid
+
+    def describe(self, grid_id):
+        """
+        Get the public description of a grid.
+
+        Raises:
+            KeyError: If the grid does not exist
+        """
+        with self._lock:
+            if grid_id not in self._entries:
+                raise KeyError(f"Unknown grid: {grid_id}")
+            return dict(self._entries[grid_id])
+
+    def list(self):
+        """
+        List every stored grid.
+
+        Returns:
+            list: Grid descriptions sorted by name
+        """
+        with self._lock:
+            grids = [dict(entry) for entry in self._entries.values()]
+        return sorted(grids, key=lambda grid: (grid['name'], grid['id']))
+
+    def delete(self, grid_id):
+        """
+        Remove a grid and its value file.
+
+        Raises:
+            KeyError: If the grid does not exist
+        """
+        with self._lock:
+            if grid_id not in self._entries:
+                raise KeyError(f"Unknown grid: {grid_id}")
+            del self._entries[grid_id]
+            self._grids.pop(grid_id, None)
+            self._save()
+            try:
+                os.unlink(self._values_path(grid_id))
+            except FileNotFoundError:
+                pass
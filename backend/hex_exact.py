@@ -0,0 +1,191 @@
+"""
+Exact 64-bit hex Z scaling
+Hex Z values (register addresses, encoder counts) are kept as unsigned 64-bit
+integers end to end instead of round-tripping through float, which loses
+precision above 2**53
+"""
+
+import os
+import sys
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import (
+    get_scaling_transform,
+    format_hex_array,
+    parse_hex_array,
+    validate_and_convert_input,
+)
+
+UINT64_MAX = 2 ** 64 - 1
+
+
+def _exact_integer(value):
+    """
+    Parse a Z range value as an exact integer in the unsigned 64-bit range.
+
+    Raises:
+        ValueError: If the value is not a whole number in range
+    """
+    try:
+        number = Decimal(value.strip())
+    except (AttributeError, InvalidOperation):
+        raise ValueError("Invalid range values provided")
+    if number != number.to_integral_value() or not 0 <= number <= UINT64_MAX:
+        raise ValueError("Z range values must be whole numbers between 0 and 2**64 - 1 for exact hex")
+    return int(number)
+
+
+def _offset_from(z_values, anchor):
+    """Compute z_values - anchor exactly in integer arithmetic, returned as float64."""
+    anchor = np.uint64(anchor)
+    above = z_values >= anchor
+    difference = np.where(above, z_values - anchor, anchor - z_values).astype(np.float64)
+    return np.where(above, difference, -difference)
+
+
+def scale_from_hex(z_values, valid, z_range, output_range):
+    """
+    Scale exact Z integers to another axis.
+
+    The difference from the Z range start is taken in integer arithmetic
+    before converting to float, so nearby addresses at the top of the 64-bit
+    range stay distinct.
+
+    Args:
+        z_values: uint64 array of Z inputs
+        valid: Validity mask of z_values
+        z_range: (z1, z2) as Python ints
+        output_range: (start, end) floats of the target axis
+
+    Returns:
+        tuple: (float64 array, valid mask)
+    """
+    slope = (output_range[1] - output_range[0]) / (z_range[1] - z_range[0])
+    scaled = output_range[0] + slope * _offset_from(z_values, z_range[0])
+    valid = valid & np.isfinite(scaled)
+    return np.where(valid, scaled, 0.0), valid
+
+
+def scale_to_hex(values, valid, input_range, z_range):
+    """
+    Scale float inputs to exact Z integers.
+
+    Each result is the nearer Z range end plus a whole-number offset added
+    in integer arithmetic, so rounding error only grows with the distance
+    from that end. Results are truncated like int() and limited to the
+    unsigned 64-bit range.
+
+    Args:
+        values: float64 array of driving inputs
+        valid: Validity mask of values
+        input_range: (start, end) floats of the driving axis
+        z_range: (z1, z2) as Python ints
+
+    Returns:
+        tuple: (uint64 array, valid mask)
+    """
+    slope = float(z_range[1] - z_range[0]) / (input_range[1] - input_range[0])
+    near_end = np.abs(values - input_range[1]) < np.abs(values - input_range[0])
+    input_anchor = np.where(near_end, input_range[1], input_range[0])
+    anchor = np.where(near_end, np.uint64(z_range[1]), np.uint64(z_range[0]))
+
+    step = np.floor(slope * (values - input_anchor))
+    valid = valid & np.isfinite(step)
+    headroom = (np.uint64(UINT64_MAX) - anchor).astype(np.float64)
+    up = valid & (step >= 0) & (step <= headroom) & (step < 2.0 ** 64)
+    down = valid & (step < 0) & (-step <= anchor.astype(np.float64))
+    step_size = np.where(up | down, np.abs(step), 0.0).astype(np.uint64)
+
+    result = np.where(up, anchor + step_size, np.where(down, anchor - step_size, np.uint64(0)))
+    # Float rounding of the limits can still let a sum wrap around
+    valid = (up & (result >= anchor)) | (down & (result <= anchor))
+    return np.where(valid, result, np.uint64(0)), valid
+
+
+def scale_coordinates_batch_exact_hex(x_inputs, y_inputs, z_inputs, x1, x2, y1, y2, z1, z2, scale_from='x'):
+    """
+    Batch scaling with Z as exact unsigned 64-bit hex integers.
+
+    Arguments match scale_coordinates_batch with z_in_hex set. Z range
+    values must be whole numbers between 0 and 2**64 - 1.
+
+    Returns:
+        dict: Same keys as scale_coordinates_batch, with 'z' as a uint64 array
+
+    Raises:
+        ValueError: If scale_from, the driving inputs or the ranges are invalid
+    """
+    transform = get_scaling_transform(x1, x2, y1, y2, z1, z2, z_in_hex=True)
+    z_range = None
+    if transform.ranges['z'] is not None:
+        z_range = (_exact_integer(z1), _exact_integer(z2))
+        if z_range[0] == z_range[1]:
+            z_range = None
+
+    if scale_from != 'z':
+        result = transform.scale_batch(x_inputs, y_inputs, z_inputs, scale_from)
+        source_range = transform.ranges[scale_from]
+        if source_range is None or z_range is None or (source_range[1] - source_range[0]) == 0:
+            result['z'] = np.zeros(result[scale_from].shape, dtype=np.uint64)
+            result['z_valid'] = np.zeros(result[scale_from].shape, dtype=bool)
+        else:
+            result['z'], result['z_valid'] = scale_to_hex(
+                result[scale_from], result[f"{scale_from}_valid"], source_range, z_range
+            )
+        return result
+
+    if z_inputs is None:
+        raise ValueError("z_inputs are required when scaling from z")
+    z_values, valid = parse_hex_array(z_inputs)
+    result = {'z': z_values, 'z_valid': valid}
+    for axis in ('x', 'y'):
+        output_range = transform.ranges[axis]
+        if output_range is None or z_range is None:
+            result[axis] = np.zeros(z_values.shape)
+            result[f"{axis}_valid"] = np.zeros(z_values.shape, dtype=bool)
+        else:
+            result[axis], result[f"{axis}_valid"] = scale_from_hex(z_values, valid, z_range, output_range)
+    return result
+
+
+def scale_coordinates_exact_hex(x_input, y_input, z_input, x1, x2, y1, y2, z1, z2, scale_from='x'):
+    """
+    Single-point scaling with Z as exact unsigned 64-bit hex integers.
+
+    Inputs and output match scale_coordinates with z_in_hex set.
+
+    Returns:
+        dict: Calculated coordinates as strings
+
+    Raises:
+        ValueError: If scale_from, the driving input or the ranges are invalid
+    """
+    inputs = {'x': x_input, 'y': y_input, 'z': z_input}
+    if scale_from not in inputs:
+        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+
+    result = {'x': '', 'y': '', 'z': ''}
+    result[scale_from] = inputs[scale_from]
+    # Raises for malformed input, like scale_coordinates
+    if validate_and_convert_input(inputs[scale_from], is_hex=(scale_from == 'z')) is None:
+        return result
+
+    batch_inputs = {axis: None for axis in inputs}
+    batch_inputs[scale_from] = [inputs[scale_from]]
+    batch = scale_coordinates_batch_exact_hex(
+        batch_inputs['x'], batch_inputs['y'], batch_inputs['z'],
+        x1, x2, y1, y2, z1, z2, scale_from=scale_from
+    )
+    for axis in inputs:
+        if axis == scale_from or not batch[f"{axis}_valid"][0]:
+            continue
+        if axis == 'z':
+            result[axis] = str(format_hex_array(batch['z'])[0])
+        else:
+            result[axis] = str(float(batch[axis][0]))
+    return result
@@ -0,0 +1,241 @@
+"""
+Calculation history kept in SQLite
+Entries are queued in memory and written in batches by a background thread,
+so recording a calculation costs a list append. Queries are indexed by time,
+driving axis and range set and are paged with a keyset cursor
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Add the backend directory to the path so we can import profiles
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from profiles import RANGE_KEYS, profile_id_for
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".scaling-range", "history.sqlite3")
+MAX_PAGE_SIZE = 500
+
+ENTRY_FIELDS = RANGE_KEYS + ('scale_from', 'input_value', 'output_x', 'output_y', 'output_z', 'z_in_hex')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    range_key TEXT NOT NULL,
+    x1 TEXT NOT NULL, x2 TEXT NOT NULL,
+    y1 TEXT NOT NULL, y2 TEXT NOT NULL,
+    z1 TEXT NOT NULL, z2 TEXT NOT NULL,
+    scale_from TEXT NOT NULL,
+    input_value TEXT NOT NULL,
+    output_x TEXT NOT NULL,
+    output_y TEXT NOT NULL,
+    output_z TEXT NOT NULL,
+    z_in_hex INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS history_scale_from ON history (scale_from, id);
+CREATE INDEX IF NOT EXISTS history_range_key ON history (range_key, id);
+"""
+
+INSERT = (
+    "INSERT INTO history (timestamp, range_key, " + ", ".join(ENTRY_FIELDS) + ") "
+    "VALUES (" + ", ".join("?" * (len(ENTRY_FIELDS) + 2)) + ")"
+)
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class HistoryStore:
+    """
+    Append-mostly calculation history in a SQLite database.
+
+    The database is opened and the writer thread started on first use, so
+    creating a store costs nothing at start-up. Every public method is
+    thread-safe.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, flush_interval=0.5, max_batch=256):
+        """
+        Args:
+            path: SQLite database file
+            flush_interval: Seconds queued entries may wait before being written
+            max_batch: Queued entries that trigger an immediate write
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        # _lock guards the queue and the writer; _db_lock the connection.
+        # Take _db_lock first when both are needed.
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._db_lock = threading.Lock()
+        self._connection = None
+        self._writer = None
+        self._stopping = False
+
+    def _connect(self):
+        """Open the database on first use; _db_lock must be held."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def add(self, entry, timestamp=None):
+        """
+        Queue one calculation for writing.
+
+        Args:
+            entry: Dict with the six range values, scale_from, input_value,
+                output_x, output_y, output_z and z_in_hex
+            timestamp: Seconds since the epoch (defaults to now)
+
+        Raises:
+            ValueError: If scale_from is not an axis
+        """
+        if entry.get('scale_from') not in ('x', 'y', 'z'):
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        ranges = tuple(str(entry.get(key) or "").strip() for key in RANGE_KEYS)
+        row = (
+            time.time() if timestamp is None else timestamp,
+            profile_id_for(ranges),
+            *ranges,
+            entry['scale_from'],
+            *(str(entry.get(name) or "") for name in ('input_value', 'output_x', 'output_y', 'output_z')),
+            int(bool(entry.get('z_in_hex'))),
+        )
+        with self._lock:
+            self._pending.append(row)
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+                self._writer.start()
+            elif len(self._pending) >= self.max_batch:
+                self._wake.notify()
+
+    def _write_pending(self):
+        """Write every queued entry in one transaction; _db_lock must be held."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if rows:
+            connection = self._connect()
+            with connection:
+                connection.executemany(INSERT, rows)
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                if not self._stopping:
+                    self._wake.wait(self.flush_interval)
+                stopping = self._stopping
+            with self._db_lock:
+                self._write_pending()
+            if stopping:
+                return
+
+    def flush(self):
+        """Write queued entries now."""
+        with self._db_lock:
+            self._write_pending()
+
+    def query(self, limit=50, cursor=None, scale_from=None, range_key=None, since=None, until=None):
+        """
+        Get one page of history, newest first.
+
+        Args:
+            limit: Entries per page, up to MAX_PAGE_SIZE
+            cursor: next_cursor of the previous page
+            scale_from: Only entries driven by this axis
+            range_key: Only entries with this range set (see profiles.profile_id_for)
+            since: Only entries at or after this time (seconds since the epoch)
+            until: Only entries before this time
+
+        Returns:
+            dict: 'entries', 'total' (entries matching the filters) and
+            'next_cursor' (None on the last page)
+
+        Raises:
+            ValueError: If limit is out of range
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        conditions, parameters = [], []
+        for column, operator, value in (
+            ('scale_from', '=', scale_from), ('range_key', '=', range_key),
+            ('timestamp', '>=', since), ('timestamp', '<', until),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        page_where = " WHERE " + " AND ".join(conditions + ["id < ?"]) if cursor is not None else where
+        page_parameters = parameters + [cursor] if cursor is not None else parameters
+
+        with self._db_lock:
+            self._write_pending()
+            connection = self._connect()
+            total = connection.execute("SELECT COUNT(*) FROM history" + where, parameters).fetchone()[0]
+            rows = connection.execute(
+                "SELECT id, timestamp, range_key, " + ", ".join(ENTRY_FIELDS) + " FROM history"
+                + page_where + " ORDER BY id DESC LIMIT ?",
+                page_parameters + [limit + 1]
+            ).fetchall()
+
+        entries = [
+            {
+                'id': row[0],
+                'timestamp': _isoformat(row[1]),
+                'range_key': row[2],
+                **dict(zip(ENTRY_FIELDS, row[3:])),
+                'z_in_hex': bool(row[-1]),
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = entries[-1]['id'] if len(rows) > limit else None
+        return {'entries': entries, 'total': total, 'next_cursor': next_cursor}
+
+    def clear(self):
+        """
+        Delete every entry, including queued ones.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        with self._db_lock:
+            self._write_pending()
+            connection = self._connect()
+            with connection:
+                return connection.execute("DELETE FROM history").rowcount
+
+    def close(self):
+        """
+        Write queued entries, stop the writer and close the database.
+
+        The store reopens if it is used again.
+        """
+        with self._lock:
+            writer = self._writer
+            self._stopping = True
+            self._wake.notify()
+        if writer is not None:
+            writer.join()
+        with self._db_lock:
+            self._write_pending()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        with self._lock:
+            self._writer = None
+            self._stopping = False
@@ -0,0 +1,482 @@
+"""
+Background jobs for scaling large files
+Jobs run on a small process pool at a lower CPU priority than the server, so
+they never hold the event loop or the GIL that interactive requests need.
+Each job shares a tiny status block with its worker through shared memory:
+the worker writes its progress after every chunk and stops at the next chunk
+once the cancel flag is set
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, validate_range_inputs
+from point_cloud import DTYPES, open_points, scale_point_file
+from parallel_scaling import _attach_shared_memory
+from scale_file import BINARY_FORMATS, DEFAULT_CHUNK_SIZE, detect_format, scale_stream
+
+JOB_STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+FINISHED_STATES = ('completed', 'failed', 'cancelled')
+EXTENSIONS = {'csv': '.csv', 'ndjson': '.ndjson', 'npy': '.npy', 'raw': '.bin'}
+# Added to the niceness of job workers, so the scheduler favours the server
+WORKER_NICENESS = 10
+
+# Slots of the shared status block
+STARTED, DONE, ROWS, CANCEL = range(4)
+STATUS_SLOTS = 4
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job is cancelled."""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the maximum number of unfinished jobs is reached."""
+
+
+def _lower_priority():
+    """Worker initializer: run below the server's CPU priority."""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(WORKER_NICENESS)
+        except OSError:
+            pass
+
+
+def _run_job(spec, status_name):
+    """
+    Worker entry point: run one job and report through the status block.
+
+    Returns:
+        int: Number of rows or points written
+    """
+    block = _attach_shared_memory(status_name)
+    status = np.ndarray((STATUS_SLOTS,), dtype=np.int64, buffer=block.buf)
+    try:
+        if status[CANCEL]:
+            raise JobCancelled()
+        status[STARTED] = 1
+
+        def report(rows, done=None):
+            if status[CANCEL]:
+                raise JobCancelled()
+            status[ROWS] = rows
+            status[DONE] = rows if done is None else done
+
+        options = dict(scale_from=spec['scale_from'], z_in_hex=spec['z_in_hex'])
+        if spec['format'] in BINARY_FORMATS:
+            return scale_point_file(
+                spec['input_path'], spec['output_path'], spec['ranges'],
+                input_dtype=spec['input_dtype'], output_dtype=spec['output_dtype'],
+                window=spec['chunk_size'], progress=report, **options
+            )
+        with open(spec['input_path'], newline="") as source, open(spec['output_path'], "w", newline="") as target:
+            # Text progress is measured in bytes read, which is known up front
+            return scale_stream(
+                source, target, spec['format'], spec['ranges'],
+                column_names=spec['column_names'], chunk_size=spec['chunk_size'], exact_hex=spec['exact_hex'],
+                progress=lambda rows: report(rows, source.buffer.tell()), **options
+            )
+    finally:
+        # The view has to go before the block can be closed
+        del status
+        block.close()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Job:
+    """
+    One submitted scaling job.
+
+    Status, progress and the result are read from any thread; the final
+    state is written once, by the executor thread that completes the job.
+    """
+
+    def __init__(self, job_id, spec, total, unit, owns_input):
+        self.id = job_id
+        self.spec = spec
+        self.total = total
+        self.unit = unit
+        self.owns_input = owns_input
+        self.created = time.time()
+        self.finished = None
+        self.error = None
+        self._final = None
+        self._rows = 0
+        self._done = 0
+        self._future = None
+        self._lock = threading.Lock()
+        self._finished_event = threading.Event()
+        self._block = shared_memory.SharedMemory(create=True, size=STATUS_SLOTS * 8)
+        self._status = np.ndarray((STATUS_SLOTS,), dtype=np.int64, buffer=self._block.buf)
+        self._status[:] = 0
+
+    @property
+    def status(self):
+        """One of JOB_STATES"""
+        with self._lock:
+            if self._final is not None:
+                return self._final
+            return 'running' if self._status[STARTED] else 'queued'
+
+    @property
+    def output_path(self):
+        """Path of the result file"""
+        return self.spec['output_path']
+
+    def cancel(self):
+        """
+        Ask the job to stop.
+
+        A queued job is dropped right away; a running one stops after its
+        current chunk.
+
+        Returns:
+            bool: False if the job had already finished
+        """
+        with self._lock:
+            if self._final is not None:
+                return False
+            self._status[CANCEL] = 1
+        if self._future is not None:
+            self._future.cancel()
+        return True
+
+    def wait(self, timeout=None):
+        """
+        Block until the job has finished.
+
+        Returns:
+            bool: True if it finished within the timeout
+        """
+        return self._finished_event.wait(timeout)
+
+    def _finish(self, future):
+        """Done callback of the job's future: record the outcome and free the status block."""
+        with self._lock:
+            rows, done = int(self._status[ROWS]), int(self._status[DONE])
+            if future.cancelled():
+                final = 'cancelled'
+            elif isinstance(future.exception(), JobCancelled):
+                final = 'cancelled'
+            elif future.exception() is not None:
+                final = 'failed'
+                self.error = str(future.exception()) or type(future.exception()).__name__
+            else:
+                final = 'completed'
+                rows, done = future.result(), self.total
+            self._rows, self._done = rows, done
+            self._status = None
+            self._block.close()
+            self._block.unlink()
+            self.finished = time.time()
+            self._final = final
+
+        if final != 'completed':
+            _remove(self.output_path)
+        if self.owns_input:
+            _remove(self.spec['input_path'])
+        self._finished_event.set()
+
+    def to_dict(self):
+        """
+        Describe the job for the API.
+
+        Returns:
+            dict: id, status, format, scale_from, rows, done, total, unit
+            ('bytes' for text files, 'points' for point clouds), progress
+            (0 to 1), error, created and finished
+        """
+        with self._lock:
+            status = self._final
+            if status is None:
+                status = 'running' if self._status[STARTED] else 'queued'
+                rows, done = int(self._status[ROWS]), int(self._status[DONE])
+            else:
+                rows, done = self._rows, self._done
+        if self.total:
+            progress = min(done / self.total, 1.0)
+        else:
+            progress = 1.0 if status == 'completed' else 0.0
+        return {
+            'id': self.id,
+            'status': status,
+            'format': self.spec['format'],
+            'scale_from': self.spec['scale_from'],
+            'rows': rows,
+            'done': done,
+            'total': self.total,
+            'unit': self.unit,
+            'progress': progress,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+        }
+
+
+class JobManager:
+    """
+    Admission, execution and bookkeeping for background scaling jobs.
+
+    At most max_pending jobs may be queued or running at once; further
+    submissions raise JobQueueFull. The worker pool is started on first use.
+    """
+
+    def __init__(self, workers=1, max_pending=8, max_finished=100, work_dir=None, input_dir=None):
+        """
+        Args:
+            workers: Number of worker processes running jobs
+            max_pending: Maximum number of queued plus running jobs
+            max_finished: Finished jobs kept before the oldest are removed
+            work_dir: Directory for uploads and results (defaults to a new
+                temporary directory, removed on close)
+            input_dir: Only directory clients may name input files in;
+                None turns client-supplied input paths off
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._work_dir = work_dir
+        self._owns_work_dir = work_dir is None
+        self.input_dir = input_dir
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def work_dir(self):
+        """Directory holding uploads and results, created on first use"""
+        if self._work_dir is None:
+            self._work_dir = tempfile.mkdtemp(prefix="scaling-jobs-")
+        os.makedirs(self._work_dir, exist_ok=True)
+        return self._work_dir
+
+    def _pending(self):
+        return sum(1 for job in self._jobs.values() if job.finished is None)
+
+    def check_capacity(self):
+        """
+        Raises:
+            JobQueueFull: If no more jobs can be admitted right now
+        """
+        with self._lock:
+            if self._pending() >= self.max_pending:
+                raise JobQueueFull(f"Too many unfinished jobs (limit {self.max_pending})")
+
+    def upload_path(self, fmt):
+        """
+        Reserve a file path for an uploaded input.
+
+        Args:
+            fmt: Format of the upload
+
+        Returns:
+            str: Path in the work directory
+
+        Raises:
+            ValueError: If the format is missing or unknown
+            JobQueueFull: If the job could not be admitted anyway
+        """
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"format must be one of {', '.join(EXTENSIONS)} for uploads")
+        self.check_capacity()
+        return os.path.join(self.work_dir, f"upload-{uuid.uuid4().hex}{EXTENSIONS[fmt]}")
+
+    def resolve_input(self, input_path):
+        """
+        Resolve a client-supplied input path inside the input directory.
+
+        Relative paths are taken from the input directory. Symbolic links are
+        followed before the check, so they cannot lead outside it.
+
+        Args:
+            input_path: Path named by the client
+
+        Returns:
+            str: The resolved path
+
+        Raises:
+            ValueError: If no input directory is set or the path is outside it
+        """
+        if not self.input_dir:
+            raise ValueError("Input paths on the server are disabled; upload the file instead")
+        root = os.path.realpath(self.input_dir)
+        path = os.path.realpath(os.path.join(root, input_path))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError("input_path must be inside the job input directory")
+        return path
+
+    def _build_spec(self, job_id, input_path, options):
+        """Validate the options and describe the work for a worker."""
+        if not os.path.isfile(input_path):
+            raise ValueError(f"Input file not found: {input_path}")
+        fmt = options.get('format') or detect_format(input_path)
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        scale_from = options.get('scale_from', 'x')
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        ranges = tuple(options.get(name, "") for name in ('x1', 'x2', 'y1', 'y2', 'z1', 'z2'))
+        z_in_hex = bool(options.get('z_in_hex', False))
+        # Check the ranges here so invalid values fail before any work is queued
+        validate_range_inputs(*ranges)
+        chunk_size = options.get('chunk_size') or DEFAULT_CHUNK_SIZE
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        exact_hex = bool(options.get('exact_hex', False))
+        if exact_hex and fmt in BINARY_FORMATS:
+            raise ValueError("exact_hex is only supported for text formats")
+        for name in ('input_dtype', 'output_dtype'):
+            if options.get(name, 'float64') not in DTYPES:
+                raise ValueError(f"{name} must be one of {', '.join(DTYPES)}")
+
+        spec = {
+            'format': fmt,
+            'input_path': input_path,
+            'output_path': os.path.join(self.work_dir, f"result-{job_id}{EXTENSIONS[fmt]}"),
+            'scale_from': scale_from,
+            'ranges': ranges,
+            'z_in_hex': z_in_hex,
+            'exact_hex': exact_hex,
+            'chunk_size': chunk_size,
+            'column_names': {axis: options.get(f"{axis}_column") or axis for axis in AXES},
+            'input_dtype': options.get('input_dtype', 'float64') if fmt == 'raw' else None,
+            'output_dtype': options.get('output_dtype', 'float64'),
+        }
+        if fmt in BINARY_FORMATS:
+            try:
+                total = open_points(input_path, raw_dtype=spec['input_dtype']).shape[0]
+            except (OSError, ValueError) as e:
+                raise ValueError(f"Cannot read point cloud: {e}")
+            return spec, total, 'points'
+        return spec, os.path.getsize(input_path), 'bytes'
+
+    def submit(self, input_path, options, owns_input=False):
+        """
+        Queue a file scaling job.
+
+        Args:
+            input_path: File to scale
+            options: Dict with format (detected from the extension if
+                omitted), scale_from, the six range values, z_in_hex,
+                exact_hex, x_column / y_column / z_column, input_dtype,
+                output_dtype and chunk_size
+            owns_input: Delete input_path once the job has finished
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            ValueError: If the input or options are invalid
+            JobQueueFull: If too many jobs are unfinished
+        """
+        job_id = uuid.uuid4().hex[:12]
+        try:
+            spec, total, unit = self._build_spec(job_id, input_path, options)
+            with self._lock:
+                if self._pending() >= self.max_pending:
+                    raise JobQueueFull(f"Too many unfinished jobs (limit {self.max_pending})")
+                job = Job(job_id, spec, total, unit, owns_input)
+                self._jobs[job_id] = job
+        except Exception:
+            if owns_input:
+                _remove(input_path)
+            raise
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority)
+        job._future = self._executor.submit(_run_job, spec, job._block.name)
+        job._future.add_done_callback(job._finish)
+        self._prune()
+        return job
+
+    def get(self, job_id):
+        """
+        Look up a job.
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job not found: {job_id}")
+        return job
+
+    def list(self):
+        """All known jobs, oldest first"""
+        return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """
+        Cancel a job.
+
+        Returns:
+            Job: The job
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self.get(job_id)
+        job.cancel()
+        return job
+
+    def remove(self, job_id):
+        """
+        Forget a job, cancelling it first and deleting its result.
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self.get(job_id)
+        job.cancel()
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        if job.finished is not None:
+            _remove(job.output_path)
+
+    def _prune(self):
+        """Remove the oldest finished jobs beyond max_finished."""
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished is not None]
+            expired = finished[:max(len(finished) - self.max_finished, 0)]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            _remove(job.output_path)
+
+    def close(self):
+        """Cancel unfinished jobs, stop the workers and delete job files."""
+        for job in self.list():
+            job.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        for job in self.list():
+            _remove(job.output_path)
+        self._jobs.clear()
+        if self._owns_work_dir and self._work_dir is not None:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = None
@@ -0,0 +1,294 @@
+"""
+HTTP load-testing harness for the FastAPI backend
+Starts the real app with uvicorn on a loopback port (or targets a running
+backend) and drives /scale, /scale/batch and the live WebSocket channel from
+concurrent asyncio workers, reporting throughput and p50/p95/p99 latency
+
+Usage:
+    python load_test.py --concurrency 32 --duration 10 --mix scale=8,batch=1,ws=1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+from websockets.asyncio.client import connect
+
+RANGES = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+REQUEST_KINDS = ('scale', 'batch', 'ws')
+DEFAULT_MIX = {'scale': 1}
+PERCENTILES = (50, 95, 99)
+
+
+class LocalServer:
+    """
+    The backend app served by uvicorn in a child process.
+
+    A separate process keeps the load generator from competing with the
+    server for the GIL. Use as a context manager; the server is answering
+    requests when __enter__ returns.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Args:
+            host: Loopback address to bind
+            port: Port to bind; 0 picks a free one
+        """
+        if port == 0:
+            with socket.socket() as probe:
+                probe.bind((host, 0))
+                port = probe.getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        self._command = [
+            sys.executable, "-m", "uvicorn", "tauri_backend:app",
+            "--host", host, "--port", str(port), "--log-level", "warning"
+        ]
+        self._process = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(self._command, cwd=os.path.dirname(os.path.abspath(__file__)))
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            if self._process.poll() is not None or time.monotonic() > deadline:
+                self.__exit__(None, None, None)
+                raise RuntimeError("Backend server failed to start")
+            time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+
+def parse_mix(text):
+    """
+    Parse a request mix such as "scale=8,batch=1,ws=1".
+
+    Returns:
+        dict: Relative weight for each request kind
+
+    Raises:
+        ValueError: If a kind is unknown or a weight is not a positive number
+    """
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind: {kind} (expected one of {', '.join(REQUEST_KINDS)})")
+        try:
+            mix[kind] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight for {kind}: {weight}")
+        if mix[kind] <= 0:
+            raise ValueError(f"Weight for {kind} must be positive")
+    return mix
+
+
+class _Worker:
+    """One simulated client with its own random stream and WebSocket."""
+
+    def __init__(self, client, base_url, batch_size, seed):
+        self.client = client
+        self.ws_url = "ws" + base_url[len("http"):] + "/ws/scale"
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.socket = None
+        self.seq = 0
+
+    async def scale(self):
+        response = await self.client.post("/scale", json={
+            "x_input": f"{self.random.uniform(0, 10):.4f}", "y_input": "", "z_input": "",
+            "scale_from": "x", **RANGES
+        })
+        response.raise_for_status()
+
+    async def batch(self):
+        response = await self.client.post("/scale/batch", json={
+            "x_inputs": [self.random.uniform(0, 10) for _ in range(self.batch_size)],
+            "scale_from": "x", **RANGES
+        })
+        response.raise_for_status()
+
+    async def ws(self):
+        if self.socket is None:
+            self.socket = await connect(self.ws_url)
+            await self.socket.send(json.dumps({"seq": 0, **RANGES}))
+            await self.socket.recv()
+        self.seq += 1
+        await self.socket.send(json.dumps({"seq": self.seq, "x_input": f"{self.random.uniform(0, 10):.4f}"}))
+        message = json.loads(await self.socket.recv())
+        if "error" in message:
+            raise RuntimeError(message["error"])
+
+    async def close(self):
+        if self.socket is not None:
+            await self.socket.close()
+
+
+async def run_load(base_url, concurrency=16, duration=5.0, requests=None, mix=None, batch_size=100, seed=0):
+    """
+    Drive the backend from concurrent workers and collect latencies.
+
+    Args:
+        base_url: Backend URL, e.g. http://127.0.0.1:8001
+        concurrency: Number of concurrent workers
+        duration: Seconds to run for, when requests is not given
+        requests: Total number of requests to send
+        mix: Relative weight per request kind (see parse_mix)
+        batch_size: Points per /scale/batch request
+        seed: Random seed for the request mix and input values
+
+    Returns:
+        dict: Summary as returned by summarize
+    """
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    latencies = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    remaining = [requests]
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def work(worker):
+            try:
+                while True:
+                    if remaining[0] is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    elif time.perf_counter() >= deadline:
+                        return
+                    kind = worker.random.choices(kinds, weights)[0]
+                    start = time.perf_counter()
+                    try:
+                        await getattr(worker, kind)()
+                    except Exception:
+                        errors[kind] += 1
+                        continue
+                    latencies[kind].append(time.perf_counter() - start)
+            finally:
+                await worker.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            work(_Worker(client, base_url, batch_size, seed + index)) for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed, concurrency)
+
+
+def summarize(latencies, errors, elapsed, concurrency):
+    """
+    Reduce raw latencies to throughput and percentiles.
+
+    Args:
+        latencies: Seconds per successful request, keyed by request kind
+        errors: Failed request count per kind
+        elapsed: Wall time of the run in seconds
+        concurrency: Number of workers used
+
+    Returns:
+        dict: 'elapsed', 'concurrency', and per-kind (plus 'total') request
+        and error counts, requests per second and latency percentiles in ms
+    """
+    def stats(samples, failed):
+        row = {
+            'requests': len(samples),
+            'errors': failed,
+            'throughput': len(samples) / elapsed if elapsed > 0 else 0.0,
+        }
+        for percentile in PERCENTILES:
+            value = np.percentile(samples, percentile) * 1000 if samples else None
+            row[f"p{percentile}_ms"] = value
+        return row
+
+    kinds = {kind: stats(samples, errors[kind]) for kind, samples in latencies.items()}
+    every = [latency for samples in latencies.values() for latency in samples]
+    kinds['total'] = stats(every, sum(errors.values()))
+    return {'elapsed': elapsed, 'concurrency': concurrency, 'kinds': kinds}
+
+
+def format_table(summary):
+    """Render a summary as a text table."""
+    header = f"{'kind':<8}{'requests':>10}{'errors':>8}{'req/s':>12}" + "".join(
+        f"{f'p{percentile} ms':>10}" for percentile in PERCENTILES
+    )
+    lines = [f"{summary['concurrency']} workers, {summary['elapsed']:.2f}s", header]
+    for kind, row in summary['kinds'].items():
+        line = f"{kind:<8}{row['requests']:>10}{row['errors']:>8}{row['throughput']:>12,.1f}"
+        for percentile in PERCENTILES:
+            value = row[f"p{percentile}_ms"]
+            line += f"{value:>10.2f}" if value is not None else f"{'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Load-test the scaling backend")
+    parser.add_argument("--url", help="Target a running backend instead of starting one")
+    parser.add_argument("--port", type=int, default=0, help="Loopback port for the local server (0 = any free port)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run for")
+    parser.add_argument("--requests", type=int, help="Total requests to send (overrides --duration)")
+    parser.add_argument("--mix", default="scale=1", help="Request mix, e.g. scale=8,batch=1,ws=1")
+    parser.add_argument("--batch-size", type=int, default=100, help="Points per /scale/batch request")
+    parser.add_argument("--json", dest="json_path", help="Write the summary as JSON to this file (- for stdout)")
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    def run(url):
+        return asyncio.run(run_load(
+            url, concurrency=args.concurrency, duration=args.duration,
+            requests=args.requests, mix=mix, batch_size=args.batch_size
+        ))
+
+    if args.url:
+        summary = run(args.url.rstrip("/"))
+    else:
+        with LocalServer(port=args.port) as server:
+            summary = run(server.url)
+
+    if args.json_path == "-":
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(format_table(summary))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Dense lookup tables for targets that cannot run the backend
+Evenly spaced inputs are scaled and serialized one chunk at a time as CSV,
+raw binary or C array text, so a table of any size is produced with flat
+memory use and its first bytes are ready as soon as the first chunk is
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, format_hex_array, get_scaling_transform
+
+DEFAULT_CHUNK_SIZE = 65536
+MAX_TABLE_POINTS = 1 << 32
+TABLE_FORMATS = ('csv', 'raw', 'c')
+TABLE_DTYPES = ('float64', 'float32')
+C_TYPES = {'float64': 'double', 'float32': 'float'}
+MEDIA_TYPES = {'csv': 'text/csv', 'raw': 'application/octet-stream', 'c': 'text/x-c'}
+EXTENSIONS = {'csv': '.csv', 'raw': '.bin', 'c': '.h'}
+
+
+def table_inputs(transform, scale_from, count, start=None, step=None):
+    """
+    Work out the first input and the spacing of a table.
+
+    Without start and step the table spans the driving axis's range, from
+    its first value to its second.
+
+    Returns:
+        tuple: (start, step) as floats
+
+    Raises:
+        ValueError: If the driving range is needed but incomplete
+    """
+    if start is None or (step is None and count > 1):
+        source_range = transform.ranges[scale_from]
+        if source_range is None:
+            raise ValueError(f"Give start and step, or a complete {scale_from} range")
+        if start is None:
+            start = source_range[0]
+        if step is None:
+            step = (source_range[1] - start) / (count - 1) if count > 1 else 0.0
+    return float(start), float(step or 0.0)
+
+
+def table_chunks(transform, scale_from, start, step, count, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scale the table one chunk at a time.
+
+    Input i is start + i * step, computed from the index so that rounding
+    does not accumulate along the table.
+
+    Yields:
+        dict: scale_batch result for the next chunk of at most chunk_size points
+    """
+    for offset in range(0, count, chunk_size):
+        index = np.arange(offset, min(offset + chunk_size, count), dtype=np.float64)
+        inputs = {axis: None for axis in AXES}
+        inputs[scale_from] = start + step * index
+        yield transform.scale_batch(inputs['x'], inputs['y'], inputs['z'], scale_from)
+
+
+def _text_columns(result, z_in_hex, invalid):
+    """Format each axis of a chunk as strings, with invalid for points that could not be calculated."""
+    columns = []
+    for axis in AXES:
+        valid = result[f"{axis}_valid"]
+        if axis == 'z' and z_in_hex:
+            values = format_hex_array(result[axis], valid).tolist()
+        else:
+            values = [repr(value) for value in result[axis].tolist()]
+        columns.append([value if ok else invalid for value, ok in zip(values, valid.tolist())])
+    return columns
+
+
+def format_csv(chunks, z_in_hex=False):
+    """
+    Serialize table chunks as CSV with an x,y,z header.
+
+    Yields:
+        str: The header, then the rows of each chunk
+    """
+    yield "x,y,z\n"
+    for result in chunks:
+        yield "".join(f"{x},{y},{z}\n" for x, y, z in zip(*_text_columns(result, z_in_hex, "")))
+
+
+def format_raw(chunks, dtype='float64'):
+    """
+    Serialize table chunks as interleaved little-endian x, y, z values.
+
+    Points that could not be calculated are NaN.
+
+    Yields:
+        bytes: The points of each chunk
+    """
+    element = np.dtype(dtype).newbyteorder('<')
+    for result in chunks:
+        points = np.empty((result['x'].shape[0], 3), dtype=element)
+        for column, axis in enumerate(AXES):
+            points[:, column] = np.where(result[f"{axis}_valid"], result[axis], np.nan)
+        yield points.tobytes()
+
+
+def format_c(chunks, count, z_in_hex=False, dtype='float64', name='scaling_lut'):
+    """
+    Serialize table chunks as a C array definition.
+
+    Points that could not be calculated are NAN from math.h. With z_in_hex,
+    Z values are hex integer literals.
+
+    Yields:
+        str: The declaration, then the rows of each chunk, then the closing brace
+    """
+    yield (
+        f"/* {count} points: x, y, z */\n"
+        "#include <math.h>\n\n"
+        f"#define {name.upper()}_POINTS {count}\n\n"
+        f"static const {C_TYPES[dtype]} {name}[{name.upper()}_POINTS][3] = {{\n"
+    )
+    for result in chunks:
+        yield "".join(f"    {{{x}, {y}, {z}}},\n" for x, y, z in zip(*_text_columns(result, z_in_hex, "NAN")))
+    yield "};\n"
+
+
+def export_table(ranges, count, scale_from='x', start=None, step=None, fmt='csv', z_in_hex=False,
+                 dtype='float64', name='scaling_lut', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate a lookup table request and get a lazy generator of its output.
+
+    Everything is checked before the generator is returned, so errors are
+    raised here instead of part way through the output.
+
+    Args:
+        ranges: Sequence of the six range values (x1, x2, y1, y2, z1, z2)
+        count: Number of points
+        scale_from: 'x', 'y', or 'z' - the axis the inputs are spaced along
+        start: First input (defaults to the start of the driving range)
+        step: Spacing between inputs (defaults to spanning the driving range)
+        fmt: 'csv', 'raw' or 'c'
+        z_in_hex: Write Z as hex (truncated to integers)
+        dtype: 'float64' or 'float32' element type for raw and C output
+        name: C array name
+        chunk_size: Points scaled and serialized per chunk
+
+    Returns:
+        generator: str chunks for CSV and C, bytes chunks for raw
+
+    Raises:
+        ValueError: If any option or range value is invalid
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if dtype not in TABLE_DTYPES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if scale_from not in AXES:
+        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+    if not 1 <= count <= MAX_TABLE_POINTS:
+        raise ValueError(f"count must be between 1 and {MAX_TABLE_POINTS}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if fmt == 'c' and not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise ValueError(f"Invalid C identifier: {name}")
+
+    transform = get_scaling_transform(*ranges, z_in_hex=z_in_hex)
+    start, step = table_inputs(transform, scale_from, count, start, step)
+    if not (np.isfinite(start) and np.isfinite(step)):
+        raise ValueError("start and step must be finite numbers")
+
+    chunks = table_chunks(transform, scale_from, start, step, count, chunk_size)
+    if fmt == 'csv':
+        return format_csv(chunks, z_in_hex)
+    if fmt == 'raw':
+        return format_raw(chunks, dtype)
+    return format_c(chunks, count, z_in_hex, dtype, name)
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Export a dense lookup table for a range set")
+    parser.add_argument("output", help="Output file path, or - for stdout")
+    parser.add_argument("--format", choices=TABLE_FORMATS, help="Table format (detected from the extension by default)")
+    parser.add_argument("--scale-from", choices=AXES, default='x', help="Axis the inputs are spaced along")
+    for name in ('x1', 'x2', 'y1', 'y2', 'z1', 'z2'):
+        parser.add_argument(f"--{name}", default="", help=f"Range value {name}")
+    parser.add_argument("--count", type=int, required=True, help="Number of points")
+    parser.add_argument("--start", type=float, help="First input (defaults to the start of the driving range)")
+    parser.add_argument("--step", type=float, help="Spacing between inputs (defaults to spanning the driving range)")
+    parser.add_argument("--z-in-hex", action="store_true", help="Write Z as hex")
+    parser.add_argument("--dtype", choices=TABLE_DTYPES, default='float64', help="Element type for raw and C output")
+    parser.add_argument("--name", default='scaling_lut', help="C array name")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Points per chunk")
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output)[1].lower()
+        fmt = {'.csv': 'csv', '.bin': 'raw', '.raw': 'raw', '.h': 'c', '.c': 'c'}.get(extension)
+        if fmt is None:
+            print(f"Error: Cannot detect format of {args.output}; use --format", file=sys.stderr)
+            return 1
+
+    try:
+        table = export_table(
+            (args.x1, args.x2, args.y1, args.y2, args.z1, args.z2), args.count,
+            scale_from=args.scale_from, start=args.start, step=args.step, fmt=fmt,
+            z_in_hex=args.z_in_hex, dtype=args.dtype, name=args.name, chunk_size=args.chunk_size
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output == "-":
+        output = sys.stdout.buffer if fmt == 'raw' else sys.stdout
+    else:
+        output = open(args.output, "wb" if fmt == 'raw' else "w", newline="")
+    start = time.perf_counter()
+    try:
+        for chunk in table:
+            output.write(chunk)
+    finally:
+        if args.output == "-":
+            output.flush()
+        else:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    rate = args.count / elapsed if elapsed > 0 else float("inf")
+    print(f"Wrote {args.count} points in {elapsed:.2f}s ({rate:,.0f} points/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
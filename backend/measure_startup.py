@@ -0,0 +1,205 @@
+"""
+Cold start measurement for the backend
+Reports what importing the app costs, broken down by top-level import (from
+python -X importtime), and how long a fresh process takes until it prints the
+ready line the desktop launcher waits for
+
+Usage:
+    python measure_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# Same as tauri_backend.READY_LINE; not imported from there, since that would load the whole app
+READY_LINE = "SCALING_BACKEND_READY"
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(text):
+    """
+    Parse python -X importtime output into per-import timings.
+
+    Args:
+        text: stderr of the importing process
+
+    Returns:
+        list: (module, depth, self_us, cumulative_us) in output order; depth
+        0 is an import made directly by the measured code
+    """
+    prefix = "import time:"
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith(prefix):
+            continue
+        fields = line[len(prefix):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Column header line
+        self_us, cumulative_us, name = fields
+        # Names are indented by one space plus two per nesting level
+        module = name.strip()
+        depth = (len(name.rstrip()) - len(module) - 1) // 2
+        imports.append((module, depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_imports(module="tauri_backend", top=10):
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Args:
+        module: Module to import, from the backend directory
+        top: Number of most expensive top-level imports to return
+
+    Returns:
+        dict: 'wall_ms' of the whole process, 'import_ms' of the module
+        with its imports, 'self_ms' of its own top-level code and 'top' as
+        [module, cumulative ms] pairs
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+    imports = parse_importtime(completed.stderr)
+    # Children are listed before their parent, so collect depth 1 entries
+    # until the module's own depth 0 line
+    total, own, children, pending = 0, 0, [], []
+    for name, depth, self_us, cumulative in imports:
+        if depth == 1:
+            pending.append((name, cumulative))
+        elif depth == 0:
+            if name == module:
+                total, own, children = cumulative, self_us, pending
+            pending = []
+    children.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'wall_ms': wall * 1000,
+        'import_ms': total / 1000,
+        'self_ms': own / 1000,
+        'top': [[name, cumulative / 1000] for name, cumulative in children[:top]],
+    }
+
+
+def _read_lines(stream, lines):
+    """Queue each line of stream, then None at the end of the stream."""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def measure_ready(timeout=30.0, command=None):
+    """
+    Start the backend as the launcher does and time until its ready line.
+
+    stdout is read on a separate thread, so a backend that hangs without
+    printing anything still times out.
+
+    Args:
+        timeout: Seconds to wait for the ready line
+        command: Process to start instead of the backend on a free port
+
+    Returns:
+        float: Milliseconds from spawning the process to READY_LINE on stdout
+
+    Raises:
+        RuntimeError: If the process exits or times out before it is ready
+    """
+    if command is None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        command = [sys.executable, "-c", f"import tauri_backend; tauri_backend.run_server(port={port})"]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    lines = queue.Queue()
+    threading.Thread(target=_read_lines, args=(process.stdout, lines), daemon=True).start()
+    try:
+        deadline = start + timeout
+        while True:
+            try:
+                line = lines.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                raise RuntimeError(f"Backend did not print the ready line within {timeout:g}s")
+            if line is None:
+                raise RuntimeError("Backend exited before printing the ready line")
+            if line.startswith(READY_LINE):
+                return (time.perf_counter() - start) * 1000
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def run(runs=3, top=10):
+    """
+    Measure import and time-to-ready over several fresh processes.
+
+    Returns:
+        dict: Median 'import_ms', 'self_ms', 'process_ms' and 'ready_ms',
+        the raw samples and the top imports of the last run
+    """
+    imports = [measure_imports(top=top) for _ in range(runs)]
+    ready = [measure_ready() for _ in range(runs)]
+    return {
+        'runs': runs,
+        'import_ms': statistics.median(sample['import_ms'] for sample in imports),
+        'self_ms': statistics.median(sample['self_ms'] for sample in imports),
+        'process_ms': statistics.median(sample['wall_ms'] for sample in imports),
+        'ready_ms': statistics.median(ready),
+        'samples': {'import_ms': [sample['import_ms'] for sample in imports], 'ready_ms': ready},
+        'top': imports[-1]['top'],
+    }
+
+
+def format_report(report):
+    """Render a run() report as text."""
+    lines = [
+        f"median of {report['runs']} runs",
+        f"import tauri_backend  {report['import_ms']:>9.1f} ms",
+        f"  its own code        {report['self_ms']:>9.1f} ms",
+        f"python -c import      {report['process_ms']:>9.1f} ms",
+        f"spawn to ready line   {report['ready_ms']:>9.1f} ms",
+        "",
+        "top-level imports (cumulative):",
+    ]
+    lines.extend(f"  {name:<24}{milliseconds:>9.1f} ms" for name, milliseconds in report['top'])
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to ready")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument("--top", type=int, default=10, help="Number of top-level imports to list")
+    parser.add_argument("--json", dest="json_path", help="Write the report as JSON to this file (- for stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(runs=args.runs, top=args.top)
+    if args.json_path == "-":
+        print(json.dumps(report, indent=2))
+        return 0
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+In-process instrumentation for the backend, served in Prometheus text format
+Counters and fixed-bucket histograms are plain integers updated from the event
+loop thread, so recording a request costs a few dict lookups and additions and
+takes no locks
+"""
+
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds; the +Inf bucket is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Upper bounds for counts such as batch sizes
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram:
+    """Cumulative-on-export histogram over a fixed set of buckets."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms with label sets.
+
+    Metrics are declared once with their help text; samples are keyed by a
+    tuple of label values in the declared label order.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _declare(self, name, kind, help_text, labels, buckets=None):
+        if name in self._metrics:
+            raise ValueError(f"Metric {name} is already declared")
+        self._metrics[name] = {'kind': kind, 'help': help_text, 'labels': labels, 'buckets': buckets, 'samples': {}}
+
+    def counter(self, name, help_text, labels=()):
+        """Declare a counter"""
+        self._declare(name, 'counter', help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        """Declare a histogram, with LATENCY_BUCKETS unless other bucket bounds are given"""
+        self._declare(name, 'histogram', help_text, labels, buckets)
+
+    def inc(self, name, *label_values, amount=1):
+        """Add to a counter"""
+        samples = self._metrics[name]['samples']
+        samples[label_values] = samples.get(label_values, 0) + amount
+
+    def observe(self, name, value, *label_values):
+        """Record a histogram observation"""
+        metric = self._metrics[name]
+        samples = metric['samples']
+        histogram = samples.get(label_values)
+        if histogram is None:
+            histogram = samples[label_values] = Histogram(metric['buckets'])
+        histogram.observe(value)
+
+    def value(self, name, *label_values):
+        """
+        Get the current value of a counter, or the Histogram of a histogram.
+
+        Returns:
+            int, Histogram or None: None if nothing was recorded for the labels
+        """
+        return self._metrics[name]['samples'].get(label_values)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text ending in a newline
+        """
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            # Copy first, so samples added while rendering do not break iteration
+            for label_values, sample in list(metric['samples'].items()):
+                labels = _format_labels(metric['labels'], label_values)
+                if metric['kind'] == 'counter':
+                    lines.append(f"{name}{_wrap(labels)} {sample}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(sample.buckets + (float("inf"),), sample.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_labels = labels + ['le="%s"' % le]
+                    lines.append(f"{name}_bucket{_wrap(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_wrap(labels)} {sample.total!r}")
+                lines.append(f"{name}_count{_wrap(labels)} {sample.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values):
+    return [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+
+
+def _wrap(labels):
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def create_registry():
+    """
+    Build the registry with the backend's metrics declared.
+
+    Returns:
+        MetricsRegistry: Registry holding the request, latency, Z format,
+        invalid range and request coalescing metrics
+    """
+    registry = MetricsRegistry()
+    registry.counter("scaling_http_requests_total", "HTTP requests handled", ("method", "endpoint", "status"))
+    registry.counter("scaling_http_errors_total", "HTTP responses with an error status", ("endpoint", "status"))
+    registry.histogram("scaling_http_request_duration_seconds", "HTTP request latency", ("endpoint",))
+    registry.histogram("scaling_request_duration_seconds", "Scaling request latency by driving axis",
+                       ("endpoint", "scale_from"))
+    registry.counter("scaling_z_format_total", "Scaling requests by Z number format", ("format",))
+    registry.counter("scaling_invalid_ranges_total", "Range sets rejected as invalid")
+    registry.histogram("scaling_coalesced_batch_size", "Single-point /scale requests evaluated per coalesced pass",
+                       buckets=SIZE_BUCKETS)
+    registry.histogram("scaling_coalescer_wait_seconds", "Time a /scale request waited for its coalesced pass")
+    return registry
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, errors and latency per endpoint.
+
+    Endpoints are labelled with their route template (e.g. /profiles/{profile_id})
+    so path parameters do not create new series. Handlers can put
+    "scale_from" in the request state to also record the latency per
+    driving axis.
+    """
+
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            registry = self.registry
+            registry.inc("scaling_http_requests_total", scope["method"], endpoint, str(status[0]))
+            if status[0] >= 400:
+                registry.inc("scaling_http_errors_total", endpoint, str(status[0]))
+            registry.observe("scaling_http_request_duration_seconds", elapsed, endpoint)
+            scale_from = scope.get("state", {}).get("scale_from")
+            if scale_from is not None:
+                registry.observe("scaling_request_duration_seconds", elapsed, endpoint, scale_from)
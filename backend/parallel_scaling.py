@@ -0,0 +1,281 @@
+"""
+Multi-core bulk scaling on a process pool
+Input is split into shards that workers read from and write to shared memory
+(or memory-mapped files), so arrays are never pickled and output comes back
+in input order
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, get_scaling_transform, parse_input_array
+from point_cloud import create_points, open_points, scale_column, scale_points
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # points per shard
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing shared memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block with the resource tracker,
+        # which workers share with the parent, so the parent's unlink still
+        # clears the registration
+        return shared_memory.SharedMemory(name=name)
+
+
+def _open_buffer(descriptor, writable):
+    """
+    Open the array described by descriptor.
+
+    Descriptors are small tuples that are cheap to pickle:
+    ('shm', name, shape, dtype), ('npy', path) or ('raw', path, dtype).
+
+    Returns:
+        tuple: (array, shared memory block or None)
+    """
+    kind = descriptor[0]
+    if kind == 'shm':
+        _, name, shape, dtype = descriptor
+        block = _attach_shared_memory(name)
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf), block
+    if kind == 'npy':
+        return np.load(descriptor[1], mmap_mode='r+' if writable else 'r'), None
+    if kind == 'raw':
+        array = np.memmap(descriptor[1], dtype=descriptor[2], mode='r+' if writable else 'r')
+        return array.reshape(-1, 3), None
+    raise ValueError(f"Unknown buffer kind: {kind}")
+
+
+def _scale_shard(source, target, start, stop, ranges, scale_from, z_in_hex):
+    """
+    Worker entry point: scale points[start:stop] into the output buffer.
+
+    A 1-D source holds only the driving column.
+
+    Returns:
+        tuple: (start, stop) of the finished shard
+    """
+    points, in_block = _open_buffer(source, writable=False)
+    out, out_block = _open_buffer(target, writable=True)
+    try:
+        transform = get_scaling_transform(*ranges, z_in_hex=z_in_hex)
+        if points.ndim == 1:
+            scale_column(points[start:stop], out[start:stop], transform, scale_from)
+        else:
+            scale_points(points[start:stop], out[start:stop], transform, scale_from=scale_from)
+        if isinstance(out, np.memmap):
+            out.flush()
+    finally:
+        del points, out
+        for block in (in_block, out_block):
+            if block is not None:
+                block.close()
+    return start, stop
+
+
+class ParallelScaler:
+    """
+    Process pool for scaling large point sets.
+
+    The pool is started on first use and reused until close() is called.
+    """
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            chunk_size: Number of points per shard
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = None
+        # Guards pool creation; callers run on threadpool threads
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    @property
+    def executor(self):
+        """The worker pool, started on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _run(self, source, target, count, ranges, scale_from, z_in_hex):
+        """Submit every shard and wait for all of them."""
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        # Parse the ranges here so invalid values fail before any work is queued
+        get_scaling_transform(*ranges, z_in_hex=z_in_hex)
+
+        futures = [
+            self.executor.submit(
+                _scale_shard, source, target, start, min(start + self.chunk_size, count),
+                tuple(ranges), scale_from, z_in_hex
+            )
+            for start in range(0, count, self.chunk_size)
+        ]
+        for future in futures:
+            future.result()
+
+    def scale_points(self, points, ranges, scale_from='x', z_in_hex=False, output_dtype='float64'):
+        """
+        Scale an (N, 3) point array on the pool.
+
+        Args:
+            points: (N, 3) array of xyz points
+            ranges: Sequence of the six range values (x1, x2, y1, y2, z1, z2)
+            scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+            z_in_hex: Whether Z output should be truncated to integers for hex use
+            output_dtype: 'float32' or 'float64'
+
+        Returns:
+            numpy.ndarray: (N, 3) scaled points, NaN where a value cannot be calculated
+        """
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"Expected an (N, 3) array of points, got shape {points.shape}")
+        return self._scale_shared(points, None, ranges, scale_from, z_in_hex, output_dtype)
+
+    def scale_column(self, values, ranges, scale_from='x', z_in_hex=False, output_dtype='float64', valid=None):
+        """
+        Scale a column of driving values on the pool.
+
+        Only the column is copied to the workers, not a full (N, 3) array.
+
+        Args:
+            values: (N,) driving values
+            valid: Optional (N,) mask; values where it is False give NaN rows
+            Remaining arguments match scale_points
+
+        Returns:
+            numpy.ndarray: (N, 3) scaled points, NaN where a value cannot be calculated
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 1:
+            raise ValueError(f"Expected a 1-D array of values, got shape {values.shape}")
+        return self._scale_shared(values, valid, ranges, scale_from, z_in_hex, output_dtype)
+
+    def _scale_shared(self, inputs, valid, ranges, scale_from, z_in_hex, output_dtype):
+        """Copy inputs into shared memory, scale them on the pool and copy the (N, 3) result out."""
+        count = inputs.shape[0]
+        output_dtype = np.dtype(output_dtype)
+        if count == 0:
+            return np.empty((0, 3), dtype=output_dtype)
+
+        in_block = shared_memory.SharedMemory(create=True, size=inputs.nbytes)
+        out_block = shared_memory.SharedMemory(create=True, size=count * 3 * output_dtype.itemsize)
+        try:
+            shared_in = np.ndarray(inputs.shape, dtype=inputs.dtype, buffer=in_block.buf)
+            shared_in[...] = inputs
+            if valid is not None:
+                shared_in[~np.asarray(valid, dtype=bool)] = np.nan
+            shared_out = np.ndarray((count, 3), dtype=output_dtype, buffer=out_block.buf)
+
+            self._run(
+                ('shm', in_block.name, inputs.shape, inputs.dtype.str),
+                ('shm', out_block.name, (count, 3), output_dtype.str),
+                count, ranges, scale_from, z_in_hex
+            )
+            result = shared_out.copy()
+            del shared_in, shared_out
+        finally:
+            for block in (in_block, out_block):
+                block.close()
+                block.unlink()
+        return result
+
+    def scale_file(self, input_path, output_path, ranges, scale_from='x', z_in_hex=False,
+                   input_dtype=None, output_dtype='float64', raw_output=None):
+        """
+        Scale a binary point cloud file on the pool.
+
+        Workers map the input and output files themselves, so the file
+        contents never pass through this process. Arguments match
+        point_cloud.scale_point_file.
+
+        Returns:
+            int: Number of points written
+        """
+        points = open_points(input_path, raw_dtype=input_dtype)
+        count = points.shape[0]
+        del points
+        if raw_output is None:
+            raw_output = input_dtype is not None
+
+        out = create_points(output_path, count, dtype=output_dtype, raw=raw_output)
+        del out
+        if count == 0:
+            return 0
+
+        source = ('raw', str(input_path), input_dtype) if input_dtype else ('npy', str(input_path))
+        target = ('raw', str(output_path), output_dtype) if raw_output else ('npy', str(output_path))
+        self._run(source, target, count, ranges, scale_from, z_in_hex)
+        return count
+
+
+def scale_points_parallel(points, ranges, scale_from='x', z_in_hex=False, output_dtype='float64',
+                          workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scale an (N, 3) point array on a temporary process pool.
+
+    See ParallelScaler.scale_points for the arguments and return value.
+    """
+    with ParallelScaler(workers=workers, chunk_size=chunk_size) as scaler:
+        return scaler.scale_points(points, ranges, scale_from, z_in_hex, output_dtype)
+
+
+def scale_coordinates_batch_parallel(scaler, x_inputs, y_inputs, z_inputs, x1, x2, y1, y2, z1, z2,
+                                     scale_from='x', z_in_hex=False):
+    """
+    Parallel counterpart of scale_coordinates_batch.
+
+    Args:
+        scaler: ParallelScaler to run the work on
+        Remaining arguments match scale_coordinates_batch
+
+    Returns:
+        dict: Same arrays and validity masks as scale_coordinates_batch
+    """
+    inputs = {'x': x_inputs, 'y': y_inputs, 'z': z_inputs}
+    if scale_from not in AXES:
+        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+    if inputs[scale_from] is None:
+        raise ValueError(f"{scale_from}_inputs are required when scaling from {scale_from}")
+
+    values, valid = parse_input_array(inputs[scale_from], is_hex=(scale_from == 'z' and z_in_hex))
+    scaled = scaler.scale_column(values, (x1, x2, y1, y2, z1, z2), scale_from, z_in_hex, valid=valid)
+
+    result = {}
+    for index, axis in enumerate(AXES):
+        column = scaled[:, index]
+        axis_valid = valid & np.isfinite(column)
+        result[axis] = np.where(axis_valid, column, 0.0)
+        result[f"{axis}_valid"] = axis_valid
+    return result
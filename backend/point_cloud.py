@@ -0,0 +1,195 @@
+"""
+Memory-mapped scaling for binary point clouds
+Handles .npy files and raw interleaved xyz float32/float64 buffers larger than
+RAM by mapping input and output and scaling fixed-size windows in place
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, AffineTransform, compose_affine, get_scaling_transform
+
+DEFAULT_WINDOW = 1 << 20  # points per window
+DTYPES = ('float32', 'float64')
+
+
+def open_points(path, raw_dtype=None):
+    """
+    Memory-map a point cloud for reading.
+
+    Args:
+        path: .npy file, or raw interleaved xyz buffer when raw_dtype is given
+        raw_dtype: 'float32' or 'float64' for raw buffers
+
+    Returns:
+        numpy.ndarray: Read-only (N, 3) view of the file
+
+    Raises:
+        ValueError: If the file does not hold xyz points
+    """
+    if raw_dtype is None:
+        points = np.load(path, mmap_mode='r')
+    else:
+        if raw_dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype: {raw_dtype}")
+        size = os.path.getsize(path)
+        itemsize = np.dtype(raw_dtype).itemsize
+        if size % (3 * itemsize):
+            raise ValueError(f"{path} is not a whole number of xyz {raw_dtype} points")
+        if size == 0:
+            return np.empty((0, 3), dtype=raw_dtype)
+        points = np.memmap(path, dtype=raw_dtype, mode='r').reshape(-1, 3)
+
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(f"Expected an (N, 3) array of points, got shape {points.shape}")
+    if points.dtype.kind not in "iuf":
+        raise ValueError(f"Expected numeric points, got dtype {points.dtype}")
+    return points
+
+
+def create_points(path, count, dtype='float64', raw=False):
+    """
+    Create a memory-mapped (count, 3) output file.
+
+    Args:
+        path: Output path
+        count: Number of points
+        dtype: 'float32' or 'float64'
+        raw: Write a raw interleaved buffer instead of a .npy file
+
+    Returns:
+        numpy.ndarray: Writable (count, 3) view of the file
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if not raw:
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(count, 3))
+    if count == 0:
+        open(path, 'wb').close()
+        return np.empty((0, 3), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=(count, 3))
+
+
+def scale_points(points, out, transform, scale_from='x', window=DEFAULT_WINDOW, progress=None):
+    """
+    Scale an (N, 3) point array into out, one window at a time.
+
+    Every operation writes straight into out, so no full-size temporaries
+    are created. Directions that cannot be scaled and non-finite inputs
+    give NaN.
+
+    Args:
+        points: (N, 3) input array, typically memory-mapped
+        out: (N, 3) output array, typically memory-mapped
+        transform: ScalingTransform holding the range set, or an
+            AffineTransform applied with one matrix multiply per window
+            (scale_from is then ignored)
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        window: Number of points per window
+        progress: Called with the number of points done after each window;
+            an exception it raises stops the run
+
+    Returns:
+        numpy.ndarray: out
+    """
+    if scale_from not in AXES:
+        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+    if points.shape != out.shape:
+        raise ValueError("Input and output must have the same shape")
+
+    if isinstance(transform, AffineTransform):
+        for start in range(0, points.shape[0], window):
+            stop = min(start + window, points.shape[0])
+            transform.apply(points[start:stop], out=out[start:stop])
+            if progress is not None:
+                progress(stop)
+        return out
+
+    source = AXES.index(scale_from)
+    for start in range(0, points.shape[0], window):
+        stop = min(start + window, points.shape[0])
+        scale_column(points[start:stop, source], out[start:stop], transform, scale_from)
+        if progress is not None:
+            progress(stop)
+
+    return out
+
+
+def scale_column(values, out, transform, scale_from='x'):
+    """
+    Scale a column of driving values into an (N, 3) output array.
+
+    The driving value is copied into its own column and every other column
+    is written in place; directions that cannot be scaled give NaN.
+
+    Args:
+        values: (N,) driving values
+        out: (N, 3) output array
+        transform: ScalingTransform holding the range set
+        scale_from: 'x', 'y', or 'z' - which coordinate the values belong to
+
+    Returns:
+        numpy.ndarray: out
+    """
+    source = AXES.index(scale_from)
+    out[:, source] = values
+    for target, axis in enumerate(AXES):
+        if target == source:
+            continue
+        column = out[:, target]
+        coefficients = transform.coefficients(scale_from, axis)
+        if coefficients is None:
+            column.fill(np.nan)
+            continue
+        np.multiply(values, coefficients[0], out=column, casting='same_kind')
+        np.add(column, coefficients[1], out=column)
+        if axis == 'z' and transform.z_in_hex:
+            np.trunc(column, out=column)
+    return out
+
+
+def scale_point_file(input_path, output_path, ranges, scale_from='x', z_in_hex=False,
+                     input_dtype=None, output_dtype='float64', raw_output=None, window=DEFAULT_WINDOW,
+                     stages=(), progress=None):
+    """
+    Scale a binary point cloud file into a new memory-mapped file.
+
+    Args:
+        input_path: .npy file, or raw xyz buffer when input_dtype is given
+        output_path: Output file path
+        ranges: Sequence of the six range values (x1, x2, y1, y2, z1, z2)
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        z_in_hex: Whether Z output should be truncated to integers for hex use
+        input_dtype: 'float32' or 'float64' for raw input buffers
+        output_dtype: 'float32' or 'float64'
+        raw_output: Write a raw buffer; defaults to matching the input kind
+        window: Number of points per window
+        stages: Further (scale_from, ranges) steps applied to the result in
+            order; the whole chain is collapsed into one affine matrix
+        progress: Called with the number of points done after each window
+
+    Returns:
+        int: Number of points written
+    """
+    transform = get_scaling_transform(*ranges, z_in_hex=z_in_hex)
+    if stages:
+        if z_in_hex:
+            raise ValueError("Chained stages do not support hex Z")
+        transform = compose_affine(
+            transform.affine(scale_from),
+            *(get_scaling_transform(*stage_ranges).affine(stage_axis) for stage_axis, stage_ranges in stages)
+        )
+    points = open_points(input_path, raw_dtype=input_dtype)
+    if raw_output is None:
+        raw_output = input_dtype is not None
+
+    out = create_points(output_path, points.shape[0], dtype=output_dtype, raw=raw_output)
+    scale_points(points, out, transform, scale_from=scale_from, window=window, progress=progress)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return points.shape[0]
@@ -0,0 +1,177 @@
+"""
+Registry of named range sets (profiles) with a small JSON store
+A profile is validated and compiled once when it is registered; requests then
+refer to it by ID instead of sending all six range values
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, get_scaling_transform, validate_range_inputs
+
+RANGE_KEYS = ('x1', 'x2', 'y1', 'y2', 'z1', 'z2')
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".scaling-range", "profiles.json")
+
+
+def profile_id_for(ranges):
+    """
+    Derive a stable profile ID from a range set.
+
+    Registering the same ranges twice gives the same ID.
+
+    Args:
+        ranges: Sequence of the six range values
+
+    Returns:
+        str: 12-character hex ID
+    """
+    key = "|".join(str(value).strip() for value in ranges)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+class ProfileStore:
+    """
+    Thread-safe profile registry persisted to a JSON file.
+
+    The whole file is rewritten atomically on every change; it only holds a
+    few dozen small entries.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        Args:
+            path: JSON file to load from and save to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._load()
+
+    def _load(self):
+        """Read the store from disk, skipping entries that no longer validate."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read profile store {self.path}: {e}")
+
+        for entry in entries:
+            try:
+                self._compile(entry['name'], tuple(entry[key] for key in RANGE_KEYS))
+            except (KeyError, ValueError):
+                continue
+
+    def _save(self):
+        """Write the store to disk atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        entries = [
+            {'id': profile_id, 'name': profile['name'], **dict(zip(RANGE_KEYS, profile['ranges']))}
+            for profile_id, profile in self._profiles.items()
+        ]
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _compile(self, name, ranges):
+        """Validate a range set and add it to the in-memory registry."""
+        ranges = tuple(str(value).strip() for value in ranges)
+        validate_range_inputs(*ranges)
+        transforms = {z_in_hex: get_scaling_transform(*ranges, z_in_hex=z_in_hex) for z_in_hex in (False, True)}
+        for axis in AXES:
+            if transforms[False].ranges[axis] is None:
+                raise ValueError(f"Range values for {axis.upper()} must be plain decimal numbers")
+
+        profile_id = profile_id_for(ranges)
+        self._profiles[profile_id] = {'name': name, 'ranges': ranges, 'transforms': transforms}
+        return profile_id
+
+    def register(self, name, x1, x2, y1, y2, z1, z2):
+        """
+        Validate, compile and store a range set.
+
+        Args:
+            name: Display name for the profile
+            x1, x2, y1, y2, z1, z2: Range definitions
+
+        Returns:
+            dict: The stored profile
+
+        Raises:
+            ValueError: If any range value is invalid
+        """
+        with self._lock:
+            profile_id = self._compile(name, (x1, x2, y1, y2, z1, z2))
+            self._save()
+            return self._describe(profile_id)
+
+    def get(self, profile_id):
+        """
+        Look up a profile.
+
+        Returns:
+            dict: name, ranges and compiled transforms keyed by z_in_hex
+
+        Raises:
+            KeyError: If the profile does not exist
+        """
+        try:
+            return self._profiles[profile_id]
+        except KeyError:
+            raise KeyError(f"Unknown profile: {profile_id}")
+
+    def transform(self, profile_id, z_in_hex=False):
+        """
+        Get the compiled ScalingTransform of a profile.
+
+        Raises:
+            KeyError: If the profile does not exist
+        """
+        return self.get(profile_id)['transforms'][bool(z_in_hex)]
+
+    def describe(self, profile_id):
+        """
+        Get the public description of a profile.
+
+        Raises:
+            KeyError: If the profile does not exist
+        """
+        self.get(profile_id)
+        return self._describe(profile_id)
+
+    def _describe(self, profile_id):
+        profile = self._profiles[profile_id]
+        return {'id': profile_id, 'name': profile['name'], **dict(zip(RANGE_KEYS, profile['ranges']))}
+
+    def list(self):
+        """
+        List every stored profile.
+
+        Returns:
+            list: Profile descriptions sorted by name
+        """
+        with self._lock:
+            profiles = [self._describe(profile_id) for profile_id in self._profiles]
+        return sorted(profiles, key=lambda profile: (profile['name'], profile['id']))
+
+    def delete(self, profile_id):
+        """
+        Remove a profile.
+
+        Raises:
+            KeyError: If the profile does not exist
+        """
+        with self._lock:
+            self.get(profile_id)
+            del self._profiles[profile_id]
+            self._save()
@@ -0,0 +1,128 @@
+"""
+Bounded, TTL-aware cache of computed responses
+Entries are evicted least-recently-used first once the cache is full and are
+dropped when they are older than the TTL. Every entry carries an ETag derived
+from the response body, so clients can revalidate with If-None-Match
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+
+def etag_for(body):
+    """
+    Derive a strong ETag from a JSON-serializable response body.
+
+    Returns:
+        str: Quoted ETag value
+    """
+    text = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(text.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header value against an ETag.
+
+    Handles lists of tags, weak tags (W/"...") and "*".
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    LRU response cache with a time-to-live.
+
+    Only used from the event loop thread, so it takes no locks.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of entries; 0 disables the cache
+            ttl: Seconds an entry stays valid
+            clock: Time source, replaceable in tests
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize cannot be negative")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Look up a live entry.
+
+        Returns:
+            tuple or None: (etag, body), or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, etag, body = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return etag, body
+
+    def put(self, key, body):
+        """
+        Store a response body.
+
+        Returns:
+            str: The body's ETag
+        """
+        etag = etag_for(body)
+        if self.maxsize == 0:
+            return etag
+        self._entries[key] = (self._clock() + self.ttl, etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return etag
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def info(self):
+        """
+        Get hit ratio and eviction statistics.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, expirations, size,
+            maxsize and ttl
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+        }
@@ -0,0 +1,275 @@
+"""
+Length-prefixed JSON-RPC 2.0 over Unix domain sockets and stdio
+Each message is a 4-byte big-endian length followed by that many bytes of
+UTF-8 JSON. A connection reads requests continuously and answers each one as
+soon as it is done, so clients can pipeline many requests and match the
+responses by id
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 << 20
+
+# JSON-RPC 2.0 error codes; application errors use the HTTP status of the same failure
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class RpcError(Exception):
+    """An error answered to the client instead of a result."""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self):
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None:
+            error['data'] = self.data
+        return error
+
+
+def encode_frame(message):
+    """
+    Serialize a message into one frame.
+
+    Returns:
+        bytes: Length prefix and JSON body
+    """
+    body = json.dumps(message, separators=(',', ':')).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    """
+    Read the next frame body from a stream.
+
+    Returns:
+        bytes or None: The JSON body, or None at the end of the stream
+
+    Raises:
+        ValueError: If the frame is larger than MAX_FRAME_SIZE
+        asyncio.IncompleteReadError: If the stream ends inside a frame
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return await reader.readexactly(size)
+
+
+class JsonRpcServer:
+    """
+    Serves a table of async methods to framed JSON-RPC connections.
+
+    Methods take the request's params (a dict, or {} when omitted) and
+    return a JSON-serializable result; they report failures by raising
+    RpcError. Requests without an id are notifications and get no answer.
+    """
+
+    def __init__(self, methods):
+        """
+        Args:
+            methods: Dict mapping method names to async callables
+        """
+        self.methods = methods
+
+    async def handle(self, body):
+        """
+        Answer one request body.
+
+        Returns:
+            dict or None: The response, or None for a notification, even one
+            that fails; unparseable or invalid requests are always answered
+        """
+        request_id = None
+        notification = False
+        try:
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                raise RpcError(PARSE_ERROR, f"Parse error: {e}")
+            if not isinstance(request, dict) or request.get('jsonrpc') != "2.0" or not isinstance(request.get('method'), str):
+                raise RpcError(INVALID_REQUEST, "Invalid request")
+            request_id = request.get('id')
+            notification = 'id' not in request
+            method = self.methods.get(request['method'])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            params = request.get('params', {})
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            result = await method(params)
+            if notification:
+                return None
+            return {'jsonrpc': "2.0", 'id': request_id, 'result': result}
+        except RpcError as e:
+            if notification:
+                return None
+            return {'jsonrpc': "2.0", 'id': request_id, 'error': e.to_dict()}
+        except Exception as e:
+            if notification:
+                return None
+            return {'jsonrpc': "2.0", 'id': request_id, 'error': {'code': 500, 'message': f"Internal server error: {e}"}}
+
+    async def serve_connection(self, reader, writer):
+        """
+        Answer the requests of one connection until the client closes it.
+
+        Every request runs as its own task, so a slow request does not hold
+        up the ones pipelined behind it.
+        """
+        tasks = set()
+
+        async def answer(body):
+            response = await self.handle(body)
+            if response is not None:
+                writer.write(encode_frame(response))
+                await writer.drain()
+
+        try:
+            while True:
+                body = await read_frame(reader)
+                if body is None:
+                    break
+                task = asyncio.create_task(answer(body))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            # A broken frame leaves no way to find the next one, so the connection is dropped
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def serve_unix(self, path, on_ready=None):
+        """
+        Listen on a Unix domain socket until cancelled.
+
+        A stale socket file from an earlier run is replaced. The socket is
+        only accessible to the current user.
+
+        Args:
+            path: Socket file path
+            on_ready: Called once the socket accepts connections
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self.serve_connection, path=path)
+        os.chmod(path, 0o600)
+        try:
+            if on_ready is not None:
+                on_ready()
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    async def serve_stdio(self, ready_notification=True):
+        """
+        Serve the single connection formed by stdin and stdout until stdin closes.
+
+        Frames are written to the original stdout; file descriptor 1 is
+        pointed at stderr first, so stray prints (including from child
+        processes) cannot corrupt the channel.
+
+        Args:
+            ready_notification: Send a "ready" notification before reading requests
+        """
+        loop = asyncio.get_running_loop()
+        output = os.fdopen(os.dup(sys.stdout.fileno()), "wb", buffering=0)
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+        reader = asyncio.StreamReader(limit=MAX_FRAME_SIZE)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, output)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        if ready_notification:
+            writer.write(encode_frame({'jsonrpc': "2.0", 'method': "ready"}))
+        await self.serve_connection(reader, writer)
+
+
+class RpcClient:
+    """
+    Client for one framed JSON-RPC connection.
+
+    Calls may be issued concurrently; they are pipelined on the connection
+    and each awaits its own response, matched by id.
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Args:
+            reader, writer: asyncio streams of an open connection (a Unix
+                socket, or the stdout and stdin of a --transport stdio backend)
+        """
+        self._writer = writer
+        self._next_id = 0
+        self._pending = {}
+        self._reader_task = asyncio.create_task(self._read_responses(reader))
+
+    async def _read_responses(self, reader):
+        try:
+            while True:
+                body = await read_frame(reader)
+                if body is None:
+                    break
+                response = json.loads(body)
+                future = self._pending.pop(response.get('id'), None)
+                if future is None or future.done():
+                    # Notifications such as "ready", or answers nobody waits for
+                    continue
+                if 'error' in response:
+                    error = response['error']
+                    future.set_exception(RpcError(error['code'], error['message'], error.get('data')))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("JSON-RPC connection closed"))
+            self._pending.clear()
+
+    async def call(self, method, params=None):
+        """
+        Call a method and wait for its result.
+
+        Raises:
+            RpcError: If the server answers with an error
+            ConnectionError: If the connection closes first
+        """
+        if self._reader_task.done():
+            raise ConnectionError("JSON-RPC connection closed")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode_frame({'jsonrpc': "2.0", 'id': request_id, 'method': method, 'params': params or {}}))
+        await self._writer.drain()
+        return await future
+
+    async def close(self):
+        """Close the connection and stop reading responses."""
+        self._writer.close()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except (asyncio.CancelledError, Exception):
+            pass
@@ -0,0 +1,358 @@
+"""
+Streaming file scaling for large CSV and NDJSON coordinate dumps
+Rows flow through a generator pipeline (read -> parse -> scale -> format -> write)
+one chunk at a time, so memory use stays flat regardless of file size.
+Binary .npy and raw xyz point clouds are handed to point_cloud.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import AXES, format_hex_array, scale_coordinates_batch
+from hex_exact import scale_coordinates_batch_exact_hex
+from point_cloud import DTYPES, scale_point_file
+from parallel_scaling import ParallelScaler
+
+DEFAULT_CHUNK_SIZE = 65536
+FORMATS = ('csv', 'ndjson')
+BINARY_FORMATS = ('npy', 'raw')
+
+
+def detect_format(path):
+    """
+    Guess the file format from its extension.
+
+    Args:
+        path: File path
+
+    Returns:
+        str: 'csv', 'ndjson', 'npy' or 'raw'
+
+    Raises:
+        ValueError: If the extension is not recognised
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.csv', '.txt'):
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    if extension == '.npy':
+        return 'npy'
+    if extension in ('.bin', '.raw'):
+        return 'raw'
+    raise ValueError(f"Cannot detect format of {path}; use --format")
+
+
+def read_chunks(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Group an iterator of records into lists of at most chunk_size.
+
+    Args:
+        records: Iterator of CSV rows or NDJSON lines
+        chunk_size: Maximum number of records per chunk
+
+    Yields:
+        list: The next chunk of records
+    """
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_chunks(chunks, fmt, column):
+    """
+    Extract the driving column from each chunk.
+
+    Args:
+        chunks: Iterator of record chunks from read_chunks
+        fmt: 'csv' or 'ndjson'
+        column: Column index (CSV) or key (NDJSON) of the driving axis
+
+    Yields:
+        tuple: (records, inputs) where records are CSV rows or NDJSON dicts
+    """
+    for chunk in chunks:
+        if fmt == 'csv':
+            inputs = [row[column] if column < len(row) else "" for row in chunk]
+            yield chunk, inputs
+        else:
+            records = [json.loads(line) for line in chunk if line.strip()]
+            if not all(isinstance(record, dict) for record in records):
+                raise ValueError("NDJSON records must be objects")
+            yield records, [record.get(column) for record in records]
+
+
+def scale_chunks(parsed, ranges, scale_from='x', z_in_hex=False, exact_hex=False):
+    """
+    Scale each parsed chunk in one vectorized pass.
+
+    Args:
+        parsed: Iterator of (records, inputs) from parse_chunks
+        ranges: Sequence of the six range values (x1, x2, y1, y2, z1, z2)
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        z_in_hex: Whether Z values are hexadecimal
+        exact_hex: Keep hex Z values as exact 64-bit integers
+
+    Yields:
+        tuple: (records, result) where result comes from scale_coordinates_batch
+    """
+    for records, inputs in parsed:
+        batch_inputs = {axis: None for axis in AXES}
+        batch_inputs[scale_from] = inputs
+        if z_in_hex and exact_hex:
+            result = scale_coordinates_batch_exact_hex(
+                batch_inputs['x'], batch_inputs['y'], batch_inputs['z'],
+                *ranges, scale_from=scale_from
+            )
+        else:
+            result = scale_coordinates_batch(
+                batch_inputs['x'], batch_inputs['y'], batch_inputs['z'],
+                *ranges, scale_from=scale_from, z_in_hex=z_in_hex
+            )
+        yield records, result
+
+
+def _formatted_column(result, axis, z_in_hex, empty):
+    """Convert one result axis to output values, using empty for invalid points."""
+    valid = result[f"{axis}_valid"]
+    if axis == 'z' and z_in_hex:
+        values = format_hex_array(result[axis], valid).tolist()
+    else:
+        values = result[axis].tolist()
+    return [v if ok else empty for v, ok in zip(values, valid.tolist())]
+
+
+def format_chunks(scaled, fmt, columns, scale_from='x', z_in_hex=False):
+    """
+    Write calculated coordinates back into the records and serialize them.
+
+    The driving column is left untouched. Points that could not be
+    calculated are written as empty strings (CSV) or null (NDJSON).
+
+    Args:
+        scaled: Iterator of (records, result) from scale_chunks
+        fmt: 'csv' or 'ndjson'
+        columns: Dict mapping each axis to its column index (CSV) or key (NDJSON)
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        z_in_hex: Whether Z output should be in hexadecimal
+
+    Yields:
+        tuple: (text, row_count) for each chunk
+    """
+    targets = [axis for axis in AXES if axis != scale_from]
+    for records, result in scaled:
+        empty = "" if fmt == 'csv' else None
+        outputs = {axis: _formatted_column(result, axis, z_in_hex, empty) for axis in targets}
+
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            for i, row in enumerate(records):
+                for axis in targets:
+                    index = columns[axis]
+                    if index >= len(row):
+                        row.extend([""] * (index + 1 - len(row)))
+                    row[index] = outputs[axis][i]
+            csv.writer(buffer, lineterminator="\n").writerows(records)
+            yield buffer.getvalue(), len(records)
+        else:
+            lines = []
+            for i, record in enumerate(records):
+                for axis in targets:
+                    record[columns[axis]] = outputs[axis][i]
+                lines.append(json.dumps(record))
+            yield "".join(line + "\n" for line in lines), len(records)
+
+
+def scale_stream(input_stream, output_stream, fmt, ranges, scale_from='x', z_in_hex=False,
+                 column_names=None, chunk_size=DEFAULT_CHUNK_SIZE, exact_hex=False, progress=None):
+    """
+    Scale every record of a CSV or NDJSON stream.
+
+    Args:
+        input_stream: Text stream to read from
+        output_stream: Text stream to write to
+        fmt: 'csv' or 'ndjson'
+        ranges: Sequence of the six range values (x1, x2, y1, y2, z1, z2)
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        z_in_hex: Whether Z values are hexadecimal
+        column_names: Dict mapping each axis to its column name; defaults to the axis name
+        chunk_size: Number of records processed per chunk
+        exact_hex: Keep hex Z values as exact 64-bit integers
+        progress: Called with the number of records written after each
+            chunk; an exception it raises stops the run
+
+    Returns:
+        int: Number of records written
+
+    Raises:
+        ValueError: If the format, axis or driving column is invalid
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if scale_from not in AXES:
+        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+
+    names = {axis: axis for axis in AXES}
+    names.update(column_names or {})
+
+    if fmt == 'csv':
+        reader = csv.reader(input_stream)
+        header = next(reader, None)
+        if header is None:
+            return 0
+        if names[scale_from] not in header:
+            raise ValueError(f"Column '{names[scale_from]}' not found in CSV header")
+        for axis in AXES:
+            if names[axis] not in header:
+                header.append(names[axis])
+        columns = {axis: header.index(names[axis]) for axis in AXES}
+        csv.writer(output_stream, lineterminator="\n").writerow(header)
+        records = reader
+    else:
+        columns = names
+        records = input_stream
+
+    pipeline = read_chunks(records, chunk_size)
+    pipeline = parse_chunks(pipeline, fmt, columns[scale_from])
+    pipeline = scale_chunks(pipeline, ranges, scale_from, z_in_hex, exact_hex)
+    pipeline = format_chunks(pipeline, fmt, columns, scale_from, z_in_hex)
+
+    total = 0
+    for text, count in pipeline:
+        output_stream.write(text)
+        total += count
+        if progress is not None:
+            progress(total)
+    return total
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Scale coordinates in a CSV, NDJSON or binary point cloud file")
+    parser.add_argument("input", help="Input file path, or - for stdin (text formats only)")
+    parser.add_argument("output", help="Output file path, or - for stdout (text formats only)")
+    parser.add_argument("--format", choices=FORMATS + BINARY_FORMATS, help="File format (detected from the extension by default)")
+    parser.add_argument("--scale-from", choices=AXES, default='x', help="Axis that drives scaling")
+    for name in ('x1', 'x2', 'y1', 'y2', 'z1', 'z2'):
+        parser.add_argument(f"--{name}", default="", help=f"Range value {name}")
+    parser.add_argument("--z-in-hex", action="store_true", help="Treat Z values as hexadecimal")
+    parser.add_argument("--exact-hex", action="store_true", help="Keep hex Z values as exact 64-bit integers (text formats)")
+    for axis in AXES:
+        parser.add_argument(f"--{axis}-column", default=axis, help=f"Column holding {axis.upper()} values")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per chunk")
+    parser.add_argument("--input-dtype", choices=DTYPES, default='float64', help="Element type of raw input buffers")
+    parser.add_argument("--output-dtype", choices=DTYPES, default='float64', help="Element type of binary output")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for binary formats (0 = one per CPU)")
+    parser.add_argument("--then", action="append", type=parse_stage, default=[], metavar="AXIS:X1,X2,Y1,Y2,Z1,Z2",
+                        help="Scale the result again from AXIS with another range set (binary formats, repeatable)")
+    return parser
+
+
+def parse_stage(text):
+    """
+    Parse a --then value such as "y:0,10,0,100,0,50".
+
+    Returns:
+        tuple: (scale_from, six range strings)
+    """
+    axis, _, values = text.partition(":")
+    ranges = tuple(value.strip() for value in values.split(","))
+    if axis not in AXES or len(ranges) != 6:
+        raise argparse.ArgumentTypeError(f"expected AXIS:X1,X2,Y1,Y2,Z1,Z2, got {text!r}")
+    return axis, ranges
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        path = args.input if args.input != "-" else args.output
+        try:
+            fmt = detect_format(path)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+    ranges = (args.x1, args.x2, args.y1, args.y2, args.z1, args.z2)
+    column_names = {axis: getattr(args, f"{axis}_column") for axis in AXES}
+
+    if fmt in BINARY_FORMATS:
+        return _scale_binary(args, fmt, ranges)
+    if args.workers != 1 or args.then:
+        print("Error: --workers and --then are only supported for binary formats", file=sys.stderr)
+        return 1
+
+    input_stream = output_stream = None
+    start = time.perf_counter()
+    try:
+        input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+        output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+        rows = scale_stream(
+            input_stream, output_stream, fmt, ranges,
+            scale_from=args.scale_from, z_in_hex=args.z_in_hex,
+            column_names=column_names, chunk_size=args.chunk_size, exact_hex=args.exact_hex
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if input_stream not in (None, sys.stdin):
+            input_stream.close()
+        if output_stream not in (None, sys.stdout):
+            output_stream.close()
+
+    _report(rows, start)
+    return 0
+
+
+def _scale_binary(args, fmt, ranges):
+    """Run a memory-mapped binary point cloud job for main"""
+    if "-" in (args.input, args.output):
+        print("Error: binary formats need file paths", file=sys.stderr)
+        return 1
+
+    options = dict(
+        scale_from=args.scale_from, z_in_hex=args.z_in_hex,
+        input_dtype=args.input_dtype if fmt == 'raw' else None,
+        output_dtype=args.output_dtype
+    )
+    start = time.perf_counter()
+    try:
+        if args.then and args.workers != 1:
+            raise ValueError("--then cannot be combined with --workers")
+        if args.workers == 1:
+            rows = scale_point_file(args.input, args.output, ranges, window=args.chunk_size, stages=args.then, **options)
+        else:
+            with ParallelScaler(workers=args.workers or None, chunk_size=args.chunk_size) as scaler:
+                rows = scaler.scale_file(args.input, args.output, ranges, **options)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    _report(rows, start)
+    return 0
+
+
+def _report(rows, start):
+    """Print throughput for a finished run"""
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Scaled {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,17 @@ Pure scaling logic without GUI dependencies
 Extracted from the original scaling.py application
 """
 
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+AXES = ('x', 'y', 'z')
+
+# Number of compiled range sets kept by get_scaling_transform
+TRANSFORM_CACHE_SIZE = 256
+
+
 def calculate_scaled_value(input_value, input_start, input_end, output_start, output_end):
     """
     Calculate scaled value using linear scaling formula.
@@ -51,11 +62,8 @@ def validate_and_convert_input(value_str, is_hex=False):
     
     # Handle hexadecimal conversion for Z values
     if is_hex:
-        if value_str.startswith("0x"):
-            value_str = value_str[2:]
-        
         try:
-            decimal_value = int(value_str, 16)
+            decimal_value = _parse_hex_int(value_str)
             return float(decimal_value)
         except ValueError:
             raise ValueError("Invalid hexadecimal input!")
@@ -67,6 +75,13 @@ def validate_and_convert_input(value_str, is_hex=False):
         raise ValueError("Invalid decimal input!")
 
 
+def _parse_hex_int(value_str):
+    """Parse hex text to an int, as validate_and_convert_input reads it; raises ValueError."""
+    if value_str.startswith("0x"):
+        value_str = value_str[2:]
+    return int(value_str, 16)
+
+
 def convert_to_hex_if_needed(value, use_hex=False):
     """
     Convert value to hex string if hex format is requested.
@@ -83,146 +98,935 @@ def convert_to_hex_if_needed(value, use_hex=False):
     return value
 
 
-def scale_coordinates(x_input, y_input, z_input, x1, x2, y1, y2, z1, z2, scale_from='x', z_in_hex=False):
+def scale_coordinates(x_input, y_input, z_input, x1, x2, y1, y2, z1, z2, scale_from='x', z_in_hex=False,
+                      breakpoints=None, extrapolate=True, timer=None):
     """
     Perform scaling based on selected axis.
     
+    The range set is compiled into a ScalingTransform once and reused from
+    an LRU cache for later calls with the same ranges.
+    
     Args:
         x_input, y_input, z_input: Input coordinates
         x1, x2, y1, y2, z1, z2: Range definitions
         scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
         z_in_hex: Whether Z output should be in hexadecimal
+        breakpoints: Optional dict of per-axis breakpoint lists; when given,
+            the piecewise-linear curves replace the two-point ranges
+        extrapolate: With breakpoints, extend the end segments instead of
+            clamping to the end values
+        timer: Optional StageTimer (see timing.py); laps "ranges",
+            "input", "math" and "format"
         
     Returns:
         dict: Calculated coordinates
     """
-    # Validate and convert range inputs to numbers, but allow some to be empty
-    range_values = [x1, x2, y1, y2, z1, z2]
+    if breakpoints is not None:
+        transform = get_piecewise_transform(breakpoints, z_in_hex, extrapolate)
+    else:
+        transform = get_scaling_transform(x1, x2, y1, y2, z1, z2, z_in_hex)
+    if timer is not None:
+        timer.lap("ranges")
+    return transform.scale(x_input, y_input, z_input, scale_from, timer=timer)
+
+
+def validate_range_inputs(x1, x2, y1, y2, z1, z2):
+    """
+    Validate that range inputs are valid numbers.
     
-    # Try to validate each range pair separately
-    x_range_valid = x1 and x2 and x1.strip() and x2.strip() and all(not (v is None or v.strip() == "" or not str(v).strip()) for v in [x1, x2]) and all(not (not str(v).strip() or not str(v).strip().replace('.', '').replace('-', '').isdigit()) for v in [x1, x2])
-    y_range_valid = y1 and y2 and y1.strip() and y2.strip() and all(not (v is None or v.strip() == "" or not str(v).strip()) for v in [y1, y2]) and all(not (not str(v).strip() or not str(v).strip().replace('.', '').replace('-', '').isdigit()) for v in [y1, y2])
-    z_range_valid = z1 and z2 and z1.strip() and z2.strip() and all(not (v is None or v.strip() == "" or not str(v).strip()) for v in [z1, z2]) and all(not (not str(v).strip() or not str(v).strip().replace('.', '').replace('-', '').isdigit()) for v in [z1, z2])
+    Args:
+        x1, x2, y1, y2, z1, z2: Range definition values
+        
+    Returns:
+        tuple: Validated float values
+        
+    Raises:
+        ValueError: If any input is invalid
+    """
+    inputs = [x1, x2, y1, y2, z1, z2]
+    validated = []
     
-    # Convert to numbers if valid
+    for i, inp in enumerate(inputs):
+        if inp is None:
+            inp = ""
+        
+        # Convert to string and strip whitespace
+        inp_str = str(inp).strip()
+        
+        if inp_str == "":
+            raise ValueError(f"Range value {['x1', 'x2', 'y1', 'y2', 'z1', 'z2'][i]} cannot be empty")
+        
+        try:
+            validated.append(float(inp_str))
+        except ValueError:
+            raise ValueError(f"Invalid range value: {['x1', 'x2', 'y1', 'y2', 'z1', 'z2'][i]}")
+    
+    return tuple(validated)
+
+
+def _is_range_string_valid(value):
+    """
+    Check whether a range string looks like a plain decimal number.
+
+    Mirrors the range checks used by scale_coordinates so that the batch
+    path accepts and rejects exactly the same range sets.
+    """
+    if not value or not value.strip():
+        return False
+    return value.strip().replace('.', '').replace('-', '').isdigit()
+
+
+def _parse_range_pair(start, end):
+    """
+    Convert a range pair to floats.
+
+    Returns:
+        tuple or None: (start, end) as floats, or None if the pair is incomplete
+
+    Raises:
+        ValueError: If a value passes the basic checks but is not a number
+    """
+    if not (_is_range_string_valid(start) and _is_range_string_valid(end)):
+        return None
     try:
-        x1_num = float(x1) if x_range_valid and x1 and x1.strip() else None
-        x2_num = float(x2) if x_range_valid and x2 and x2.strip() else None
-        y1_num = float(y1) if y_range_valid and y1 and y1.strip() else None
-        y2_num = float(y2) if y_range_valid and y2 and y2.strip() else None
-        z1_num = float(z1) if z_range_valid and z1 and z1.strip() else None
-        z2_num = float(z2) if z_range_valid and z2 and z2.strip() else None
+        return float(start), float(end)
     except ValueError:
         raise ValueError("Invalid range values provided")
 
-    if scale_from == 'x':
-        input_val = validate_and_convert_input(x_input)
-        if input_val is None:
-            return {'x': x_input, 'y': '', 'z': ''}
+
+def _direction_coefficients(source_range, target_range):
+    """
+    Get the (slope, intercept) mapping one parsed range onto another.
+
+    Returns:
+        tuple or None: None if either range is incomplete or the source range is zero
+    """
+    if source_range is None or target_range is None:
+        return None
+    if (source_range[1] - source_range[0]) == 0:
+        return None
+    slope = (target_range[1] - target_range[0]) / (source_range[1] - source_range[0])
+    intercept = target_range[0] - (slope * source_range[0])
+    return slope, intercept
+
+
+class ScalingTransform:
+    """
+    A range set compiled for repeated scaling.
+    
+    Slope and intercept are precomputed for all six axis-pair directions so
+    scaling a value only costs one multiply and one add. Directions whose
+    ranges are incomplete or whose input range is zero have no coefficients
+    and produce an empty result, as scale_coordinates always has.
+    """
+    
+    __slots__ = ('ranges', 'z_in_hex', '_coefficients', '_matrices')
+    
+    def __init__(self, x1, x2, y1, y2, z1, z2, z_in_hex=False):
+        """
+        Args:
+            x1, x2, y1, y2, z1, z2: Range definitions as strings
+            z_in_hex: Whether Z values are hexadecimal
+            
+        Raises:
+            ValueError: If a range value passes the basic checks but is not a number
+        """
+        self.ranges = {
+            'x': _parse_range_pair(x1, x2),
+            'y': _parse_range_pair(y1, y2),
+            'z': _parse_range_pair(z1, z2),
+        }
+        self.z_in_hex = z_in_hex
+        self._coefficients = {}
         
-        result = {'x': x_input, 'y': '', 'z': ''}
+        for source in AXES:
+            for target in AXES:
+                if source == target:
+                    continue
+                coefficients = _direction_coefficients(self.ranges[source], self.ranges[target])
+                if coefficients is not None:
+                    self._coefficients[(source, target)] = coefficients
         
-        # Calculate Y if X-Y ranges are valid
-        if x_range_valid and y_range_valid and x1_num is not None and x2_num is not None and y1_num is not None and y2_num is not None:
-            try:
-                y = calculate_scaled_value(input_val, x1_num, x2_num, y1_num, y2_num)
-                result['y'] = str(y)
-            except (ZeroDivisionError, ValueError):
-                result['y'] = ''
+        # Built on first use; most transforms are only ever used for scalar scaling
+        self._matrices = {}
+    
+    def _build_matrix(self, scale_from):
+        """Build the homogeneous matrix for one driving axis from the coefficients."""
+        source = AXES.index(scale_from)
+        matrix = np.zeros((4, 4))
+        matrix[3, 3] = 1.0
+        matrix[source, source] = 1.0
+        for target, axis in enumerate(AXES):
+            if target == source:
+                continue
+            coefficients = self._coefficients.get((scale_from, axis))
+            if coefficients is None:
+                matrix[target] = np.nan
+            else:
+                matrix[target, source], matrix[target, 3] = coefficients
+        return AffineTransform(matrix)
+    
+    def affine(self, scale_from='x'):
+        """
+        Get the range set as one homogeneous matrix for a driving axis.
         
-        # Calculate Z if X-Z ranges are valid
-        if x_range_valid and z_range_valid and x1_num is not None and x2_num is not None and z1_num is not None and z2_num is not None:
-            try:
-                z = calculate_scaled_value(input_val, x1_num, x2_num, z1_num, z2_num)
-                result['z'] = str(convert_to_hex_if_needed(z, z_in_hex))
-            except (ZeroDivisionError, ValueError):
-                result['z'] = ''
+        Each driving axis's matrix is built on the first call and reused
+        after that.
         
-        return result
+        Returns:
+            AffineTransform: Matrix mapping xyz points to scaled xyz points;
+            rows of directions that cannot be scaled are NaN
+            
+        Raises:
+            ValueError: If scale_from is invalid
+        """
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        matrix = self._matrices.get(scale_from)
+        if matrix is None:
+            # Building twice under a race is harmless; both results are equal
+            matrix = self._matrices[scale_from] = self._build_matrix(scale_from)
+        return matrix
     
-    elif scale_from == 'y':
-        input_val = validate_and_convert_input(y_input)
-        if input_val is None:
-            return {'x': '', 'y': y_input, 'z': ''}
+    def coefficients(self, source, target):
+        """
+        Get the precomputed (slope, intercept) for a direction.
         
-        result = {'x': '', 'y': y_input, 'z': ''}
+        Returns:
+            tuple or None: (slope, intercept), or None if the direction cannot be scaled
+        """
+        return self._coefficients.get((source, target))
+    
+    def _evaluate(self, source, target, value):
+        """Scale one float from source to target, or return None if the direction cannot be scaled."""
+        coefficients = self._coefficients.get((source, target))
+        if coefficients is None:
+            return None
+        return coefficients[0] * value + coefficients[1]
+    
+    def _evaluate_array(self, source, target, values):
+        """Scale a float array from source to target, or return None if the direction cannot be scaled."""
+        coefficients = self._coefficients.get((source, target))
+        if coefficients is None:
+            return None
+        return coefficients[0] * values + coefficients[1]
+    
+    def scale(self, x_input, y_input, z_input, scale_from='x', timer=None):
+        """
+        Scale one point, with the same inputs and output as scale_coordinates.
         
-        # Calculate X if Y-X ranges are valid
-        if y_range_valid and x_range_valid and y1_num is not None and y2_num is not None and x1_num is not None and x2_num is not None:
-            try:
-                x = calculate_scaled_value(input_val, y1_num, y2_num, x1_num, x2_num)
-                result['x'] = str(x)
-            except (ZeroDivisionError, ValueError):
-                result['x'] = ''
+        Args:
+            timer: Optional StageTimer; laps "input", "math" and "format"
         
-        # Calculate Z if Y-Z ranges are valid
-        if y_range_valid and z_range_valid and y1_num is not None and y2_num is not None and z1_num is not None and z2_num is not None:
-            try:
-                z = calculate_scaled_value(input_val, y1_num, y2_num, z1_num, z2_num)
-                result['z'] = str(convert_to_hex_if_needed(z, z_in_hex))
-            except (ZeroDivisionError, ValueError):
-                result['z'] = ''
+        Returns:
+            dict: Calculated coordinates
+            
+        Raises:
+            ValueError: If scale_from or the driving input is invalid
+        """
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        
+        raw_input = {'x': x_input, 'y': y_input, 'z': z_input}[scale_from]
+        result = {'x': '', 'y': '', 'z': ''}
+        result[scale_from] = raw_input
+        
+        input_val = validate_and_convert_input(raw_input, is_hex=(scale_from == 'z' and self.z_in_hex))
+        if timer is not None:
+            timer.lap("input")
+        if input_val is None:
+            return result
+        
+        values = {}
+        for target in AXES:
+            if target == scale_from:
+                continue
+            value = self._evaluate(scale_from, target, input_val)
+            if value is not None:
+                values[target] = value
+        if timer is not None:
+            timer.lap("math")
+        
+        for target, value in values.items():
+            if target == 'z':
+                try:
+                    value = convert_to_hex_if_needed(value, self.z_in_hex)
+                except ValueError:
+                    continue
+            result[target] = str(value)
+        if timer is not None:
+            timer.lap("format")
         
         return result
     
-    elif scale_from == 'z':
-        input_val = validate_and_convert_input(z_input, is_hex=z_in_hex)
-        if input_val is None:
-            return {'x': '', 'y': '', 'z': z_input}
+    def scale_many(self, raw_inputs, scale_from='x'):
+        """
+        Scale many single points in one vectorized pass, with the same
+        output as scale gives for each.
         
-        result = {'x': '', 'y': '', 'z': z_input}
+        Args:
+            raw_inputs: Driving input strings
+            scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
         
-        # Calculate X if Z-X ranges are valid
-        if z_range_valid and x_range_valid and z1_num is not None and z2_num is not None and x1_num is not None and x2_num is not None:
-            try:
-                x = calculate_scaled_value(input_val, z1_num, z2_num, x1_num, x2_num)
-                result['x'] = str(x)
-            except (ZeroDivisionError, ValueError):
-                result['x'] = ''
+        Returns:
+            list: For each input, the result dict, or the exception scale
+            would raise for it
         
-        # Calculate Y if Z-Y ranges are valid
-        if z_range_valid and y_range_valid and z1_num is not None and z2_num is not None and y1_num is not None and y2_num is not None:
+        Raises:
+            ValueError: If scale_from is invalid
+        """
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        
+        is_hex = scale_from == 'z' and self.z_in_hex
+        results = []
+        indices, values = [], []
+        for raw_input in raw_inputs:
+            result = {'x': '', 'y': '', 'z': ''}
+            result[scale_from] = raw_input
             try:
-                y = calculate_scaled_value(input_val, z1_num, z2_num, y1_num, y2_num)
-                result['y'] = str(y)
-            except (ZeroDivisionError, ValueError):
-                result['y'] = ''
+                input_val = validate_and_convert_input(raw_input, is_hex=is_hex)
+            except ValueError as e:
+                results.append(e)
+                continue
+            if input_val is not None:
+                indices.append(len(results))
+                values.append(input_val)
+            results.append(result)
+        if not values:
+            return results
+        
+        values = np.array(values, dtype=np.float64)
+        for target in AXES:
+            if target == scale_from:
+                continue
+            # Overflow gives inf silently, as float arithmetic does in scale
+            with np.errstate(over='ignore', invalid='ignore'):
+                scaled = self._evaluate_array(scale_from, target, values)
+            if scaled is None:
+                continue
+            for index, value in zip(indices, scaled.tolist()):
+                if target == 'z':
+                    try:
+                        value = convert_to_hex_if_needed(value, self.z_in_hex)
+                    except ValueError:
+                        continue
+                    except OverflowError as e:
+                        results[index] = e
+                        continue
+                if isinstance(results[index], dict):
+                    results[index][target] = str(value)
+        return results
+    
+    def scale_batch(self, x_inputs, y_inputs, z_inputs, scale_from='x'):
+        """
+        Scale many points, with the same inputs and output as scale_coordinates_batch.
+        
+        Returns:
+            dict: Coordinate arrays and validity masks
+            
+        Raises:
+            ValueError: If scale_from is invalid or the driving inputs are missing
+        """
+        inputs = {'x': x_inputs, 'y': y_inputs, 'z': z_inputs}
+        if scale_from not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+        if inputs[scale_from] is None:
+            raise ValueError(f"{scale_from}_inputs are required when scaling from {scale_from}")
+        
+        values, valid = parse_input_array(inputs[scale_from], is_hex=(scale_from == 'z' and self.z_in_hex))
+        values = np.where(valid, values, 0.0)
+        
+        result = {scale_from: values, f"{scale_from}_valid": valid}
+        for axis in AXES:
+            if axis == scale_from:
+                continue
+            
+            scaled = self._evaluate_array(scale_from, axis, values)
+            if scaled is None:
+                result[axis] = np.zeros_like(values)
+                result[f"{axis}_valid"] = np.zeros_like(valid)
+                continue
+            
+            axis_valid = valid & np.isfinite(scaled)
+            if axis == 'z' and self.z_in_hex:
+                scaled = np.trunc(scaled)
+            result[axis] = np.where(axis_valid, scaled, 0.0)
+            result[f"{axis}_valid"] = axis_valid
         
         return result
+
+
+class AffineTransform:
+    """
+    A homogeneous 4x4 matrix acting on xyz points.
     
-    else:
-        raise ValueError("scale_from must be 'x', 'y', or 'z'")
+    A range set with a driving axis is one such matrix, so a whole chunk of
+    points is scaled with a single matrix multiply, and a chain of
+    transforms (sensor -> machine -> display) collapses into one matrix
+    ahead of time with then() or compose_affine().
+    
+    A zero coefficient means the output ignores that input axis entirely,
+    even when the input is NaN, matching scale_coordinates, which only reads
+    the driving axis.
+    """
+    
+    __slots__ = ('matrix', '_used_columns')
+    
+    def __init__(self, matrix):
+        """
+        Args:
+            matrix: 4x4 array whose last row is (0, 0, 0, 1)
+            
+        Raises:
+            ValueError: If the matrix has the wrong shape or last row
+        """
+        matrix = np.array(matrix, dtype=np.float64)
+        if matrix.shape != (4, 4):
+            raise ValueError(f"Expected a 4x4 matrix, got shape {matrix.shape}")
+        if not np.array_equal(matrix[3], [0.0, 0.0, 0.0, 1.0]):
+            raise ValueError("The last row of an affine matrix must be (0, 0, 0, 1)")
+        matrix.flags.writeable = False
+        self.matrix = matrix
+        # Input columns with a nonzero coefficient in some output row
+        linear = matrix[:3, :3]
+        self._used_columns = np.flatnonzero(((linear != 0) & ~np.isnan(linear)).any(axis=0))
+    
+    @classmethod
+    def identity(cls):
+        """Get the transform that leaves points unchanged"""
+        return cls(np.eye(4))
+    
+    def then(self, other):
+        """
+        Compose this transform with one applied after it.
+        
+        Args:
+            other: AffineTransform applied to the output of this one
+            
+        Returns:
+            AffineTransform: Single matrix equivalent to applying self, then other
+        """
+        first, second = self.matrix, other.matrix
+        product = np.zeros((4, 4))
+        for k in range(4):
+            # Skip zero coefficients so NaN rows of unused axes do not spread
+            rows = second[:, k] != 0
+            product[rows] += second[rows, k:k + 1] * first[k]
+        product[3] = (0.0, 0.0, 0.0, 1.0)
+        return AffineTransform(product)
+    
+    def inverse(self):
+        """
+        Get the transform that undoes this one.
+        
+        Returns:
+            AffineTransform: Inverse matrix
+            
+        Raises:
+            ValueError: If the matrix is not invertible (a range set with a
+                driving axis never is, since every output follows one input)
+        """
+        if not np.isfinite(self.matrix).all():
+            raise ValueError("Matrix is not invertible")
+        try:
+            return AffineTransform(np.linalg.inv(self.matrix))
+        except np.linalg.LinAlgError:
+            raise ValueError("Matrix is not invertible")
+    
+    def apply(self, points, out=None):
+        """
+        Transform an (N, 3) array of points with one matrix multiply.
+        
+        Args:
+            points: (N, 3) array of xyz points
+            out: Optional (N, 3) array to write the result into
+            
+        Returns:
+            numpy.ndarray: Transformed points
+        """
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"Expected an (N, 3) array of points, got shape {points.shape}")
+        linear = self.matrix[:3, :3]
+        used = self._used_columns
+        if used.shape[0] == 3:
+            result = np.matmul(points, linear.T, out=out)
+        else:
+            result = np.matmul(points[:, used], linear[:, used].T, out=out)
+        result += self.matrix[:3, 3]
+        return result
 
 
-def validate_range_inputs(x1, x2, y1, y2, z1, z2):
+def compose_affine(*transforms):
     """
-    Validate that range inputs are valid numbers.
+    Collapse a chain of transforms into one matrix.
     
     Args:
-        x1, x2, y1, y2, z1, z2: Range definition values
+        transforms: AffineTransforms in the order they are applied
         
     Returns:
-        tuple: Validated float values
+        AffineTransform: Equivalent single transform
+    """
+    result = AffineTransform.identity()
+    for transform in transforms:
+        result = result.then(transform)
+    return result
+
+
+def _normalize_range_value(value):
+    """Normalize a range value for use in the transform cache key."""
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+@lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+def _cached_transform(x1, x2, y1, y2, z1, z2, z_in_hex):
+    return ScalingTransform(x1, x2, y1, y2, z1, z2, z_in_hex)
+
+
+def get_scaling_transform(x1, x2, y1, y2, z1, z2, z_in_hex=False):
+    """
+    Get the compiled ScalingTransform for a range set.
+    
+    Transforms are kept in a bounded LRU cache keyed by the normalized
+    (x1, x2, y1, y2, z1, z2, z_in_hex) tuple.
+    
+    Returns:
+        ScalingTransform: The compiled range set
         
     Raises:
-        ValueError: If any input is invalid
+        ValueError: If the range values are invalid
     """
-    inputs = [x1, x2, y1, y2, z1, z2]
-    validated = []
+    return _cached_transform(
+        _normalize_range_value(x1), _normalize_range_value(x2),
+        _normalize_range_value(y1), _normalize_range_value(y2),
+        _normalize_range_value(z1), _normalize_range_value(z2),
+        bool(z_in_hex)
+    )
+
+
+def transform_cache_info():
+    """
+    Get hit/miss statistics for the transform cache.
     
-    for i, inp in enumerate(inputs):
-        if inp is None:
-            inp = ""
+    Returns:
+        dict: hits, misses, size, maxsize and hit_rate
+    """
+    info = _cached_transform.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_transform_cache():
+    """Empty the transform caches and reset their counters."""
+    _cached_transform.cache_clear()
+    _cached_piecewise_transform.cache_clear()
+
+
+class PiecewiseLinear:
+    """
+    A calibration curve through a list of breakpoints.
+    
+    Slope and intercept are precomputed for every segment. Single values
+    find their segment with a binary search and arrays with one
+    searchsorted call, so evaluation cost grows with log(breakpoints).
+    """
+    
+    __slots__ = ('inputs', 'outputs', 'extrapolate', '_slopes', '_intercepts', '_slope_list', '_intercept_list', '_knots')
+    
+    def __init__(self, inputs, outputs, extrapolate=True):
+        """
+        Args:
+            inputs: Breakpoint inputs, strictly increasing or strictly decreasing
+            outputs: Output value at each breakpoint
+            extrapolate: Extend the end segments beyond the breakpoints;
+                when False, results are clamped to the end outputs
+            
+        Raises:
+            ValueError: If the breakpoints are too few, differ in length,
+                are not finite or the inputs are not strictly monotonic
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        outputs = np.asarray(outputs, dtype=np.float64)
+        if inputs.ndim != 1 or inputs.shape != outputs.shape:
+            raise ValueError("Breakpoint inputs and outputs must have the same length")
+        if inputs.shape[0] < 2:
+            raise ValueError("At least two breakpoints are required")
+        if not (np.isfinite(inputs).all() and np.isfinite(outputs).all()):
+            raise ValueError("Breakpoint values must be finite numbers")
+        if not _is_strictly_monotonic(inputs):
+            raise ValueError("Breakpoint inputs must be strictly increasing or decreasing")
         
-        # Convert to string and strip whitespace
-        inp_str = str(inp).strip()
+        self.inputs = inputs
+        self.outputs = outputs
+        self.extrapolate = extrapolate
         
-        if inp_str == "":
-            raise ValueError(f"Range value {['x1', 'x2', 'y1', 'y2', 'z1', 'z2'][i]} cannot be empty")
+        # Segments are searched in increasing input order
+        if inputs[0] > inputs[-1]:
+            inputs, outputs = inputs[::-1], outputs[::-1]
+        self._slopes = np.diff(outputs) / np.diff(inputs)
+        self._intercepts = outputs[:-1] - self._slopes * inputs[:-1]
+        self._slope_list = self._slopes.tolist()
+        self._intercept_list = self._intercepts.tolist()
+        self._knots = inputs.tolist()
+    
+    @property
+    def monotonic(self):
+        """Whether the outputs are strictly monotonic, so the curve can be inverted"""
+        return _is_strictly_monotonic(self.outputs)
+    
+    def inverse(self):
+        """
+        Get the curve mapping outputs back to inputs.
         
+        Returns:
+            PiecewiseLinear: The inverse curve, with the same end handling
+            
+        Raises:
+            ValueError: If the outputs are not strictly monotonic
+        """
+        if not self.monotonic:
+            raise ValueError("Curve is not monotonic and cannot be inverted")
+        return PiecewiseLinear(self.outputs, self.inputs, self.extrapolate)
+    
+    def __call__(self, value):
+        """
+        Evaluate the curve at one value.
+        
+        Returns:
+            float: The interpolated value
+        """
+        knots = self._knots
+        if not self.extrapolate:
+            value = min(max(value, knots[0]), knots[-1])
+        segment = min(max(bisect_right(knots, value) - 1, 0), len(knots) - 2)
+        return self._slope_list[segment] * value + self._intercept_list[segment]
+    
+    def evaluate(self, values):
+        """
+        Evaluate the curve for an array of values.
+        
+        Returns:
+            numpy.ndarray: Interpolated values; NaN inputs give NaN
+        """
+        values = np.asarray(values, dtype=np.float64)
+        knots = self._knots
+        if not self.extrapolate:
+            values = np.clip(values, knots[0], knots[-1])
+        segment = np.searchsorted(knots, values, side='right') - 1
+        np.clip(segment, 0, len(knots) - 2, out=segment)
+        return self._slopes[segment] * values + self._intercepts[segment]
+
+
+def _is_strictly_monotonic(values):
+    """Check whether an array is strictly increasing or strictly decreasing."""
+    steps = np.diff(values)
+    return bool((steps > 0).all() or (steps < 0).all())
+
+
+class PiecewiseTransform(ScalingTransform):
+    """
+    Multi-breakpoint alternative to the two-point ranges.
+    
+    Each axis has a list of calibration values, and entry i of every list
+    describes the same point. Scaling from one axis to another follows the
+    piecewise-linear curve through those points, so a two-entry table gives
+    the same results as the equivalent ranges. Directions whose source
+    values are not strictly monotonic, or whose axes have no table, produce
+    an empty result.
+    """
+    
+    __slots__ = ('curves',)
+    
+    def __init__(self, breakpoints, z_in_hex=False, extrapolate=True):
+        """
+        Args:
+            breakpoints: Dict mapping 'x', 'y' and/or 'z' to equal-length
+                sequences of breakpoint values
+            z_in_hex: Whether Z values are hexadecimal
+            extrapolate: Extend the end segments beyond the breakpoints;
+                when False, results are clamped to the end values
+            
+        Raises:
+            ValueError: If an axis name is unknown or the tables are invalid
+        """
+        for axis in breakpoints:
+            if axis not in AXES:
+                raise ValueError(f"Unknown breakpoint axis: {axis}")
+        tables = {axis: tuple(breakpoints[axis]) for axis in AXES if axis in breakpoints}
+        if len({len(table) for table in tables.values()}) > 1:
+            raise ValueError("Breakpoint lists must all have the same length")
+        
+        self.ranges = {axis: (tables[axis][0], tables[axis][-1]) if tables.get(axis) else None for axis in AXES}
+        self.z_in_hex = z_in_hex
+        self._coefficients = {}
+        self.curves = {}
+        for source in tables:
+            if not np.isfinite(tables[source]).all():
+                raise ValueError("Breakpoint values must be finite numbers")
+        for source in tables:
+            if not _is_strictly_monotonic(np.asarray(tables[source], dtype=np.float64)):
+                continue
+            for target in tables:
+                if target != source:
+                    self.curves[(source, target)] = PiecewiseLinear(tables[source], tables[target], extrapolate)
+    
+    def affine(self, scale_from='x'):
+        """Breakpoint curves have no single matrix, so this always raises ValueError."""
+        raise ValueError("Breakpoint curves cannot be expressed as an affine matrix")
+    
+    def _evaluate(self, source, target, value):
+        curve = self.curves.get((source, target))
+        return None if curve is None else curve(value)
+    
+    def _evaluate_array(self, source, target, values):
+        curve = self.curves.get((source, target))
+        return None if curve is None else curve.evaluate(values)
+
+
+@lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+def _cached_piecewise_transform(tables, z_in_hex, extrapolate):
+    return PiecewiseTransform(dict(tables), z_in_hex, extrapolate)
+
+
+def get_piecewise_transform(breakpoints, z_in_hex=False, extrapolate=True):
+    """
+    Get the compiled PiecewiseTransform for a breakpoint table.
+    
+    Transforms are kept in a bounded LRU cache like get_scaling_transform.
+    
+    Args:
+        breakpoints: Dict mapping axis names to breakpoint value lists
+        z_in_hex: Whether Z values are hexadecimal
+        extrapolate: Extend the end segments instead of clamping
+        
+    Returns:
+        PiecewiseTransform: The compiled breakpoint table
+        
+    Raises:
+        ValueError: If the breakpoints are invalid
+    """
+    try:
+        tables = tuple(sorted((axis, tuple(float(value) for value in values)) for axis, values in breakpoints.items()))
+    except (TypeError, ValueError):
+        raise ValueError("Breakpoint values must be numbers")
+    return _cached_piecewise_transform(tables, bool(z_in_hex), bool(extrapolate))
+
+
+# Hex digit value for each ASCII code point; 255 marks a non-digit
+_HEX_DIGIT_VALUES = np.full(129, 255, dtype=np.uint8)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_DIGIT_VALUES[ord(_c)] = _i
+    _HEX_DIGIT_VALUES[ord(_c.upper())] = _i
+_HEX_CHARS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def _as_string_array(values):
+    """Convert a sequence of strings (None allowed) to a contiguous NumPy unicode array."""
+    array = np.asarray(values)
+    if array.dtype.kind == "O":
+        array = np.array(["" if value is None else str(value) for value in array.ravel()])
+    return np.ascontiguousarray(array.astype(str, copy=False).ravel())
+
+
+def _parse_hex_strings(values):
+    """
+    Parse hex strings in bulk.
+    
+    Accepts the same text as validate_and_convert_input(..., is_hex=True)
+    for values whose magnitude fits in 64 bits. The usual form (surrounding
+    ASCII whitespace, an optional + or - sign, an optional 0x prefix and hex
+    digits in either case) is parsed as a matrix of code points, with no
+    per-value Python work. Strings outside that form, such as digits
+    separated by "_" or non-ASCII whitespace, are rare and are checked one
+    at a time with the single-value parser.
+    
+    Returns:
+        tuple: (magnitude uint64 array, negative mask, valid mask)
+    """
+    strings = _as_string_array(values)
+    count = strings.shape[0]
+    width = strings.dtype.itemsize // 4
+    if count == 0 or width == 0:
+        return np.zeros(count, dtype=np.uint64), np.zeros(count, dtype=bool), np.zeros(count, dtype=bool)
+    
+    codes = strings.view(np.uint32).reshape(count, width)
+    rows = np.arange(count)
+    
+    # Locate the text between surrounding whitespace (and the NUL padding)
+    blank = (codes == 0) | (codes == 32) | ((codes >= 9) & (codes <= 13))
+    has_text = ~blank.all(axis=1)
+    first = (~blank).argmax(axis=1)
+    last = width - 1 - (~blank)[:, ::-1].argmax(axis=1)
+    
+    def char_at(index):
+        return codes[rows, np.minimum(index, width - 1)]
+    
+    sign = char_at(first)
+    negative = has_text & (sign == ord("-"))
+    first = first + (has_text & ((sign == ord("-")) | (sign == ord("+"))))
+    prefixed = (first < last) & (char_at(first) == ord("0")) & ((char_at(first + 1) | 0x20) == ord("x"))
+    first = first + 2 * prefixed
+    valid = has_text & (first <= last)
+    
+    # Work column by column on a transposed copy so every step is a
+    # contiguous vector operation
+    digits = _HEX_DIGIT_VALUES[np.minimum(codes.T, 128).astype(np.uint8)]
+    magnitude = np.zeros(count, dtype=np.uint64)
+    four = np.uint64(4)
+    for position in range(width):
+        in_digits = (position >= first) & (position <= last)
+        column = digits[position]
+        valid &= ~(in_digits & (column == 255))
+        # Digits more than 16 places from the end must be leading zeros
+        low = last - position < 16
+        valid &= ~(in_digits & ~low & (column != 0))
+        used = in_digits & low
+        magnitude = np.where(used, (magnitude << four) | column, magnitude)
+    
+    magnitude[~valid] = 0
+    negative &= valid
+    for row in np.flatnonzero(has_text & ~valid):
         try:
-            validated.append(float(inp_str))
+            value = _parse_hex_int(str(strings[row]))
         except ValueError:
-            raise ValueError(f"Invalid range value: {['x1', 'x2', 'y1', 'y2', 'z1', 'z2'][i]}")
+            continue
+        if abs(value) < 2 ** 64:
+            magnitude[row], negative[row], valid[row] = abs(value), value < 0, True
+    return magnitude, negative, valid
+
+
+def parse_hex_array(values):
+    """
+    Parse an array of hex strings into exact unsigned 64-bit integers.
     
-    return tuple(validated)
+    Args:
+        values: Sequence or array of strings, with or without "0x" prefix
+        
+    Returns:
+        tuple: (uint64 array, valid mask). Empty, malformed, negative and
+        out-of-range entries are 0 with a False mask.
+    """
+    magnitude, negative, valid = _parse_hex_strings(values)
+    valid &= ~negative
+    return np.where(valid, magnitude, np.uint64(0)), valid
+
+
+def format_hex_array(values, valid=None):
+    """
+    Format integers as hex strings in bulk, matching hex().
+    
+    Args:
+        values: Integer array (unsigned 64-bit range) or float array of
+            whole numbers; negative values get a "-0x" prefix
+        valid: Optional mask; entries outside it become empty strings
+        
+    Returns:
+        numpy.ndarray: Unicode array of hex strings
+    """
+    values = np.asarray(values).ravel()
+    if values.dtype.kind == "u":
+        negative = np.zeros(values.shape, dtype=bool)
+        magnitude = values.astype(np.uint64)
+        in_range = np.ones(values.shape, dtype=bool)
+    else:
+        values = values.astype(np.float64) if values.dtype.kind != "i" else values
+        negative = values < 0
+        absolute = np.abs(values)
+        in_range = absolute < 2.0 ** 64 if values.dtype.kind == "f" else np.ones(values.shape, dtype=bool)
+        magnitude = np.where(in_range, absolute, 0).astype(np.uint64)
+    
+    # Number of hex digits in each value (at least one, for zero)
+    digit_count = np.ones(magnitude.shape, dtype=np.int64)
+    for power in range(1, 16):
+        digit_count += magnitude >= np.uint64(16 ** power)
+    
+    text = np.zeros((values.shape[0], 18), dtype=np.uint8)
+    text[:, 0] = ord("0")
+    text[:, 1] = ord("x")
+    for position in range(16):
+        shift = (4 * (digit_count - 1 - position)).clip(0).astype(np.uint64)
+        nibble = (magnitude >> shift) & np.uint64(0xF)
+        text[:, 2 + position] = np.where(position < digit_count, _HEX_CHARS[nibble], 0)
+    strings = text.view("S18").ravel().astype("U18")
+    
+    if negative.any():
+        strings = np.where(negative, np.strings.add("-", strings), strings)
+    keep = in_range if valid is None else in_range & valid
+    return np.where(keep, strings, "")
+
+
+def parse_input_array(values, is_hex=False):
+    """
+    Convert a sequence of inputs to a float array and a validity mask.
+
+    Numeric arrays are used as-is, hex strings are parsed in bulk and
+    arrays of decimal strings are parsed in one call when every entry is a
+    number. Anything else is converted element by element with
+    validate_and_convert_input; empty or unparseable entries are marked
+    invalid instead of raising.
+    """
+    array = np.asarray(values)
+    if is_hex and array.dtype.kind in "UO" and all(value is None or isinstance(value, str) for value in array.ravel()):
+        magnitude, negative, valid = _parse_hex_strings(array)
+        converted = magnitude.astype(np.float64)
+        return np.where(negative, -converted, converted), valid
+    if array.dtype.kind == "U" and not is_hex:
+        try:
+            array = array.astype(np.float64)
+        except ValueError:
+            pass
+    if array.dtype.kind in "biuf":
+        array = array.astype(np.float64, copy=False).ravel()
+        return array, np.isfinite(array)
+
+    array = array.ravel()
+    converted = np.zeros(array.shape[0], dtype=np.float64)
+    valid = np.zeros(array.shape[0], dtype=bool)
+    for i, value in enumerate(array):
+        if value is None:
+            continue
+        try:
+            if isinstance(value, str):
+                value = validate_and_convert_input(value, is_hex=is_hex)
+                if value is None:
+                    continue
+            converted[i] = float(value)
+        except (TypeError, ValueError):
+            continue
+        valid[i] = np.isfinite(converted[i])
+    return converted, valid
+
+
+def scale_coordinates_batch(x_inputs, y_inputs, z_inputs, x1, x2, y1, y2, z1, z2, scale_from='x', z_in_hex=False):
+    """
+    Perform scaling for many points sharing one range set in a single pass.
+
+    Args:
+        x_inputs, y_inputs, z_inputs: Sequences or arrays of input coordinates.
+            Only the one selected by scale_from is read; the others may be None.
+            Z inputs may be hex strings when z_in_hex is set.
+        x1, x2, y1, y2, z1, z2: Range definitions
+        scale_from: 'x', 'y', or 'z' - which coordinate drives scaling
+        z_in_hex: Whether Z values are hexadecimal (inputs parsed as hex,
+            outputs truncated to integers)
+
+    Returns:
+        dict: 'x', 'y', 'z' float64 arrays and 'x_valid', 'y_valid', 'z_valid'
+        boolean masks. Points that could not be calculated are 0.0 with a
+        False mask, where scale_coordinates would return an empty string.
+
+    Raises:
+        ValueError: If scale_from is invalid, the driving inputs are missing
+            or the range values are invalid
+    """
+    transform = get_scaling_transform(x1, x2, y1, y2, z1, z2, z_in_hex)
+    return transform.scale_batch(x_inputs, y_inputs, z_inputs, scale_from)
@@ -0,0 +1,182 @@
+"""
+Incremental scaling for interactive sessions
+A session keeps one client's inputs and range set between updates and
+memoizes every stage of the calculation (range parsing, slopes, input
+parsing, formatted outputs) against the values it was computed from, so an
+update only redoes the stages whose inputs actually changed
+"""
+
+import os
+import sys
+from collections import Counter
+
+# Add the backend directory to the path so we can import scaling_logic
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scaling_logic import (
+    AXES, _direction_coefficients, _parse_range_pair, convert_to_hex_if_needed, validate_and_convert_input
+)
+
+# Fields a session client may send, with their initial values
+SESSION_DEFAULTS = {
+    "x_input": "", "y_input": "", "z_input": "",
+    "x1": "", "x2": "", "y1": "", "y2": "", "z1": "", "z2": "",
+    "scale_from": "x",
+    "z_in_hex": False,
+}
+STAGES = ('range', 'slope', 'input', 'output')
+
+
+class ScalingSession:
+    """
+    One client's scaling state with per-stage memoization.
+
+    Results are identical to scale_coordinates for the same fields. Each
+    stage result is stored with the values it was computed from and reused
+    while they are unchanged: editing the Z range leaves the X -> Y slope
+    and output alone, and a new input value reuses every slope.
+    """
+
+    def __init__(self, counters=None):
+        """
+        Args:
+            counters: Optional Counter shared by many sessions; receives the
+                same counts as this session's stats
+        """
+        self.state = dict(SESSION_DEFAULTS)
+        self.stats = Counter()
+        self._shared = counters
+        self._memo = {}
+        self._result = {'x': '', 'y': '', 'z': ''}
+
+    def _count(self, name, amount=1):
+        self.stats[name] += amount
+        if self._shared is not None:
+            self._shared[name] += amount
+
+    def _cached(self, stage, name, key, compute):
+        """Return the memoized value for name if it was computed from key, else compute it."""
+        entry = self._memo.get(name)
+        if entry is not None and entry[0] == key:
+            self._count(f"{stage}_reused")
+            return entry[1]
+        value = compute()
+        self._memo[name] = (key, value)
+        self._count(f"{stage}_computed")
+        return value
+
+    def update(self, changes):
+        """
+        Apply changed fields and recompute what depends on them.
+
+        The fields are validated before any are applied, so a rejected
+        update leaves the session untouched. A calculation error (such as
+        an invalid hex input) keeps the new fields, like a stateless
+        request with the same values would fail.
+
+        Args:
+            changes: Dict of fields from SESSION_DEFAULTS
+
+        Returns:
+            dict: The full result, as scale_coordinates returns it
+
+        Raises:
+            ValueError: If a field is unknown or has the wrong type, or the
+                inputs cannot be scaled
+        """
+        for field, value in changes.items():
+            if field not in SESSION_DEFAULTS:
+                raise ValueError(f"Unknown field: {field}")
+            if not isinstance(value, type(SESSION_DEFAULTS[field])):
+                raise ValueError(f"Invalid value for {field}")
+        if changes.get("scale_from", "x") not in AXES:
+            raise ValueError("scale_from must be 'x', 'y', or 'z'")
+
+        self.state.update(changes)
+        self._count("updates")
+        result = self._compute()
+        self._result = result
+        return dict(result)
+
+    def update_delta(self, changes):
+        """
+        Like update, but return only the output fields that changed since
+        the previous successful update (the first is compared with empty
+        strings).
+
+        Returns:
+            dict: Changed fields of the result
+        """
+        previous = self._result
+        result = self.update(changes)
+        delta = {axis: value for axis, value in result.items() if value != previous[axis]}
+        self._count("fields_sent", len(delta))
+        self._count("fields_skipped", len(AXES) - len(delta))
+        return delta
+
+    def _compute(self):
+        state = self.state
+        # Every range pair is parsed, as the full calculation does, so an
+        # invalid range is reported whichever axis drives
+        pairs = {
+            axis: self._cached(
+                'range', ('range', axis), (state[f"{axis}1"], state[f"{axis}2"]),
+                lambda axis=axis: _parse_range_pair(state[f"{axis}1"], state[f"{axis}2"])
+            )
+            for axis in AXES
+        }
+
+        scale_from = state['scale_from']
+        raw_input = state[f"{scale_from}_input"]
+        result = {'x': '', 'y': '', 'z': ''}
+        result[scale_from] = raw_input
+
+        is_hex = scale_from == 'z' and state['z_in_hex']
+        value = self._cached(
+            'input', ('input',), (raw_input, is_hex),
+            lambda: validate_and_convert_input(raw_input, is_hex=is_hex)
+        )
+        if value is None:
+            return result
+
+        for target in AXES:
+            if target == scale_from:
+                continue
+            coefficients = self._cached(
+                'slope', ('slope', scale_from, target), (pairs[scale_from], pairs[target]),
+                lambda target=target: _direction_coefficients(pairs[scale_from], pairs[target])
+            )
+            z_in_hex = target == 'z' and state['z_in_hex']
+            result[target] = self._cached(
+                'output', ('output', target), (scale_from, value, coefficients, z_in_hex),
+                lambda target=target: _format_output(value, coefficients, z_in_hex)
+            )
+        return result
+
+
+def _format_output(value, coefficients, z_in_hex):
+    """Scale and format one output, as ScalingTransform.scale does."""
+    if coefficients is None:
+        return ''
+    scaled = coefficients[0] * value + coefficients[1]
+    try:
+        scaled = convert_to_hex_if_needed(scaled, z_in_hex)
+    except ValueError:
+        return ''
+    return str(scaled)
+
+
+def summarize_counters(counters):
+    """
+    Reduce session counters to totals per stage.
+
+    Returns:
+        dict: updates, fields_sent, fields_skipped, and computed / reused
+        counts with the reuse ratio for each stage
+    """
+    summary = {name: counters.get(name, 0) for name in ('updates', 'fields_sent', 'fields_skipped')}
+    for stage in STAGES:
+        computed, reused = counters.get(f"{stage}_computed", 0), counters.get(f"{stage}_reused", 0)
+        total = computed + reused
+        summary[stage] = {'computed': computed, 'reused': reused, 'reuse_ratio': reused / total if total else 0.0}
+    return summary
@@ -3,20 +3,128 @@ Tauri backend integration for the scaling application
 This file provides the bridge between the React frontend and the scaling logic
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
-import uvicorn
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+from typing import Annotated, Dict, List, Optional, Union
+from datetime import datetime, timezone
+from collections import Counter
+import asyncio
+import json
 import sys
 import os
+import tempfile
 
 # Add the backend directory to the path so we can import scaling_logic
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from scaling_logic import scale_coordinates, validate_range_inputs, validate_and_convert_input
+from scaling_logic import AXES, clear_transform_cache, format_hex_array, get_piecewise_transform, get_scaling_transform, scale_coordinates, transform_cache_info, validate_range_inputs, validate_and_convert_input
+from profiles import DEFAULT_STORE_PATH, RANGE_KEYS, ProfileStore
+from hex_exact import scale_coordinates_batch_exact_hex, scale_coordinates_exact_hex
+from metrics import MetricsMiddleware, create_registry
+from timing import ServerTimingMiddleware, profile_event_loop
+from response_cache import ResponseCache, etag_matches
+from coalescer import ScaleCoalescer
+from sessions import ScalingSession, summarize_counters
+# The modules behind the process pool, jobs, history, grids, calibration,
+# lookup tables, binary formats and JSON-RPC are imported by the code that
+# first needs them, and their stores and pools are created on first use, so
+# starting the backend does not pay for features a session never touches.
 
-app = FastAPI(title="Scaling Range Tauri Backend", version="1.0.0")
+# Batches with at least this many points run on the process pool
+PARALLEL_THRESHOLD = int(os.environ.get("SCALING_PARALLEL_THRESHOLD", "1000000"))
+PARALLEL_WORKERS = int(os.environ.get("SCALING_WORKERS", "0")) or None
+PARALLEL_CHUNK_SIZE = int(os.environ.get("SCALING_CHUNK_SIZE", str(1 << 20)))
+
+profile_store = ProfileStore(os.environ.get("SCALING_PROFILE_STORE", DEFAULT_STORE_PATH))
+
+# Created on first use by _parallel_scaler(), _grid_store(), _history_store() and _job_manager()
+parallel_scaler = None
+grid_store = None
+history_store = None
+job_manager = None
+
+metrics = create_registry()
+
+# Cache of /scale responses; a size of 0 disables it
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("SCALING_RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("SCALING_RESPONSE_CACHE_TTL", "300"))
+)
+
+# Micro-batching of concurrent /scale requests; a window of 0 disables it
+COALESCE_WINDOW_MS = float(os.environ.get("SCALING_COALESCE_WINDOW_MS", "0"))
+scale_coalescer = ScaleCoalescer(
+    window=COALESCE_WINDOW_MS / 1000,
+    max_batch=int(os.environ.get("SCALING_COALESCE_MAX_BATCH", "64")),
+    registry=metrics
+) if COALESCE_WINDOW_MS > 0 else None
+
+# Printed on stdout once the server accepts connections; the desktop launcher waits for it
+READY_LINE = "SCALING_BACKEND_READY"
+
+# Unix socket of the JSON-RPC transport (--transport unix)
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"scaling-backend-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+def warm_up():
+    """Run one scaling request through the transform and formatting paths, so the first real request pays no first-use costs"""
+    scale_coordinates("1", "", "", x1="0", x2="1", y1="0", y2="1", z1="0", z2="1", scale_from="x")
+    clear_transform_cache()
+
+def _parallel_scaler():
+    """The process pool for large batches"""
+    global parallel_scaler
+    if parallel_scaler is None:
+        from parallel_scaling import ParallelScaler
+        parallel_scaler = ParallelScaler(workers=PARALLEL_WORKERS, chunk_size=PARALLEL_CHUNK_SIZE)
+    return parallel_scaler
+
+def _history_store():
+    """The calculation history database"""
+    global history_store
+    if history_store is None:
+        from history import DEFAULT_HISTORY_PATH, HistoryStore
+        history_store = HistoryStore(os.environ.get("SCALING_HISTORY_STORE", DEFAULT_HISTORY_PATH))
+    return history_store
+
+def _job_manager():
+    """Background file jobs; unfinished jobs beyond SCALING_JOB_MAX_PENDING are refused with 429"""
+    global job_manager
+    if job_manager is None:
+        from jobs import JobManager
+        job_manager = JobManager(
+            workers=int(os.environ.get("SCALING_JOB_WORKERS", "1")),
+            max_pending=int(os.environ.get("SCALING_JOB_MAX_PENDING", "8")),
+            work_dir=os.environ.get("SCALING_JOB_DIR") or None,
+            # POST /jobs may only name files in this directory; unset, only uploads are accepted
+            input_dir=os.environ.get("SCALING_JOB_INPUT_DIR") or None
+        )
+    return job_manager
+
+def close_resources():
+    """Shut down the pools and stores that were started"""
+    for resource in (parallel_scaler, job_manager, history_store):
+        if resource is not None:
+            resource.close()
+
+# Seconds between progress checks of a job event stream
+JOB_EVENT_INTERVAL = 0.25
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start-up and shutdown hooks for the app"""
+    app.state.ready = False
+    warm_up()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    close_resources()
+
+app = FastAPI(title="Scaling Range Tauri Backend", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware for React frontend
 app.add_middleware(
@@ -25,31 +133,201 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware, registry=metrics)
+# Server-Timing headers for every request, instead of only those sending "X-Server-Timing: 1"
+app.add_middleware(ServerTimingMiddleware, always=os.environ.get("SCALING_SERVER_TIMING", "") == "1")
 
 class ScalingRequest(BaseModel):
     x_input: str
     y_input: str
     z_input: str
+    x1: Optional[str] = None
+    x2: Optional[str] = None
+    y1: Optional[str] = None
+    y2: Optional[str] = None
+    z1: Optional[str] = None
+    z2: Optional[str] = None
+    profile_id: Optional[str] = None # replaces x1..z2 with a registered profile
+    breakpoints: Optional[Dict[str, List[float]]] = None # replaces x1..z2 with piecewise-linear curves
+    extrapolate: bool = True # extend the end segments of breakpoints instead of clamping
+    scale_from: str # 'x', 'y', or 'z'
+    z_in_hex: bool = False
+    exact_hex: bool = False # keep hex Z as exact 64-bit integers
+
+class ScalingResponse(BaseModel):
+    x: str
+    y: str
+    z: str
+
+class BatchScalingRequest(BaseModel):
+    x_inputs: Optional[List[Optional[float]]] = None
+    y_inputs: Optional[List[Optional[float]]] = None
+    z_inputs: Optional[List[Optional[Union[float, str]]]] = None # hex strings allowed when z_in_hex
+    x1: Optional[str] = None
+    x2: Optional[str] = None
+    y1: Optional[str] = None
+    y2: Optional[str] = None
+    z1: Optional[str] = None
+    z2: Optional[str] = None
+    profile_id: Optional[str] = None # replaces x1..z2 with a registered profile
+    breakpoints: Optional[Dict[str, List[float]]] = None # replaces x1..z2 with piecewise-linear curves
+    extrapolate: bool = True # extend the end segments of breakpoints instead of clamping
+    scale_from: str # 'x', 'y', or 'z'
+    z_in_hex: bool = False
+    exact_hex: bool = False # keep hex Z as exact 64-bit integers
+
+class BatchScalingResponse(BaseModel):
+    x: List[float]
+    y: List[float]
+    z: List[float]
+    x_valid: List[bool]
+    y_valid: List[bool]
+    z_valid: List[bool]
+    z_hex: Optional[List[str]] = None # exact Z values when exact_hex is set
+
+class ProfileRequest(BaseModel):
+    name: str
     x1: str
     x2: str
     y1: str
     y2: str
     z1: str
     z2: str
-    scale_from: str # 'x', 'y', or 'z'
+
+class ProfileResponse(BaseModel):
+    id: str
+    name: str
+    x1: str
+    x2: str
+    y1: str
+    y2: str
+    z1: str
+    z2: str
+
+class CalibrationFitRequest(BaseModel):
+    inputs: List[Optional[float]]
+    outputs: List[Optional[float]]
+    source: str = 'x' # axis the inputs were measured on
+    target: str = 'y' # axis the outputs were measured on
+    x1: str = "" # range values kept for the remaining axis
+    x2: str = ""
+    y1: str = ""
+    y2: str = ""
+    z1: str = ""
+    z2: str = ""
+
+class CalibrationFit(BaseModel):
+    count: int
+    skipped: int
+    slope: float
+    intercept: float
+    r_squared: float
+    rmse: float
+    residual_std: Optional[float]
+    slope_stderr: Optional[float]
+    intercept_stderr: Optional[float]
+    input_min: float
+    input_max: float
+
+class CalibrationFitResponse(BaseModel):
+    fit: CalibrationFit
+    ranges: Dict[str, str] # x1..z2, ready to send to /scale
+
+class LookupTableRequest(BaseModel):
+    x1: str = ""
+    x2: str = ""
+    y1: str = ""
+    y2: str = ""
+    z1: str = ""
+    z2: str = ""
+    scale_from: str = 'x' # axis the inputs are spaced along
+    count: int
+    start: Optional[float] = None # defaults to the start of the driving range
+    step: Optional[float] = None # defaults to spanning the driving range
     z_in_hex: bool = False
+    format: str = 'csv' # 'csv', 'raw' or 'c'
+    dtype: str = 'float64' # element type for raw and C output
+    name: str = 'scaling_lut' # C array name
 
-class ScalingResponse(BaseModel):
-    x: str
-    y: str
-    z: str
+class GridRequest(BaseModel):
+    name: str
+    values: List[list] # nested lists indexed [x][y] or [x][y][z]
+    origin: Optional[List[float]] = None # coordinates of the first grid point, zeros by default
+    spacing: Optional[List[float]] = None # distance between grid points per axis, ones by default
+
+class GridResponse(BaseModel):
+    id: str
+    name: str
+    shape: List[int]
+    dtype: str
+    origin: List[float]
+    spacing: List[float]
+
+class GridInterpolationRequest(BaseModel):
+    x_inputs: List[Optional[float]]
+    y_inputs: List[Optional[float]]
+    z_inputs: Optional[List[Optional[float]]] = None # required for 3D grids
+    extrapolate: bool = True # extend the edge cells instead of clamping to the grid
+
+class GridInterpolationResponse(BaseModel):
+    values: List[float]
+    valid: List[bool]
 
 class ValidationError(BaseModel):
     error: str
 
+def _resolve_ranges(request):
+    """
+    Get the six range values for a request, from its profile if it names one.
+    
+    Raises:
+        ValueError: If both a profile and range values are given, or the
+            request uses breakpoints, which have no range values
+        KeyError: If the profile does not exist
+    """
+    ranges = (request.x1, request.x2, request.y1, request.y2, request.z1, request.z2)
+    if request.breakpoints is not None:
+        raise ValueError("Breakpoints cannot be used with exact_hex")
+    if request.profile_id is None:
+        return ranges
+    if any(value is not None for value in ranges):
+        raise ValueError("Send either profile_id or range values, not both")
+    return profile_store.get(request.profile_id)['ranges']
+
+def _resolve_transform(request):
+    """
+    Get the compiled ScalingTransform for a request.
+    
+    Raises:
+        ValueError: If the range values or breakpoints are invalid
+        KeyError: If the profile does not exist
+    """
+    if request.breakpoints is not None:
+        ranges = (request.x1, request.x2, request.y1, request.y2, request.z1, request.z2)
+        if request.profile_id is not None or any(value is not None for value in ranges):
+            raise ValueError("Send either breakpoints or range values, not both")
+    else:
+        ranges = _resolve_ranges(request)
+        if request.profile_id is not None:
+            return profile_store.transform(request.profile_id, request.z_in_hex)
+    try:
+        if request.breakpoints is not None:
+            return get_piecewise_transform(request.breakpoints, z_in_hex=request.z_in_hex, extrapolate=request.extrapolate)
+        return get_scaling_transform(*ranges, z_in_hex=request.z_in_hex)
+    except ValueError:
+        metrics.inc("scaling_invalid_ranges_total")
+        raise
+
+def _record_scaling(http_request: Request, request):
+    """Label the request with its driving axis and count its Z format for /metrics"""
+    if request.scale_from in AXES:
+        http_request.state.scale_from = request.scale_from
+    metrics.inc("scaling_z_format_total", "hex" if request.z_in_hex else "decimal")
+
 @app.post("/scale", response_model=ScalingResponse, responses={400: {"model": ValidationError}})
-async def scale_coordinates_endpoint(request: ScalingRequest):
+async def scale_coordinates_endpoint(request: ScalingRequest, http_request: Request, response: Response):
     """
     Perform scaling calculation based on the specified axis.
     
@@ -58,32 +336,708 @@ async def scale_coordinates_endpoint(request: ScalingRequest):
         
     Returns:
         ScalingResponse with calculated coordinates
+        
+    Results are served from the response cache when the same normalized
+    request was answered within the TTL. Every response carries an ETag,
+    and a matching If-None-Match gets 304 Not Modified.
     """
+    _record_scaling(http_request, request)
+    timer = getattr(http_request.state, "timer", None)
+    if timer is not None:
+        # Receiving the body and validating it into ScalingRequest
+        timer.lap("parse")
     try:
-        # Pass all range values as strings - the new scale_coordinates handles partial data
-        result = scale_coordinates(
+        etag, result = await _cached_scale(request, timer)
+        if etag_matches(http_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return ScalingResponse(**result)
+        
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ZeroDivisionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+async def _cached_scale(request: ScalingRequest, timer=None):
+    """
+    Get the /scale result from the response cache, computing it on a miss.
+    
+    Returns:
+        tuple: (etag, result)
+    """
+    key = _scale_cache_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        if timer is not None:
+            timer.lap("cache")
+        return cached
+    if scale_coalescer is not None and not (request.z_in_hex and request.exact_hex):
+        result = await _scale_coalesced(request, timer)
+    else:
+        result = _scale_single(request, timer)
+    return response_cache.put(key, result), result
+
+def _scale_cache_key(request: ScalingRequest):
+    """
+    Build the response cache key for a /scale request.
+    
+    Only the driving input affects the result, so the other inputs are left
+    out. Range values are stripped like get_scaling_transform does, and a
+    profile contributes its stored ranges so that deleting it is noticed.
+    
+    Raises:
+        KeyError: If the profile does not exist
+    """
+    driving = {'x': request.x_input, 'y': request.y_input, 'z': request.z_input}.get(request.scale_from)
+    ranges = tuple(
+        value.strip() if value is not None else None
+        for value in (request.x1, request.x2, request.y1, request.y2, request.z1, request.z2)
+    )
+    profile = None
+    if request.profile_id is not None:
+        profile = (request.profile_id, profile_store.get(request.profile_id)['ranges'])
+    breakpoints = None
+    if request.breakpoints is not None:
+        breakpoints = (tuple(sorted((axis, tuple(values)) for axis, values in request.breakpoints.items())), request.extrapolate)
+    return (driving, request.scale_from, request.z_in_hex, request.exact_hex, ranges, profile, breakpoints)
+
+def _scale_single(request: ScalingRequest, timer=None):
+    """
+    Compute the /scale result for a request.
+    
+    Returns:
+        dict: Calculated coordinates
+    """
+    if request.z_in_hex and request.exact_hex:
+        return scale_coordinates_exact_hex(
             request.x_input,
-            request.y_input, 
+            request.y_input,
             request.z_input,
-            request.x1, request.x2, request.y1, request.y2, request.z1, request.z2,
-            scale_from=request.scale_from,
-            z_in_hex=request.z_in_hex
+            *_resolve_ranges(request),
+            scale_from=request.scale_from
         )
+    
+    # Range values are passed as strings - the transform handles partial data
+    transform = _resolve_transform(request)
+    if timer is not None:
+        timer.lap("ranges")
+    return transform.scale(
+        request.x_input,
+        request.y_input,
+        request.z_input,
+        scale_from=request.scale_from,
+        timer=timer
+    )
+
+async def _scale_coalesced(request: ScalingRequest, timer=None):
+    """
+    Compute the /scale result in a pass shared with concurrent requests.
+    
+    Returns:
+        dict: Calculated coordinates, identical to _scale_single
+    """
+    transform = _resolve_transform(request)
+    if timer is not None:
+        timer.lap("ranges")
+    driving = {'x': request.x_input, 'y': request.y_input, 'z': request.z_input}.get(request.scale_from)
+    result = await scale_coalescer.scale(transform, driving, request.scale_from)
+    if timer is not None:
+        # Waiting for the window plus the shared pass
+        timer.lap("batch")
+    return result
+
+# Media types are spelled out so the docs do not import wire_formats; test_openapi_media_types checks them
+@app.post(
+    "/scale/batch",
+    response_model=BatchScalingResponse,
+    responses={
+        200: {"content": {"application/msgpack": {}, "application/vnd.apache.arrow.stream": {}}},
+        400: {"model": ValidationError},
+        406: {"model": ValidationError},
+        415: {"model": ValidationError},
+    },
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": BatchScalingRequest.model_json_schema(ref_template="#/components/schemas/{model}")},
+        "application/msgpack": {},
+        "application/vnd.apache.arrow.stream": {},
+    }}},
+)
+async def scale_batch_endpoint(http_request: Request):
+    """
+    Perform scaling for many points sharing one range set.
+    
+    Args:
+        http_request: Body in JSON (BatchScalingRequest), MessagePack or
+            Arrow IPC, chosen by Content-Type
         
-        return ScalingResponse(**result)
+    Returns:
+        BatchScalingResponse with numeric coordinate arrays and validity masks,
+        in the format chosen by the Accept header (the request format by default)
         
+    Batches of PARALLEL_THRESHOLD points or more run on the process pool.
+    """
+    from wire_formats import MEDIA_JSON, available_media_types, encode_batch_response, negotiate, request_media_type
+    try:
+        request_type = request_media_type(http_request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    response_type = negotiate(http_request.headers.get("accept"), default=request_type)
+    if response_type is None:
+        raise HTTPException(
+            status_code=406, detail=f"Acceptable formats: {', '.join(available_media_types())}"
+        )
+    request = _parse_batch_request(await http_request.body(), request_type)
+    
+    _record_scaling(http_request, request)
+    try:
+        result = await _compute_batch(request)
+        if response_type != MEDIA_JSON:
+            # Binary formats carry exact hex Z as uint64 values
+            return Response(encode_batch_response(result, response_type), media_type=response_type)
+        return _batch_json_response(result, request)
+        
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except ZeroDivisionError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+async def _compute_batch(request: BatchScalingRequest):
+    """
+    Compute a batch request with the exact hex path, the process pool or the compiled transform.
+    
+    Returns:
+        dict: Coordinate arrays and validity masks (Z as uint64 for exact hex)
+    """
+    inputs = (request.x_inputs, request.y_inputs, request.z_inputs)
+    driving = {'x': request.x_inputs, 'y': request.y_inputs, 'z': request.z_inputs}.get(request.scale_from)
+    if request.z_in_hex and request.exact_hex:
+        return scale_coordinates_batch_exact_hex(*inputs, *_resolve_ranges(request), scale_from=request.scale_from)
+    if driving is not None and len(driving) >= PARALLEL_THRESHOLD and request.breakpoints is None:
+        # Run off the event loop so other clients are not blocked
+        from parallel_scaling import scale_coordinates_batch_parallel
+        return await run_in_threadpool(
+            scale_coordinates_batch_parallel, _parallel_scaler(), *inputs, *_resolve_ranges(request),
+            scale_from=request.scale_from, z_in_hex=request.z_in_hex
+        )
+    return _resolve_transform(request).scale_batch(*inputs, scale_from=request.scale_from)
+
+def _batch_json_response(result, request: BatchScalingRequest) -> BatchScalingResponse:
+    """Convert batch result arrays to the JSON response, with exact hex Z as z_hex strings"""
+    if request.z_in_hex and request.exact_hex:
+        z_hex = format_hex_array(result['z'], result['z_valid']).tolist()
+        result = {**result, 'z': result['z'].astype(float)}
+        return BatchScalingResponse(z_hex=z_hex, **{key: value.tolist() for key, value in result.items()})
+    return BatchScalingResponse(**{key: value.tolist() for key, value in result.items()})
+
+def _parse_batch_request(body: bytes, media_type: str) -> BatchScalingRequest:
+    """
+    Validate a batch request body in any supported format.
+    
+    Numeric buffers and Arrow columns skip pydantic's per-element
+    validation and stay NumPy float64 arrays; every other field, including
+    inputs sent as lists, is validated as for JSON.
+    
+    Raises:
+        HTTPException: 400 if a binary body is malformed
+        RequestValidationError: If the fields do not match BatchScalingRequest
+    """
+    from wire_formats import MEDIA_JSON, decode_batch_request
+    try:
+        if media_type == MEDIA_JSON:
+            return BatchScalingRequest.model_validate_json(body)
+        try:
+            fields, inputs = decode_batch_request(body, media_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        request = BatchScalingRequest.model_validate(fields)
+    except PydanticValidationError as e:
+        # Report locations like FastAPI's own body validation
+        raise RequestValidationError([{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)])
+    return request.model_copy(update={field: value for field, value in inputs.items() if value is not None})
+
+@app.post("/profiles", status_code=201, response_model=ProfileResponse, responses={400: {"model": ValidationError}})
+async def register_profile(request: ProfileRequest):
+    """
+    Register a named range set and get back its profile ID.
+    
+    Registering the same ranges again returns the same ID with the new name.
+    """
+    try:
+        return profile_store.register(
+            request.name,
+            request.x1, request.x2, request.y1, request.y2, request.z1, request.z2
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/profiles", response_model=List[ProfileResponse])
+async def list_profiles():
+    """List registered range profiles"""
+    return profile_store.list()
+
+@app.get("/profiles/{profile_id}", response_model=ProfileResponse, responses={404: {"model": ValidationError}})
+async def get_profile(profile_id: str):
+    """Get one registered range profile"""
+    try:
+        return profile_store.describe(profile_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@app.delete("/profiles/{profile_id}", responses={404: {"model": ValidationError}})
+async def delete_profile(profile_id: str):
+    """Delete a registered range profile"""
+    try:
+        profile_store.delete(profile_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"status": "deleted", "id": profile_id}
+
+def _grid_store():
+    """The grid store, opened on first use so an unreadable index fails the grid endpoints instead of start-up"""
+    global grid_store
+    if grid_store is None:
+        from grid_interpolation import DEFAULT_STORE_DIR, GridStore
+        try:
+            grid_store = GridStore(os.environ.get("SCALING_GRID_STORE", DEFAULT_STORE_DIR))
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    return grid_store
+
+@app.post("/grids", status_code=201, response_model=GridResponse, responses={400: {"model": ValidationError}})
+async def register_grid(request: GridRequest):
+    """
+    Store a 2D or 3D grid of correction values and get back its grid ID.
+    
+    Registering the same values and placement again returns the same ID.
+    """
+    try:
+        return await run_in_threadpool(_grid_store().register, request.name, request.values, request.origin, request.spacing)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/grids", response_model=List[GridResponse])
+async def list_grids():
+    """List stored grids"""
+    return _grid_store().list()
+
+@app.get("/grids/{grid_id}", response_model=GridResponse, responses={404: {"model": ValidationError}})
+async def get_grid(grid_id: str):
+    """Get the shape and placement of one stored grid"""
+    try:
+        return _grid_store().describe(grid_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@app.delete("/grids/{grid_id}", responses={404: {"model": ValidationError}})
+async def delete_grid(grid_id: str):
+    """Delete a stored grid"""
+    try:
+        _grid_store().delete(grid_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"status": "deleted", "id": grid_id}
+
+@app.post("/grids/{grid_id}/interpolate", response_model=GridInterpolationResponse,
+          responses={400: {"model": ValidationError}, 404: {"model": ValidationError}})
+async def interpolate_grid(grid_id: str, request: GridInterpolationRequest):
+    """
+    Interpolate a stored grid at a batch of query points.
+    
+    2D grids are interpolated bilinearly from x and y inputs, 3D grids
+    trilinearly from x, y and z inputs. Points with a null input are
+    invalid. Batches of PARALLEL_THRESHOLD points or more run on the
+    process pool.
+    """
+    try:
+        grid = _grid_store().get(grid_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    from grid_interpolation import interpolate_batch
+    scaler = _parallel_scaler() if len(request.x_inputs) >= PARALLEL_THRESHOLD else None
+    try:
+        # Off the event loop: large batches take a while even without the pool
+        result = await run_in_threadpool(
+            interpolate_batch, grid, request.x_inputs, request.y_inputs, request.z_inputs,
+            extrapolate=request.extrapolate, scaler=scaler
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return GridInterpolationResponse(**{key: value.tolist() for key, value in result.items()})
+
+@app.post("/calibration/fit", response_model=CalibrationFitResponse, responses={400: {"model": ValidationError}})
+async def fit_calibration(request: CalibrationFitRequest):
+    """
+    Fit a least-squares line to measured (input, output) pairs.
+    
+    Returns the fit with residual statistics and a range set whose source
+    range spans the inputs and whose target range holds the fitted outputs.
+    Null or non-finite pairs are skipped.
+    """
+    from calibration import LinearFit
+    try:
+        # Off the event loop: parsing and summing long sample lists takes a while
+        fit = await run_in_threadpool(LinearFit().update, request.inputs, request.outputs)
+        base = {key: getattr(request, key) for key in RANGE_KEYS}
+        return {"fit": fit.result(), "ranges": fit.ranges(request.source, request.target, base)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post(
+    "/lookup-table",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/octet-stream": {}, "text/x-c": {}}}, 400: {"model": ValidationError}},
+)
+async def export_lookup_table(request: LookupTableRequest):
+    """
+    Stream a dense lookup table of evenly spaced inputs and their scaled coordinates.
+    
+    The table is scaled and serialized one chunk at a time while it is sent,
+    so it is never held in memory and the first bytes do not wait for the
+    rest. Options are validated before streaming starts.
+    """
+    from lookup_table import EXTENSIONS, MEDIA_TYPES, export_table
+    try:
+        table = export_table(
+            (request.x1, request.x2, request.y1, request.y2, request.z1, request.z2), request.count,
+            scale_from=request.scale_from, start=request.start, step=request.step, fmt=request.format,
+            z_in_hex=request.z_in_hex, dtype=request.dtype, name=request.name
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filename = f"{request.name}{EXTENSIONS[request.format]}"
+    return StreamingResponse(
+        table,
+        media_type=MEDIA_TYPES[request.format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+class JobOptions(BaseModel):
+    format: Optional[str] = None
+    scale_from: str = 'x'
+    x1: str = ""
+    x2: str = ""
+    y1: str = ""
+    y2: str = ""
+    z1: str = ""
+    z2: str = ""
+    z_in_hex: bool = False
+    exact_hex: bool = False
+    x_column: str = 'x'
+    y_column: str = 'y'
+    z_column: str = 'z'
+    input_dtype: str = 'float64'
+    output_dtype: str = 'float64'
+    chunk_size: Optional[int] = None
+
+class JobRequest(JobOptions):
+    input_path: str
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    format: str
+    scale_from: str
+    rows: int
+    done: int
+    total: int
+    unit: str
+    progress: float
+    error: Optional[str] = None
+    created: float
+    finished: Optional[float] = None
+
+JOB_ERRORS = {400: {"model": ValidationError}, 429: {"model": ValidationError}}
+
+def _submit_job(input_path: str, options: JobOptions, owns_input: bool = False):
+    from jobs import JobQueueFull
+    try:
+        return _job_manager().submit(input_path, options.model_dump(exclude={'input_path'}), owns_input=owns_input).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def _get_job(job_id: str):
+    try:
+        return _job_manager().get(job_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@app.post("/jobs", status_code=202, response_model=JobResponse, responses=JOB_ERRORS)
+async def submit_job(request: JobRequest):
+    """
+    Queue a scaling job for a file on the server.
+    
+    The file must be inside SCALING_JOB_INPUT_DIR; without it only uploads
+    are accepted. The file is scaled in the background on the job worker
+    pool; poll /jobs/{id} or stream /jobs/{id}/events for progress.
+    """
+    try:
+        input_path = _job_manager().resolve_input(request.input_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _submit_job(input_path, request)
+
+@app.post("/jobs/upload", status_code=202, response_model=JobResponse, responses=JOB_ERRORS,
+          openapi_extra={"requestBody": {"content": {"application/octet-stream": {}}, "required": True}})
+async def upload_job(http_request: Request, options: Annotated[JobOptions, Query()]):
+    """
+    Queue a scaling job for a file sent as the request body.
+    
+    Job options go in the query string and format is required. The body is
+    streamed to disk, so uploads of any size use constant memory.
+    """
+    from jobs import JobQueueFull
+    try:
+        path = _job_manager().upload_path(options.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    try:
+        with open(path, "wb") as f:
+            async for chunk in http_request.stream():
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return _submit_job(path, options, owns_input=True)
+
+@app.get("/jobs", response_model=List[JobResponse])
+async def list_jobs():
+    """List queued, running and recently finished jobs"""
+    return [job.to_dict() for job in _job_manager().list()]
+
+@app.get("/jobs/{job_id}", response_model=JobResponse, responses={404: {"model": ValidationError}})
+async def get_job(job_id: str):
+    """Get the status and progress of a job"""
+    return _get_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/events", responses={404: {"model": ValidationError}})
+async def job_events(job_id: str):
+    """
+    Stream job progress as server-sent events.
+    
+    Each event carries the job as JSON; the stream ends once the job has
+    finished.
+    """
+    from jobs import FINISHED_STATES
+    job = _get_job(job_id)
+
+    async def events():
+        last = None
+        while True:
+            state = job.to_dict()
+            if state != last:
+                yield f"data: {json.dumps(state)}\n\n"
+                last = state
+            if state['status'] in FINISHED_STATES:
+                return
+            await asyncio.sleep(JOB_EVENT_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/jobs/{job_id}/result", responses={404: {"model": ValidationError}, 409: {"model": ValidationError}})
+async def job_result(job_id: str):
+    """Download the scaled file of a completed job"""
+    job = _get_job(job_id)
+    status = job.status
+    if status != 'completed':
+        raise HTTPException(status_code=409, detail=f"Job is {status}")
+    filename = "scaled" + os.path.splitext(job.output_path)[1]
+    return FileResponse(job.output_path, filename=filename, media_type="application/octet-stream")
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse, responses={404: {"model": ValidationError}})
+async def cancel_job(job_id: str):
+    """Cancel a job; a running job stops after its current chunk"""
+    try:
+        return _job_manager().cancel(job_id).to_dict()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+@app.delete("/jobs/{job_id}", responses={404: {"model": ValidationError}})
+async def delete_job(job_id: str):
+    """Cancel a job if needed and delete it with its result"""
+    try:
+        _job_manager().remove(job_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"status": "deleted", "id": job_id}
+
+class HistoryEntry(BaseModel):
+    x1: str = ""
+    x2: str = ""
+    y1: str = ""
+    y2: str = ""
+    z1: str = ""
+    z2: str = ""
+    scale_from: str
+    input_value: str
+    output_x: str = ""
+    output_y: str = ""
+    output_z: str = ""
+    z_in_hex: bool = False
+
+class HistoryEntryRequest(HistoryEntry):
+    timestamp: Optional[datetime] = None # when the calculation was made, for imported entries; defaults to now
+
+class HistoryEntryResponse(HistoryEntry):
+    id: int
+    timestamp: str
+    range_key: str
+
+class HistoryPage(BaseModel):
+    entries: List[HistoryEntryResponse]
+    total: int
+    next_cursor: Optional[int] = None
+
+def _epoch(value: Optional[datetime]):
+    """Seconds since the epoch for a datetime; naive values are UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+@app.post("/history", status_code=202, responses={400: {"model": ValidationError}})
+async def add_history(request: HistoryEntryRequest):
+    """
+    Record a calculation in the history.
+    
+    Entries are written to the database in batches shortly afterwards. The
+    server sets the timestamp unless one is given, which keeps the original
+    time of entries imported from elsewhere.
+    """
+    try:
+        _history_store().add(request.model_dump(exclude={'timestamp'}), timestamp=_epoch(request.timestamp))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "queued"}
+
+@app.get("/history", response_model=HistoryPage, responses={400: {"model": ValidationError}})
+async def get_history(
+    limit: int = 50,
+    cursor: Optional[int] = None,
+    scale_from: Optional[str] = None,
+    range_key: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """
+    Get one page of calculation history, newest first.
+    
+    Pass the next_cursor of a page as cursor to get the following page.
+    Filters narrow the entries to one driving axis, one range set
+    (range_key, as returned with each entry) or a time window.
+    """
+    try:
+        return await run_in_threadpool(
+            _history_store().query, limit=limit, cursor=cursor, scale_from=scale_from,
+            range_key=range_key, since=_epoch(since), until=_epoch(until)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/history")
+async def clear_history():
+    """Delete the whole calculation history"""
+    deleted = await run_in_threadpool(_history_store().clear)
+    return {"status": "cleared", "deleted": deleted}
+
+# Work counters summed over every live scaling connection
+live_session_counters = Counter()
+live_session_count = 0
+
+@app.websocket("/ws/scale")
+async def live_scaling_endpoint(websocket: WebSocket, delta: bool = False):
+    """
+    Live scaling channel for interactive clients.
+    
+    The server keeps the current inputs and range set for each connection.
+    Clients send JSON messages holding a "seq" number and only the fields
+    that changed; every message is answered with the recomputed
+    coordinates (or an "error") tagged with the same "seq", so clients
+    can drop responses older than their latest message.
+    
+    Only the calculation stages that depend on changed fields are rerun.
+    With ?delta=1 a response holds only the coordinates that changed since
+    the previous successful response.
+    """
+    global live_session_count
+    await websocket.accept()
+    session = ScalingSession(counters=live_session_counters)
+    live_session_count += 1
+    
+    try:
+        while True:
+            text = await websocket.receive_text()
+            seq = None
+            try:
+                message = json.loads(text)
+                if not isinstance(message, dict):
+                    raise ValueError("Message must be a JSON object")
+                seq = message.pop("seq", None)
+                result = session.update_delta(message) if delta else session.update(message)
+                reply = {"seq": seq, **result}
+            except (ValueError, ZeroDivisionError, OverflowError) as e:
+                reply = {"seq": seq, "error": str(e)}
+            except Exception as e:
+                # Any other failure is reported like /scale's 500, keeping the session open
+                reply = {"seq": seq, "error": f"Internal server error: {str(e)}"}
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_session_count -= 1
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "scaling-range-tauri-backend"}
 
+@app.get("/ready", responses={503: {"model": ValidationError}})
+async def ready_check():
+    """Readiness probe: 200 only once start-up has finished and requests can be served"""
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Backend is starting")
+    return {"status": "ready"}
+
+@app.get("/stats")
+async def stats():
+    """Cache statistics for confirming hit rates and evictions"""
+    return {
+        "transform_cache": transform_cache_info(),
+        "response_cache": response_cache.info(),
+        "coalescer": scale_coalescer.info() if scale_coalescer is not None else None,
+        "live_sessions": {"active": live_session_count, **summarize_counters(live_session_counters)},
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Request counts, errors and latency histograms in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/profile", responses={400: {"model": ValidationError}, 409: {"model": ValidationError}})
+async def profile_endpoint(seconds: float = 10.0, sort: str = "cumulative", limit: int = 30):
+    """
+    Run cProfile over live traffic for a number of seconds.
+    
+    Returns the top functions by the sort key ('cumulative', 'tottime' or
+    'calls') once the period ends.
+    """
+    try:
+        return await profile_event_loop(seconds, sort=sort, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -92,13 +1046,121 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /scale": "Perform scaling calculations",
-            "GET /health": "Health check"
+            "POST /scale/batch": "Perform vectorized scaling for many points",
+            "POST /profiles": "Register a named range set",
+            "GET /profiles": "List range profiles",
+            "POST /calibration/fit": "Fit a range set to measured sample pairs",
+            "POST /lookup-table": "Stream a dense lookup table as CSV, raw binary or C",
+            "DELETE /profiles/{id}": "Delete a range profile",
+            "POST /grids": "Store a 2D or 3D correction grid",
+            "GET /grids": "List stored grids",
+            "GET /grids/{id}": "Get a stored grid",
+            "DELETE /grids/{id}": "Delete a stored grid",
+            "POST /grids/{id}/interpolate": "Bilinear/trilinear interpolation of a grid for a batch of points",
+            "POST /jobs": "Queue a scaling job for a server-side file",
+            "POST /jobs/upload": "Queue a scaling job for an uploaded file",
+            "GET /jobs/{id}": "Job status and progress",
+            "GET /jobs/{id}/events": "Job progress as server-sent events",
+            "GET /jobs/{id}/result": "Download a finished job's result",
+            "POST /jobs/{id}/cancel": "Cancel a job",
+            "POST /history": "Record a calculation",
+            "GET /history": "Page through calculation history",
+            "DELETE /history": "Clear calculation history",
+            "GET /health": "Health check",
+            "GET /ready": "Readiness probe",
+            "GET /stats": "Cache statistics",
+            "GET /metrics": "Prometheus metrics",
+            "POST /admin/profile": "Profile live traffic for N seconds",
+            "WS /ws/scale": "Live scaling with incremental updates"
         }
     }
 
+async def _rpc_call(model, params, compute):
+    """
+    Validate JSON-RPC params into a request model and run compute on it.
+    
+    Raises:
+        RpcError: INVALID_PARAMS for validation errors, otherwise the HTTP
+            status the same failure gets from the endpoints
+    """
+    from rpc import INVALID_PARAMS, RpcError
+    try:
+        request = model.model_validate(params)
+    except PydanticValidationError as e:
+        raise RpcError(INVALID_PARAMS, "Invalid params", e.errors(include_url=False, include_context=False))
+    try:
+        return await compute(request)
+    except KeyError as e:
+        raise RpcError(404, e.args[0])
+    except (ValueError, ZeroDivisionError) as e:
+        raise RpcError(400, str(e))
+
+async def _rpc_scale(params: dict):
+    """JSON-RPC "scale": the same request and result as POST /scale"""
+    async def compute(request):
+        _, result = await _cached_scale(request)
+        return result
+    return await _rpc_call(ScalingRequest, params, compute)
+
+async def _rpc_scale_batch(params: dict):
+    """JSON-RPC "scale_batch": the same JSON request and result as POST /scale/batch"""
+    async def compute(request):
+        return _batch_json_response(await _compute_batch(request), request).model_dump()
+    return await _rpc_call(BatchScalingRequest, params, compute)
+
+async def _rpc_health(params: dict):
+    """JSON-RPC "health": the same result as GET /health"""
+    return await health_check()
+
+RPC_METHODS = {"scale": _rpc_scale, "scale_batch": _rpc_scale_batch, "health": _rpc_health}
+
+def run_rpc_server(transport: str, socket_path: Optional[str] = None):
+    """
+    Serve the scaling operations as JSON-RPC over a Unix socket or stdio instead of HTTP.
+    
+    A Unix socket server prints READY_LINE and the socket path once it
+    accepts connections; over stdio a "ready" notification is the first frame.
+    """
+    from rpc import JsonRpcServer
+    server = JsonRpcServer(RPC_METHODS)
+    warm_up()
+    try:
+        if transport == "unix":
+            path = socket_path or DEFAULT_SOCKET_PATH
+            asyncio.run(server.serve_unix(path, on_ready=lambda: print(f"{READY_LINE} unix:{path}", flush=True)))
+        else:
+            asyncio.run(server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_resources()
+
 def run_server(host: str = "127.0.0.1", port: int = 8001):
-    """Run the FastAPI server"""
-    uvicorn.run(app, host=host, port=port, log_level="info")
+    """Run the FastAPI server, printing READY_LINE and the URL once it is listening"""
+    # Imported here so importing the app (tests, ASGI servers) does not load uvicorn
+    import uvicorn
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            if self.started:
+                print(f"{READY_LINE} http://{host}:{port}", flush=True)
+
+    Server(uvicorn.Config(app, host=host, port=port, log_level="info")).run()
 
 if __name__ == "__main__":
-    run_server()
+    import argparse
+    import multiprocessing
+    # Needed for the process pool when the backend is frozen into an executable
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Scaling Range backend")
+    parser.add_argument("--transport", choices=("http", "unix", "stdio"), default="http",
+                        help="HTTP on --host/--port, JSON-RPC on a Unix socket, or JSON-RPC on stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP address to bind")
+    parser.add_argument("--port", type=int, default=8001, help="HTTP port to bind")
+    parser.add_argument("--socket", help=f"Unix socket path (default {DEFAULT_SOCKET_PATH})")
+    args = parser.parse_args()
+    if args.transport == "http":
+        run_server(args.host, args.port)
+    else:
+        run_rpc_server(args.transport, args.socket)
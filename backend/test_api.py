@@ -3,8 +3,15 @@ Test script for the scaling API
 """
 
 import asyncio
+import pytest
+from fastapi.testclient import TestClient
 from scaling_logic import scale_coordinates, validate_range_inputs
-from api_server import app, ScalingRequest
+from profiles import ProfileStore
+from coalescer import ScaleCoalescer
+import tauri_backend
+from tauri_backend import app, ScalingRequest
+
+client = TestClient(app)
 
 def test_scaling_logic_directly():
     """Test the scaling logic directly"""
@@ -61,7 +68,528 @@ def test_api_request():
     )
     
     print(f"Request model: {request}")
-    print(f"Request dict: {request.dict()}")
+    print(f"Request dict: {request.model_dump()}")
+
+def test_scale_endpoint():
+    """Test the single point /scale endpoint"""
+    response = client.post("/scale", json={
+        "x_input": "5", "y_input": "", "z_input": "",
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50",
+        "scale_from": "x", "z_in_hex": False
+    })
+    assert response.status_code == 200
+    assert response.json() == {"x": "5", "y": "50.0", "z": "25.0"}
+
+def test_scale_batch_endpoint():
+    """Test the /scale/batch endpoint"""
+    response = client.post("/scale/batch", json={
+        "z_inputs": ["A", "19", "", "GG"],
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50",
+        "scale_from": "z", "z_in_hex": True
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["x"] == [2.0, 5.0, 0.0, 0.0]
+    assert data["y"] == [20.0, 50.0, 0.0, 0.0]
+    assert data["z_valid"] == [True, True, False, False]
+    
+    response = client.post("/scale/batch", json={
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50",
+        "scale_from": "x"
+    })
+    assert response.status_code == 400
+
+def test_live_scaling_websocket():
+    """Test incremental updates over the live scaling channel"""
+    with client.websocket_connect("/ws/scale") as websocket:
+        websocket.send_json({"seq": 1, "x1": "0", "x2": "10", "y1": "0", "y2": "100", "x_input": "5"})
+        assert websocket.receive_json() == {"seq": 1, "x": "5", "y": "50.0", "z": ""}
+        
+        # Only the changed field is sent; the range set is kept per connection
+        websocket.send_json({"seq": 2, "x_input": "2.5"})
+        assert websocket.receive_json() == {"seq": 2, "x": "2.5", "y": "25.0", "z": ""}
+        
+        websocket.send_json({"seq": 3, "scale_from": "w"})
+        assert websocket.receive_json()["error"] == "scale_from must be 'x', 'y', or 'z'"
+        
+        # Rejected updates leave the connection state untouched
+        websocket.send_json({"seq": 4, "y2": "200"})
+        assert websocket.receive_json() == {"seq": 4, "x": "2.5", "y": "50.0", "z": ""}
+        
+        websocket.send_json({"seq": 5, "bogus": "1"})
+        assert websocket.receive_json() == {"seq": 5, "error": "Unknown field: bogus"}
+
+def test_live_scaling_websocket_overflow():
+    """Test that a hex Z too large to convert is answered with an error and the session stays open"""
+    with client.websocket_connect("/ws/scale") as websocket:
+        websocket.send_json({
+            "seq": 1, "x1": "0", "x2": "1", "y1": "0", "y2": "1", "z1": "0", "z2": "1" * 300,
+            "z_in_hex": True, "x_input": "1e300"
+        })
+        assert "error" in websocket.receive_json()
+        
+        websocket.send_json({"seq": 2, "x_input": "1"})
+        response = websocket.receive_json()
+        assert response["seq"] == 2 and response["x"] == "1" and response["z"].startswith("0x")
+
+def test_live_scaling_websocket_delta():
+    """Test that delta mode sends only the coordinates that changed"""
+    before = client.get("/stats").json()["live_sessions"]
+    with client.websocket_connect("/ws/scale?delta=1") as websocket:
+        websocket.send_json({"seq": 1, "x1": "0", "x2": "10", "y1": "0", "y2": "100", "x_input": "5"})
+        assert websocket.receive_json() == {"seq": 1, "x": "5", "y": "50.0"}
+        
+        websocket.send_json({"seq": 2, "z1": "0", "z2": "1"})
+        assert websocket.receive_json() == {"seq": 2, "z": "0.5"}
+        
+        # Nothing changed: an empty response still acknowledges the seq
+        websocket.send_json({"seq": 3, "y1": "0"})
+        assert websocket.receive_json() == {"seq": 3}
+        assert client.get("/stats").json()["live_sessions"]["active"] == before["active"] + 1
+    
+    after = client.get("/stats").json()["live_sessions"]
+    assert after["active"] == before["active"]
+    assert after["updates"] - before["updates"] == 3
+    assert after["fields_sent"] - before["fields_sent"] == 3
+    assert after["slope"]["reused"] > before["slope"]["reused"]
+
+@pytest.fixture
+def profile_store(tmp_path, monkeypatch):
+    """Use a temporary profile store"""
+    store = ProfileStore(tmp_path / "profiles.json")
+    monkeypatch.setattr(tauri_backend, "profile_store", store)
+    return store
+
+def test_profile_endpoints(profile_store):
+    """Test registering, listing and deleting range profiles"""
+    response = client.post("/profiles", json={
+        "name": "bench", "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"
+    })
+    assert response.status_code == 201
+    profile_id = response.json()["id"]
+    
+    assert [profile["id"] for profile in client.get("/profiles").json()] == [profile_id]
+    assert client.get(f"/profiles/{profile_id}").json()["name"] == "bench"
+    
+    response = client.post("/profiles", json={
+        "name": "bad", "x1": "", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"
+    })
+    assert response.status_code == 400
+    
+    assert client.delete(f"/profiles/{profile_id}").status_code == 200
+    assert client.get(f"/profiles/{profile_id}").status_code == 404
+    assert client.delete(f"/profiles/{profile_id}").status_code == 404
+
+def test_grid_endpoints(tmp_path, monkeypatch):
+    """Test storing a grid and interpolating it in-process and on the process pool"""
+    from grid_interpolation import GridStore
+    from parallel_scaling import ParallelScaler
+    monkeypatch.setattr(tauri_backend, "grid_store", GridStore(str(tmp_path)))
+    response = client.post("/grids", json={
+        "name": "stage", "values": [[[0, 1], [10, 11]], [[100, 101], [110, 111]]], "spacing": [2, 2, 2]
+    })
+    assert response.status_code == 201
+    grid_id = response.json()["id"]
+    assert response.json()["shape"] == [2, 2, 2]
+    assert client.get(f"/grids/{grid_id}").json()["spacing"] == [2.0, 2.0, 2.0]
+
+    body = {"x_inputs": [1, 2, None], "y_inputs": [1, 0, 0], "z_inputs": [1, 2, 0]}
+    expected = {"values": [55.5, 101.0, 0.0], "valid": [True, True, False]}
+    assert client.post(f"/grids/{grid_id}/interpolate", json=body).json() == expected
+
+    with ParallelScaler(workers=1, chunk_size=2) as scaler:
+        monkeypatch.setattr(tauri_backend, "parallel_scaler", scaler)
+        monkeypatch.setattr(tauri_backend, "PARALLEL_THRESHOLD", 3)
+        assert client.post(f"/grids/{grid_id}/interpolate", json=body).json() == expected
+
+    assert client.post(f"/grids/{grid_id}/interpolate", json={**body, "z_inputs": None}).status_code == 400
+    assert client.post("/grids", json={"name": "flat", "values": [[1, 2]]}).status_code == 400
+    assert client.delete(f"/grids/{grid_id}").status_code == 200
+    assert client.post(f"/grids/{grid_id}/interpolate", json=body).status_code == 404
+
+def test_grid_store_opened_on_first_use(tmp_path, monkeypatch):
+    """Test that a malformed grid index fails the grid endpoints, not the app"""
+    (tmp_path / "index.json").write_text('{"a": 1}')
+    monkeypatch.setenv("SCALING_GRID_STORE", str(tmp_path))
+    monkeypatch.setattr(tauri_backend, "grid_store", None)
+    assert client.get("/health").status_code == 200
+    response = client.get("/grids")
+    assert response.status_code == 500
+    assert "Cannot read grid store" in response.json()["detail"]
+    
+    (tmp_path / "index.json").write_text("[]")
+    assert client.get("/grids").json() == []
+
+def test_scale_with_profile(profile_store):
+    """Test /scale and /scale/batch with a profile ID instead of ranges"""
+    profile_id = profile_store.register("bench", "0", "10", "0", "100", "0", "10")["id"]
+    
+    response = client.post("/scale", json={
+        "x_input": "5", "y_input": "", "z_input": "",
+        "profile_id": profile_id, "scale_from": "x", "z_in_hex": True
+    })
+    assert response.json() == {"x": "5", "y": "50.0", "z": "0x5"}
+    
+    response = client.post("/scale/batch", json={
+        "y_inputs": [50, 100], "profile_id": profile_id, "scale_from": "y"
+    })
+    assert response.json()["x"] == [5.0, 10.0]
+    
+    response = client.post("/scale", json={
+        "x_input": "5", "y_input": "", "z_input": "", "x1": "0",
+        "profile_id": profile_id, "scale_from": "x"
+    })
+    assert response.status_code == 400
+    
+    response = client.post("/scale", json={
+        "x_input": "5", "y_input": "", "z_input": "", "profile_id": "missing", "scale_from": "x"
+    })
+    assert response.status_code == 404
+
+def test_exact_hex():
+    """Test exact 64-bit hex Z on /scale and /scale/batch"""
+    base = 2 ** 63 + 12345
+    ranges = {"x1": "0", "x2": "4096", "y1": "0", "y2": "1", "z1": str(base), "z2": str(base + 4096)}
+    
+    response = client.post("/scale", json={
+        "x_input": "7", "y_input": "", "z_input": "", "scale_from": "x",
+        "z_in_hex": True, "exact_hex": True, **ranges
+    })
+    assert response.json()["z"] == hex(base + 7)
+    
+    response = client.post("/scale/batch", json={
+        "x_inputs": [7, None], "scale_from": "x", "z_in_hex": True, "exact_hex": True, **ranges
+    })
+    assert response.json()["z_hex"] == [hex(base + 7), ""]
+    assert response.json()["z_valid"] == [True, False]
+
+def test_scale_with_breakpoints():
+    """Test piecewise-linear breakpoints on /scale and /scale/batch"""
+    breakpoints = {"x": [0, 5, 10], "y": [0, 100, 120], "z": [0, 10, 20]}
+    response = client.post("/scale", json={
+        "x_input": "", "y_input": "110", "z_input": "", "scale_from": "y", "breakpoints": breakpoints
+    })
+    assert response.status_code == 200
+    assert response.json() == {"x": "7.5", "y": "110", "z": "15.0"}
+    
+    response = client.post("/scale/batch", json={
+        "x_inputs": [5, 20], "scale_from": "x", "breakpoints": breakpoints, "extrapolate": False
+    })
+    assert response.json()["y"] == [100.0, 120.0]
+    
+    response = client.post("/scale", json={
+        "x_input": "1", "y_input": "", "z_input": "", "scale_from": "x", "breakpoints": breakpoints, "x1": "0"
+    })
+    assert response.status_code == 400
+
+def test_metrics_endpoint():
+    """Test request, latency, Z format and invalid range metrics"""
+    metrics = tauri_backend.metrics
+    before = metrics.value("scaling_invalid_ranges_total") or 0
+    ranges = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+    client.post("/scale", json={"x_input": "5", "y_input": "", "z_input": "", "scale_from": "y", **ranges})
+    client.post("/scale", json={
+        "x_input": "5", "y_input": "", "z_input": "", "scale_from": "x", **ranges, "x2": "1.2.3"
+    })
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'scaling_http_requests_total{method="POST",endpoint="/scale",status="200"}' in response.text
+    assert 'scaling_http_errors_total{endpoint="/scale",status="400"}' in response.text
+    assert 'scaling_request_duration_seconds_count{endpoint="/scale",scale_from="y"}' in response.text
+    assert 'scaling_z_format_total{format="decimal"}' in response.text
+    assert metrics.value("scaling_invalid_ranges_total") == before + 1
+
+def test_server_timing_header():
+    """Test that opted-in requests get per-stage Server-Timing headers"""
+    body = {
+        "x_input": "5", "y_input": "", "z_input": "", "scale_from": "x",
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"
+    }
+    assert "server-timing" not in client.post("/scale", json=body).headers
+    
+    body["x_input"] = "6.25"  # not in the response cache yet
+    timing = client.post("/scale", json=body, headers={"X-Server-Timing": "1"}).headers["server-timing"]
+    stages = [entry.split(";")[0] for entry in timing.split(", ")]
+    assert stages == ["parse", "ranges", "input", "math", "format", "respond", "total"]
+
+def test_profile_endpoint():
+    """Test the on-demand profiler endpoint"""
+    response = client.post("/admin/profile", params={"seconds": 0.05, "limit": 5})
+    assert response.status_code == 200
+    assert len(response.json()["functions"]) <= 5
+    assert client.post("/admin/profile", params={"seconds": 1000}).status_code == 400
+
+def test_scale_response_cache():
+    """Test that repeated /scale requests hit the cache and revalidate with ETags"""
+    body = {
+        "x_input": "7.75", "y_input": "", "z_input": "", "scale_from": "x",
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"
+    }
+    hits = tauri_backend.response_cache.hits
+    first = client.post("/scale", json=body)
+    etag = first.headers["etag"]
+    
+    # Whitespace in ranges and the non-driving inputs do not change the key
+    second = client.post("/scale", json={**body, "x1": " 0 ", "y_input": "12"})
+    assert second.json() == first.json()
+    assert second.headers["etag"] == etag
+    assert tauri_backend.response_cache.hits == hits + 1
+    
+    revalidated = client.post("/scale", json=body, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert client.post("/scale", json={**body, "x_input": "1"}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_calibration_fit_endpoint():
+    """Test fitting a range set to sample pairs and using it with /scale"""
+    response = client.post("/calibration/fit", json={
+        "inputs": [0, 1, 2, None], "outputs": [10, 30, 50, 70], "source": "y", "target": "z", "x1": "0", "x2": "1"
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["fit"]["slope"], body["fit"]["count"], body["fit"]["skipped"]) == (20.0, 3, 1)
+    assert body["ranges"] == {"x1": "0", "x2": "1", "y1": "0", "y2": "2", "z1": "10", "z2": "50"}
+    scaled = client.post("/scale", json={"x_input": "", "y_input": "1.5", "z_input": "", "scale_from": "y", **body["ranges"]})
+    assert scaled.json()["z"] == "40.0"
+    
+    assert client.post("/calibration/fit", json={"inputs": [1, 1], "outputs": [1, 2]}).status_code == 400
+    assert client.post("/calibration/fit", json={"inputs": [1, 2], "outputs": [1]}).status_code == 400
+
+def test_calibration_fit_runs_off_the_event_loop(monkeypatch):
+    """Test that fitting runs on the thread pool, like grid interpolation"""
+    calls = []
+    async def recording(func, *args, **kwargs):
+        calls.append(func.__qualname__)
+        return func(*args, **kwargs)
+    monkeypatch.setattr(tauri_backend, "run_in_threadpool", recording)
+    response = client.post("/calibration/fit", json={"inputs": [0, 1], "outputs": [0, 2]})
+    assert response.status_code == 200
+    assert calls == ["LinearFit.update"]
+
+def test_lookup_table_endpoint():
+    """Test streaming a lookup table export"""
+    body = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "count": 100001, "format": "csv"}
+    response = client.post("/lookup-table", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="scaling_lut.csv"'
+    lines = response.text.splitlines()
+    assert len(lines) == 100002
+    assert lines[-1] == "10.0,100.0,"
+    
+    raw = client.post("/lookup-table", json={**body, "count": 3, "format": "raw"})
+    assert raw.headers["content-type"] == "application/octet-stream"
+    assert len(raw.content) == 3 * 3 * 8
+    
+    assert client.post("/lookup-table", json={**body, "format": "xml"}).status_code == 400
+    assert client.post("/lookup-table", json={**body, "x2": "1.2.3"}).status_code == 400
+
+def test_rpc_methods_match_http():
+    """Test that the JSON-RPC methods answer like their HTTP endpoints"""
+    from rpc import INVALID_PARAMS, RpcError
+    ranges = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "255"}
+    body = {"x_input": "2.5", "y_input": "", "z_input": "", "scale_from": "x", **ranges}
+    batch = {"x_inputs": [1, None, 7.5], "scale_from": "x", **ranges}
+    methods = tauri_backend.RPC_METHODS
+
+    assert asyncio.run(methods["scale"](body)) == client.post("/scale", json=body).json()
+    assert asyncio.run(methods["scale_batch"](batch)) == client.post("/scale/batch", json=batch).json()
+    assert asyncio.run(methods["health"]({}))["status"] == "healthy"
+
+    for params, code in (({**body, "x_input": "abc"}, 400), ({**body, "scale_from": None}, INVALID_PARAMS)):
+        with pytest.raises(RpcError) as error:
+            asyncio.run(methods["scale"](params))
+        assert error.value.code == code
+
+def test_scale_coalesced(monkeypatch):
+    """Test that coalesced /scale requests give the same responses"""
+    body = {
+        "x_input": "3.25", "y_input": "", "z_input": "", "scale_from": "x",
+        "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "255", "z_in_hex": True
+    }
+    expected = client.post("/scale", json=body).json()
+    tauri_backend.response_cache.clear()
+    coalescer = ScaleCoalescer(window=0.0005, registry=tauri_backend.metrics)
+    monkeypatch.setattr(tauri_backend, "scale_coalescer", coalescer)
+    
+    response = client.post("/scale", json=body, headers={"X-Server-Timing": "1"})
+    assert response.json() == expected
+    assert "batch;dur=" in response.headers["server-timing"]
+    assert client.post("/scale", json={**body, "x_input": "abc"}).status_code == 400
+    assert client.post("/scale", json={**body, "x1": "1.2.3"}).status_code == 400
+    assert client.get("/stats").json()["coalescer"]["requests"] == 2
+    assert "scaling_coalesced_batch_size_bucket" in client.get("/metrics").text
+
+def test_scale_batch_content_negotiation(monkeypatch):
+    """Test format negotiation on /scale/batch when binary packages are missing"""
+    import wire_formats
+    monkeypatch.setattr(wire_formats, "msgpack", None)
+    body = {"x_inputs": [1, 2], "scale_from": "x", "x1": "0", "x2": "10", "y1": "0", "y2": "100"}
+    
+    response = client.post("/scale/batch", json=body, headers={"Accept": "application/msgpack, application/json;q=0.5"})
+    assert response.status_code == 200
+    assert response.json()["y"] == [10.0, 20.0]
+    assert client.post("/scale/batch", json=body, headers={"Accept": "application/msgpack"}).status_code == 406
+    assert client.post("/scale/batch", content=b"\x80", headers={"Content-Type": "application/msgpack"}).status_code == 415
+    
+    response = client.post("/scale/batch", json={**body, "scale_from": 1})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "scale_from"]
+
+def test_scale_batch_msgpack():
+    """Test MessagePack requests and responses on /scale/batch"""
+    pytest.importorskip("msgpack")
+    from wire_formats import MEDIA_MSGPACK, decode_batch_response, encode_batch_request
+    body = encode_batch_request(
+        {"scale_from": "x", "x1": "0", "x2": "10", "y1": "0", "y2": "100"},
+        {"x_inputs": [2.5, 5.0]}, MEDIA_MSGPACK
+    )
+    response = client.post("/scale/batch", content=body, headers={"Content-Type": MEDIA_MSGPACK})
+    assert response.headers["content-type"] == MEDIA_MSGPACK
+    assert decode_batch_response(response.content, MEDIA_MSGPACK)["y"].tolist() == [25.0, 50.0]
+
+def test_scale_batch_binary_inputs_are_validated():
+    """Test that non-buffer inputs in binary bodies get the same 422 as in JSON"""
+    msgpack = pytest.importorskip("msgpack")
+    fields = {"scale_from": "x", "x1": "0", "x2": "10", "y1": "0", "y2": "100"}
+    for x_inputs in (5, True, {"a": 1}, "abc", [1, "a", None, {"k": 1}]):
+        body = msgpack.packb({**fields, "x_inputs": x_inputs})
+        response = client.post("/scale/batch", content=body, headers={"Content-Type": "application/msgpack"})
+        assert response.status_code == 422, x_inputs
+        assert client.post("/scale/batch", json={**fields, "x_inputs": x_inputs}).status_code == 422
+        assert response.json()["detail"][0]["loc"][:2] == ["body", "x_inputs"]
+    
+    body = msgpack.packb({**fields, "x_inputs": [2.5, None]})
+    headers = {"Content-Type": "application/msgpack", "Accept": "application/json"}
+    response = client.post("/scale/batch", content=body, headers=headers)
+    assert response.json()["y"] == [25.0, 0.0]
+    
+    pytest.importorskip("pyarrow")
+    from wire_formats import MEDIA_ARROW, encode_batch_request
+    body = encode_batch_request(fields, {"x_inputs": ["1", "abc"]}, MEDIA_ARROW)
+    assert client.post("/scale/batch", content=body, headers={"Content-Type": MEDIA_ARROW}).status_code == 422
+
+def test_ready_endpoint():
+    """Test that /ready only reports ready once start-up has run"""
+    tauri_backend.app.state.ready = False
+    assert client.get("/ready").status_code == 503
+    with TestClient(app) as started:
+        response = started.get("/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+
+def test_job_endpoints(tmp_path, monkeypatch):
+    """Test submitting, polling and downloading scaling jobs"""
+    monkeypatch.setattr(tauri_backend._job_manager(), "input_dir", str(tmp_path))
+    source = tmp_path / "points.csv"
+    source.write_text("x,y,z\n2.5,,\n5,,\n")
+    ranges = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+    
+    response = client.post("/jobs", json={"input_path": str(source), **ranges})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert tauri_backend._job_manager().get(job_id).wait(30)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "completed"
+    events = client.get(f"/jobs/{job_id}/events").text
+    assert events.startswith("data: ") and '"status": "completed"' in events
+    assert client.get(f"/jobs/{job_id}/result").text == "x,y,z\n2.5,25.0,12.5\n5,50.0,25.0\n"
+    
+    response = client.post("/jobs/upload", params={"format": "ndjson", **ranges}, content=b'{"x": 10}\n')
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert tauri_backend._job_manager().get(job_id).wait(30)
+    assert client.get(f"/jobs/{job_id}/result").json() == {"x": 10, "y": 100.0, "z": 50.0}
+    assert client.delete(f"/jobs/{job_id}").status_code == 200
+    
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert client.post("/jobs", json={"input_path": str(source), **ranges, "x1": "abc"}).status_code == 400
+    assert client.post("/jobs/upload", params=ranges, content=b"x").status_code == 400
+
+def test_job_input_paths_are_confined(tmp_path, monkeypatch):
+    """Test that POST /jobs only reads files inside the job input directory"""
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "points.csv").write_text("x,y,z\n1,,\n")
+    secret = tmp_path / "secret.csv"
+    secret.write_text("secret_a\nTOKEN=abc123\n")
+    (inputs / "link.csv").symlink_to(secret)
+    ranges = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+    
+    monkeypatch.setattr(tauri_backend._job_manager(), "input_dir", None)
+    response = client.post("/jobs", json={"input_path": str(inputs / "points.csv"), **ranges})
+    assert response.status_code == 400
+    assert "disabled" in response.json()["detail"]
+    
+    monkeypatch.setattr(tauri_backend._job_manager(), "input_dir", str(inputs))
+    for path in (str(secret), "../secret.csv", "link.csv"):
+        response = client.post("/jobs", json={"input_path": path, "x_column": "secret_a", **ranges})
+        assert response.status_code == 400
+        assert "inside the job input directory" in response.json()["detail"]
+    response = client.post("/jobs", json={"input_path": "points.csv", **ranges})
+    assert response.status_code == 202
+    assert tauri_backend._job_manager().get(response.json()["id"]).wait(30)
+
+@pytest.fixture
+def history_store(tmp_path, monkeypatch):
+    """Use a throwaway history database"""
+    from history import HistoryStore
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    monkeypatch.setattr(tauri_backend, "history_store", store)
+    yield store
+    store.close()
+
+def test_history_endpoints(history_store):
+    """Test recording, paging, filtering and clearing history"""
+    for axis, value in (("x", "1"), ("y", "2"), ("x", "3")):
+        response = client.post("/history", json={
+            "x1": "0", "x2": "10", "y1": "0", "y2": "100",
+            "scale_from": axis, "input_value": value, "output_x": value
+        })
+        assert response.status_code == 202
+    
+    page = client.get("/history", params={"limit": 2}).json()
+    assert page["total"] == 3
+    assert [entry["input_value"] for entry in page["entries"]] == ["3", "2"]
+    rest = client.get("/history", params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert [entry["input_value"] for entry in rest["entries"]] == ["1"]
+    assert rest["next_cursor"] is None
+    assert client.get("/history", params={"scale_from": "x"}).json()["total"] == 2
+    assert client.get("/history", params={"since": "2999-01-01T00:00:00"}).json()["total"] == 0
+    
+    assert client.post("/history", json={"scale_from": "w", "input_value": "1"}).status_code == 400
+    assert client.get("/history", params={"limit": 0}).status_code == 400
+    assert client.delete("/history").json() == {"status": "cleared", "deleted": 3}
+
+def test_history_keeps_imported_timestamp(history_store):
+    """Test that an entry posted with a timestamp keeps it instead of the current time"""
+    response = client.post("/history", json={
+        "scale_from": "x", "input_value": "1", "timestamp": "2020-01-02T03:04:05Z"
+    })
+    assert response.status_code == 202
+    entry = client.get("/history").json()["entries"][0]
+    assert entry["timestamp"].startswith("2020-01-02T03:04:05")
+    assert client.get("/history", params={"until": "2020-01-03T00:00:00"}).json()["total"] == 1
+    assert client.get("/history", params={"since": "2021-01-01T00:00:00"}).json()["total"] == 0
+
+def test_openapi_media_types():
+    """Test that the media types documented for binary responses match the modules that produce them"""
+    from lookup_table import MEDIA_TYPES
+    from wire_formats import MEDIA_ARROW, MEDIA_JSON, MEDIA_MSGPACK
+    paths = client.get("/openapi.json").json()["paths"]
+    batch = paths["/scale/batch"]["post"]
+    assert set(batch["requestBody"]["content"]) == {MEDIA_JSON, MEDIA_MSGPACK, MEDIA_ARROW}
+    assert {MEDIA_MSGPACK, MEDIA_ARROW} <= set(batch["responses"]["200"]["content"])
+    assert set(paths["/lookup-table"]["post"]["responses"]["200"]["content"]) == set(MEDIA_TYPES.values())
+
+def test_stats_endpoint():
+    """Test that transform cache statistics are exposed"""
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert {"hits", "misses", "hit_rate"} <= set(response.json()["transform_cache"])
+    assert {"hit_rate", "evictions", "expirations"} <= set(response.json()["response_cache"])
+    assert {"active", "updates", "fields_sent", "slope"} <= set(response.json()["live_sessions"])
 
 if __name__ == "__main__":
     test_scaling_logic_directly()
@@ -0,0 +1,31 @@
+"""
+Unit tests for the scaling benchmark suite
+"""
+
+import json
+from bench_scaling import compare_results, main, run_benchmarks
+
+
+def _results(**ops_per_sec):
+    return {'results': {name: {'ops_per_sec': value} for name, value in ops_per_sec.items()}}
+
+
+def test_compare_results():
+    """Test that only drops beyond the threshold count as regressions"""
+    rows = compare_results(_results(a=100.0, b=100.0, c=100.0), _results(a=95.0, b=80.0, d=1.0), threshold=0.1)
+    assert [(row[0], row[4]) for row in rows] == [("a", False), ("b", True)]
+
+
+def test_run_and_compare(tmp_path):
+    """Test a small run saved as a baseline and compared through the CLI"""
+    results = run_benchmarks(sizes=(10,), repeat=1, pattern="^calculate_scaled_value$|/10$")
+    assert "calculate_scaled_value" in results['results']
+    assert "scale_coordinates_batch/float/10" in results['results']
+    assert all(result['ops_per_sec'] > 0 for result in results['results'].values())
+    
+    baseline = tmp_path / "baseline.json"
+    slower = tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(a=100.0)))
+    slower.write_text(json.dumps(_results(a=50.0)))
+    assert main(["compare", str(baseline), str(baseline)]) == 0
+    assert main(["compare", str(baseline), str(slower), "--threshold", "0.2"]) == 1
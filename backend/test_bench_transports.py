@@ -0,0 +1,15 @@
+"""
+Unit tests for the transport latency comparison
+"""
+
+from bench_transports import format_table, run
+
+
+def test_run_unix_and_stdio():
+    """Test short runs against real JSON-RPC backends"""
+    results = run(("unix", "stdio"), requests=20, depth=4)
+    for modes in results.values():
+        for row in modes.values():
+            assert row["requests"] == 20
+            assert row["p99_ms"] >= row["p50_ms"] > 0
+    assert "stdio     pipelined" in format_table(results, 4)
@@ -0,0 +1,123 @@
+"""
+Unit tests for the streaming calibration fitter
+"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+from calibration import LinearFit, fit_point_file, fit_stream, format_range_value, main
+from scaling_logic import scale_coordinates
+
+
+def samples(count=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-50, 50, count) + 1e6
+    return x, 2.5 * x - 7 + rng.normal(0, 0.01, count)
+
+
+def test_fit_matches_polyfit():
+    """Test that the streaming fit gives the least-squares line and residuals"""
+    x, y = samples()
+    result = LinearFit().update(x, y).result()
+    slope, intercept = np.polyfit(x, y, 1)
+    assert result["slope"] == pytest.approx(slope, rel=1e-9)
+    assert result["intercept"] == pytest.approx(intercept, rel=1e-6)
+    residuals = y - (slope * x + intercept)
+    assert result["rmse"] == pytest.approx(np.sqrt(np.mean(residuals ** 2)), rel=1e-5)
+    assert result["r_squared"] == pytest.approx(1 - residuals.var() / y.var(), rel=1e-9)
+    assert result["input_min"] == x.min()
+
+
+def test_chunks_and_merges_match_single_pass():
+    """Test that pair-by-pair, chunked and merged fits agree"""
+    x, y = samples()
+    whole = LinearFit().update(x, y).result()
+
+    single = LinearFit()
+    for pair in zip(x.tolist(), y.tolist()):
+        single.add(*pair)
+    chunked = LinearFit()
+    for start in range(0, x.size, 97):
+        chunked.update(x[start:start + 97], y[start:start + 97])
+    merged = LinearFit().update(x[:300], y[:300]).merge(LinearFit().update(x[300:], y[300:]))
+
+    for fit in (single, chunked, merged):
+        result = fit.result()
+        for name in ("slope", "intercept", "rmse"):
+            assert result[name] == pytest.approx(whole[name], rel=1e-6)
+        assert result["count"] == whole["count"]
+
+
+def test_invalid_pairs_are_skipped():
+    """Test that missing and non-finite pairs are counted but not fitted"""
+    fit = LinearFit().update([0, 1, None, 2, float("nan")], ["1", "3", "5", "", "9"])
+    fit.add(float("inf"), 1)
+    result = fit.result()
+    assert (result["count"], result["skipped"]) == (2, 4)
+    assert (result["slope"], result["intercept"]) == (2.0, 1.0)
+    assert result["residual_std"] is None
+
+    with pytest.raises(ValueError, match="two distinct input values"):
+        LinearFit().update([1, 1], [2, 3]).result()
+    with pytest.raises(ValueError):
+        LinearFit().update([1, 2], [1])
+
+
+def test_ranges_drive_scale_coordinates():
+    """Test that the fitted range set reproduces the line in scale_coordinates"""
+    fit = LinearFit().update([0.00001, 2, 4], [5, 9, 13])
+    ranges = fit.ranges("x", "z", base={"y1": "0", "y2": "1"})
+    assert ranges["x1"] == "0.00001" and ranges["y2"] == "1"
+    assert float(scale_coordinates("3", "", "", scale_from="x", **ranges)["z"]) == pytest.approx(11.0, rel=1e-5)
+    result = fit.result()
+    assert fit.transform("x", "z").coefficients("x", "z") == pytest.approx((result["slope"], result["intercept"]))
+    assert format_range_value(-2.0) == "-2"
+
+    with pytest.raises(ValueError):
+        fit.ranges("x", "x")
+
+
+def test_fit_stream_and_point_file(tmp_path):
+    """Test fitting CSV, NDJSON and point cloud files"""
+    csv_text = "time,raw,volts\n0,0,1\n1,10,21\n2,bad,0\n3,5,11\n"
+    fit = fit_stream(io.StringIO(csv_text), "csv", "raw", "volts", chunk_size=2)
+    assert (fit.count, fit.skipped) == (3, 1)
+    assert fit.result()["slope"] == pytest.approx(2.0)
+    with pytest.raises(ValueError, match="Column 'amps'"):
+        fit_stream(io.StringIO(csv_text), "csv", "raw", "amps")
+
+    ndjson = "".join(json.dumps({"x": i, "y": 3 * i}) + "\n" for i in range(5))
+    assert fit_stream(io.StringIO(ndjson), "ndjson", "x", "y").result()["slope"] == pytest.approx(3.0)
+
+    x, y = samples(5000)
+    path = tmp_path / "points.npy"
+    np.save(path, np.column_stack([x, np.zeros_like(x), y]))
+    whole = fit_point_file(str(path), "x", "z").result()
+    parallel = fit_point_file(str(path), "x", "z", window=1000, workers=2).result()
+    assert parallel["count"] == whole["count"] == 5000
+    assert parallel["slope"] == pytest.approx(whole["slope"], rel=1e-9)
+
+
+def test_cli(tmp_path, capsys):
+    """Test the command-line fitter"""
+    path = tmp_path / "samples.csv"
+    path.write_text("x,y\n0,1\n10,21\n")
+    assert main([str(path), "--json"]) == 0
+    output = json.loads(capsys.readouterr().out)
+    assert output["ranges"]["y2"] == "21"
+    assert main([str(path), "--output-column", "missing"]) == 1
+
+
+def test_bad_input_is_reported(tmp_path, capsys):
+    """Test that non-object NDJSON lines and missing files are reported, not raised"""
+    with pytest.raises(ValueError, match="must be objects"):
+        fit_stream(io.StringIO('{"x": 1, "y": 2}\n[1, 2]\n'), "ndjson", "x", "y")
+    path = tmp_path / "samples.ndjson"
+    path.write_text("[1, 2]\n")
+    assert main([str(path)]) == 1
+    assert main([str(tmp_path / "missing.csv")]) == 1
+    assert main([str(tmp_path / "missing.npy")]) == 1
+    errors = capsys.readouterr().err
+    assert "must be objects" in errors and "No such file" in errors
@@ -0,0 +1,65 @@
+"""
+Unit tests for micro-batching of single-point scaling requests
+"""
+
+import asyncio
+import pytest
+from coalescer import ScaleCoalescer
+from metrics import create_registry
+from scaling_logic import get_scaling_transform
+
+
+def test_coalescer_groups_by_range_set():
+    """Test that concurrent requests share one pass per range set and match transform.scale"""
+    registry = create_registry()
+    coalescer = ScaleCoalescer(window=0.01, max_batch=100, registry=registry)
+    first = get_scaling_transform("0", "10", "0", "100", "0", "255", z_in_hex=True)
+    second = get_scaling_transform("0", "1", "0", "2", "", "")
+    requests = [(first, str(value), "x") for value in range(10)] + [(second, "0.5", "x"), (first, "FF", "z")]
+
+    async def run():
+        return await asyncio.gather(*(coalescer.scale(*request) for request in requests))
+
+    results = asyncio.run(run())
+    for (transform, raw_input, scale_from), result in zip(requests, results):
+        expected = transform.scale(*(raw_input if axis == scale_from else "" for axis in "xyz"), scale_from)
+        assert result == expected
+    assert coalescer.info()["batches"] == 3
+    assert coalescer.info()["requests"] == 12
+    assert registry.value("scaling_coalesced_batch_size").count == 3
+    assert registry.value("scaling_coalescer_wait_seconds").count == 12
+
+
+def test_coalescer_max_batch():
+    """Test that a full batch is evaluated without waiting for the window"""
+    coalescer = ScaleCoalescer(window=60, max_batch=2)
+    transform = get_scaling_transform("0", "10", "0", "100", "", "")
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(coalescer.scale(transform, "1", "x"), coalescer.scale(transform, "2", "x")), 5
+        )
+
+    assert [result["y"] for result in asyncio.run(run())] == ["10.0", "20.0"]
+
+
+def test_coalescer_errors_stay_per_request():
+    """Test that an invalid input fails only its own request"""
+    coalescer = ScaleCoalescer(window=0.001)
+    transform = get_scaling_transform("0", "10", "0", "100", "", "")
+
+    async def run():
+        return await asyncio.gather(
+            coalescer.scale(transform, "abc", "x"),
+            coalescer.scale(transform, "5", "x"),
+            coalescer.scale(transform, "5", "w"),
+            return_exceptions=True
+        )
+
+    invalid, valid, bad_axis = asyncio.run(run())
+    assert str(invalid) == "Invalid decimal input!"
+    assert valid == {"x": "5", "y": "50.0", "z": ""}
+    assert str(bad_axis) == "scale_from must be 'x', 'y', or 'z'"
+
+    with pytest.raises(ValueError):
+        ScaleCoalescer(max_batch=0)
@@ -0,0 +1,109 @@
+"""
+Unit tests for the grid interpolation engine
+"""
+
+import numpy as np
+import pytest
+from grid_interpolation import GridStore, RegularGrid, interpolate_batch, interpolate_parallel, load_grid
+
+
+def trilinear_function(x, y, z):
+    """Reproduced exactly by trilinear interpolation, inside the grid and beyond it"""
+    return 2 * x - 3 * y + 5 * z + 0.5 * x * y * z
+
+
+def make_grid(dtype=np.float64):
+    axes = np.arange(5) * 0.5 + 1, np.arange(4) * 2.0 - 3, np.arange(6) * 0.1
+    values = trilinear_function(*np.meshgrid(*axes, indexing="ij")).astype(dtype)
+    return values, [1, -3, 0], [0.5, 2, 0.1]
+
+
+def test_trilinear_matches_function():
+    """Test interpolation inside the grid across chunk boundaries"""
+    values, origin, spacing = make_grid()
+    grid = RegularGrid(values, origin, spacing)
+    points = np.random.default_rng(0).uniform([1, -3, 0], [3, 3, 0.5], (1000, 3))
+    assert grid.interpolate(points, chunk_size=77) == pytest.approx(trilinear_function(*points.T), abs=1e-12)
+    assert grid.corner_offsets == (0, 1, 6, 7, 24, 25, 30, 31)
+    lower, upper = grid.bounds
+    assert upper.tolist() == pytest.approx([3, 3, 0.5])
+
+
+def test_bilinear_edges_and_invalid_points():
+    """Test extrapolation, clamping and points with missing coordinates"""
+    grid = RegularGrid([[0, 1], [10, 11]])
+    points = [[0.5, 0.5], [2, 0], [-1, 3], [np.nan, 0]]
+    assert grid.interpolate(points)[:3].tolist() == [5.5, 20.0, -7.0]
+    clamped = grid.interpolate(points, extrapolate=False)
+    assert clamped[:3].tolist() == [5.5, 10.0, 1.0]
+    assert np.isnan(clamped[3])
+
+
+def test_invalid_grids():
+    """Test that malformed grids and queries are rejected"""
+    for values, kwargs in (
+        (np.zeros(4), {}), (np.zeros((1, 4)), {}), (np.zeros((2, 2)), {"spacing": [1, 0]}),
+        (np.zeros((2, 2)), {"origin": [0, 0, 0]}), (np.array([["a", "b"], ["c", "d"]]), {}),
+    ):
+        with pytest.raises(ValueError):
+            RegularGrid(values, **kwargs)
+    with pytest.raises(ValueError, match=r"\(N, 2\)"):
+        RegularGrid(np.zeros((2, 2))).interpolate(np.zeros((3, 3)))
+
+
+def test_memory_mapped_grid_on_process_pool(tmp_path):
+    """Test that pool results match in-process ones for mapped and in-memory grids"""
+    values, origin, spacing = make_grid(np.float32)
+    path = tmp_path / "grid.npy"
+    np.save(path, values)
+    mapped = load_grid(path, origin, spacing)
+    assert mapped.path == str(path)
+
+    points = np.random.default_rng(1).uniform([0, -4, -0.1], [4, 4, 0.6], (5000, 3))
+    expected = mapped.interpolate(points)
+    assert np.array_equal(interpolate_parallel(mapped, points, workers=2, chunk_size=1500), expected)
+    in_memory = RegularGrid(values, origin, spacing)
+    assert np.array_equal(interpolate_parallel(in_memory, points, workers=2, chunk_size=1500), expected)
+
+
+def test_interpolate_batch():
+    """Test per-axis input lists with null entries"""
+    grid = RegularGrid([[0, 1], [10, 11]])
+    result = interpolate_batch(grid, [0.5, None], [0.5, 1])
+    assert result["values"].tolist() == [5.5, 0.0]
+    assert result["valid"].tolist() == [True, False]
+    with pytest.raises(ValueError, match="same length"):
+        interpolate_batch(grid, [0.5], [0.5, 1])
+    with pytest.raises(ValueError, match="not used"):
+        interpolate_batch(grid, [0.5], [0.5], [0.5])
+    with pytest.raises(ValueError, match="required"):
+        interpolate_batch(RegularGrid(np.zeros((2, 2, 2))), [0.5], [0.5])
+
+
+def test_grid_store(tmp_path):
+    """Test registering, reloading and deleting stored grids"""
+    store = GridStore(str(tmp_path))
+    values, origin, spacing = make_grid()
+    grid = store.register("stage", values.tolist(), origin, spacing)
+    assert grid["shape"] == [5, 4, 6]
+    assert store.register("renamed", values, origin, spacing)["id"] == grid["id"]
+
+    reloaded = GridStore(str(tmp_path))
+    assert [entry["name"] for entry in reloaded.list()] == ["renamed"]
+    assert reloaded.get(grid["id"]).interpolate([[2, 0, 0.25]])[0] == pytest.approx(trilinear_function(2, 0, 0.25))
+
+    with pytest.raises(ValueError):
+        store.register("ragged", [[1, 2], [3]])
+    reloaded.delete(grid["id"])
+    with pytest.raises(KeyError):
+        reloaded.get(grid["id"])
+    assert not (tmp_path / f"{grid['id']}.npy").exists()
+
+
+def test_grid_store_rejects_malformed_index(tmp_path):
+    """Test that an index of the wrong shape is reported like an unreadable one"""
+    index = tmp_path / "index.json"
+    for text in ('{"a": 1}', '[1, 2]', '[{"name": "no id"}]', '{'):
+        index.write_text(text)
+        with pytest.raises(ValueError, match="Cannot read grid store"):
+            GridStore(str(tmp_path))
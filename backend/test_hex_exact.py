@@ -0,0 +1,51 @@
+"""
+Unit tests for exact 64-bit hex Z scaling
+"""
+
+import numpy as np
+import pytest
+from hex_exact import scale_coordinates_batch_exact_hex, scale_coordinates_exact_hex
+from scaling_logic import scale_coordinates
+
+BASE = 2 ** 63 + 12345
+RANGES = ("0", "4096", "0", "1", str(BASE), str(BASE + 4096))
+
+
+def test_exact_hex_output_above_2_53():
+    """Test that Z output keeps every bit above 2**53"""
+    result = scale_coordinates_exact_hex("7", "", "", *RANGES, scale_from="x")
+    assert result["z"] == hex(BASE + 7)
+    
+    # The float path cannot represent the low bits
+    assert scale_coordinates("7", "", "", *RANGES, scale_from="x", z_in_hex=True)["z"] != hex(BASE + 7)
+
+
+def test_exact_hex_input_above_2_53():
+    """Test that Z inputs are offset from the range start exactly"""
+    result = scale_coordinates_exact_hex("", "", hex(BASE + 7), *RANGES, scale_from="z")
+    assert result == {"x": "7.0", "y": str(7 / 4096), "z": hex(BASE + 7)}
+
+
+def test_exact_hex_matches_float_path_for_small_values():
+    """Test agreement with scale_coordinates where float is exact"""
+    ranges = ("0", "10", "0", "100", "0", "50")
+    for scale_from, inputs in (("x", ("5", "", "")), ("y", ("", "30", "")), ("z", ("", "", "19"))):
+        assert scale_coordinates_exact_hex(*inputs, *ranges, scale_from=scale_from) == \
+            scale_coordinates(*inputs, *ranges, scale_from=scale_from, z_in_hex=True)
+
+
+def test_exact_hex_batch_limits():
+    """Test that results outside the unsigned 64-bit range are invalid"""
+    result = scale_coordinates_batch_exact_hex(
+        [-1, 0, 10, 11], None, None,
+        "0", "10", "", "", "0", str(2 ** 64 - 1), scale_from="x"
+    )
+    assert result["z"].dtype == np.uint64
+    assert result["z_valid"].tolist() == [False, True, True, False]
+    assert int(result["z"][2]) == 2 ** 64 - 1
+
+
+def test_exact_hex_rejects_fractional_z_range():
+    """Test that Z ranges must be whole numbers"""
+    with pytest.raises(ValueError):
+        scale_coordinates_batch_exact_hex([1], None, None, "0", "10", "", "", "0.5", "10", scale_from="x")
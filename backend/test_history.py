@@ -0,0 +1,66 @@
+"""
+Unit tests for the SQLite history store
+"""
+
+import pytest
+from history import HistoryStore
+from profiles import profile_id_for
+
+
+def entry(scale_from="x", x1="0", value="1"):
+    return {
+        "x1": x1, "x2": "10", "y1": "0", "y2": "100", "z1": "", "z2": "",
+        "scale_from": scale_from, "input_value": value,
+        "output_x": value, "output_y": "10.0", "output_z": "", "z_in_hex": False,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_pages_newest_first(store):
+    """Test keyset paging over queued and written entries"""
+    for i in range(5):
+        store.add(entry(value=str(i)), timestamp=1000.0 + i)
+    first = store.query(limit=2)
+    assert first["total"] == 5
+    assert [e["input_value"] for e in first["entries"]] == ["4", "3"]
+    second = store.query(limit=2, cursor=first["next_cursor"])
+    third = store.query(limit=2, cursor=second["next_cursor"])
+    assert [e["input_value"] for e in second["entries"] + third["entries"]] == ["2", "1", "0"]
+    assert third["next_cursor"] is None
+    assert first["entries"][0]["timestamp"] == "1970-01-01T00:16:44+00:00"
+    with pytest.raises(ValueError):
+        store.query(limit=0)
+
+
+def test_filters(store):
+    """Test filtering by axis, range set and time window"""
+    store.add(entry("x"), timestamp=100.0)
+    store.add(entry("y"), timestamp=200.0)
+    store.add(entry("x", x1="5"), timestamp=300.0)
+    assert store.query(scale_from="y")["total"] == 1
+    key = profile_id_for(("5", "10", "0", "100", "", ""))
+    assert [e["x1"] for e in store.query(range_key=key)["entries"]] == ["5"]
+    assert store.query(since=150.0, until=300.0)["total"] == 1
+
+
+def test_batching_and_persistence(tmp_path):
+    """Test that queued entries reach the database on close and survive reopening"""
+    path = str(tmp_path / "history.sqlite3")
+    store = HistoryStore(path, flush_interval=60, max_batch=1000)
+    for i in range(10):
+        store.add(entry(value=str(i)))
+    assert len(store._pending) == 10
+    store.close()
+    reopened = HistoryStore(path)
+    assert reopened.query()["total"] == 10
+    assert reopened.clear() == 10
+    assert reopened.query()["entries"] == []
+    reopened.close()
+    with pytest.raises(ValueError):
+        reopened.add(entry(scale_from="w"))
@@ -0,0 +1,85 @@
+"""
+Unit tests for background scaling jobs
+"""
+
+import numpy as np
+import pytest
+from jobs import JobManager, JobQueueFull
+
+RANGES = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(workers=1, max_pending=2, work_dir=str(tmp_path / "jobs"))
+    yield manager
+    manager.close()
+
+
+def test_csv_job(manager, tmp_path):
+    """Test that a CSV job completes with full progress and a scaled result"""
+    source = tmp_path / "points.csv"
+    source.write_text("x,y,z\n" + "".join(f"{i % 10},,\n" for i in range(1000)))
+    job = manager.submit(str(source), {"chunk_size": 100, **RANGES})
+    assert job.wait(30)
+    state = job.to_dict()
+    assert state["status"] == "completed"
+    assert state["rows"] == 1000
+    assert state["progress"] == 1.0
+    with open(job.output_path) as f:
+        assert f.read().splitlines()[:3] == ["x,y,z", "0,0.0,0.0", "1,10.0,5.0"]
+
+
+def test_point_cloud_job(manager, tmp_path):
+    """Test a .npy job, including deleting an owned input once it finishes"""
+    source = tmp_path / "cloud.npy"
+    np.save(source, np.array([[5.0, 0.0, 0.0], [10.0, 0.0, 0.0]]))
+    job = manager.submit(str(source), {"chunk_size": 1, **RANGES}, owns_input=True)
+    assert job.wait(30)
+    assert job.to_dict()["unit"] == "points"
+    assert np.load(job.output_path).tolist() == [[5.0, 50.0, 25.0], [10.0, 100.0, 50.0]]
+    assert not source.exists()
+
+
+def test_cancel_and_admission(manager, tmp_path):
+    """Test cancelling queued jobs and refusing jobs over the pending limit"""
+    # Large enough that the first job is still running when the limit is checked
+    source = tmp_path / "points.csv"
+    source.write_text("x,y,z\n" + "1,,\n" * 200000)
+    first = manager.submit(str(source), RANGES)
+    second = manager.submit(str(source), RANGES)
+    with pytest.raises(JobQueueFull):
+        manager.submit(str(source), RANGES)
+
+    assert second.cancel()
+    assert second.wait(30)
+    assert second.status == "cancelled"
+    assert first.wait(30)
+    assert not first.cancel()
+    manager.remove(first.id)
+    with pytest.raises(KeyError):
+        manager.get(first.id)
+
+
+def test_invalid_jobs(manager, tmp_path):
+    """Test that bad inputs and options are rejected before queueing"""
+    source = tmp_path / "points.csv"
+    source.write_text("x,y,z\n")
+    with pytest.raises(ValueError, match="not found"):
+        manager.submit(str(tmp_path / "missing.csv"), RANGES)
+    with pytest.raises(ValueError):
+        manager.submit(str(source), {**RANGES, "x1": "abc"})
+    with pytest.raises(ValueError):
+        manager.submit(str(source), {**RANGES, "scale_from": "w"})
+    assert manager.list() == []
+
+
+def test_resolve_input(manager, tmp_path):
+    """Test that input paths are confined to the input directory"""
+    with pytest.raises(ValueError, match="disabled"):
+        manager.resolve_input(str(tmp_path / "points.csv"))
+    manager.input_dir = str(tmp_path / "inputs")
+    assert manager.resolve_input("points.csv") == str(tmp_path / "inputs" / "points.csv")
+    for path in ("../points.csv", str(tmp_path / "points.csv"), "/etc/passwd"):
+        with pytest.raises(ValueError, match="inside"):
+            manager.resolve_input(path)
@@ -0,0 +1,39 @@
+"""
+Unit tests for the HTTP load-testing harness
+"""
+
+import asyncio
+import pytest
+from load_test import LocalServer, parse_mix, run_load, summarize
+
+
+def test_parse_mix():
+    """Test request mix parsing"""
+    assert parse_mix("scale=8,batch=1,ws") == {"scale": 8.0, "batch": 1.0, "ws": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("upload=1")
+    with pytest.raises(ValueError):
+        parse_mix("scale=0")
+
+
+def test_summarize():
+    """Test throughput and percentile reduction"""
+    summary = summarize({"scale": [0.001 * i for i in range(1, 101)], "ws": []}, {"scale": 0, "ws": 2}, 2.0, 4)
+    scale = summary["kinds"]["scale"]
+    assert scale["requests"] == 100
+    assert scale["throughput"] == 50.0
+    assert scale["p50_ms"] == pytest.approx(50.5)
+    assert summary["kinds"]["ws"]["p99_ms"] is None
+    assert summary["kinds"]["total"]["errors"] == 2
+
+
+def test_run_load_against_local_server():
+    """Test a short mixed run against the real app on a loopback port"""
+    with LocalServer() as server:
+        summary = asyncio.run(run_load(
+            server.url, concurrency=4, requests=40, mix={"scale": 2, "batch": 1, "ws": 1}, batch_size=10
+        ))
+    total = summary["kinds"]["total"]
+    assert total["requests"] == 40
+    assert total["errors"] == 0
+    assert total["p99_ms"] >= total["p50_ms"] > 0
@@ -0,0 +1,70 @@
+"""
+Unit tests for lookup table export
+"""
+
+import numpy as np
+import pytest
+from lookup_table import MAX_TABLE_POINTS, export_table, main
+from scaling_logic import scale_coordinates
+
+RANGES = ("0", "10", "0", "100", "0", "255")
+
+
+def test_csv_table_matches_scale_coordinates():
+    """Test that CSV rows span the driving range and match single-point scaling"""
+    text = "".join(export_table(RANGES, 11, chunk_size=4))
+    lines = text.splitlines()
+    assert lines[0] == "x,y,z"
+    assert len(lines) == 12
+    x, y, z = lines[4].split(",")
+    expected = scale_coordinates(x, "", "", *RANGES, scale_from="x")
+    assert (float(y), float(z)) == (float(expected["y"]), float(expected["z"]))
+    assert lines[-1] == "10.0,100.0,255.0"
+
+
+def test_hex_and_partial_ranges():
+    """Test hex Z output and empty cells for axes without a range"""
+    lines = "".join(export_table(("0", "10", "", "", "0", "255"), 3, start=0, step=5, z_in_hex=True)).splitlines()
+    assert lines[1:] == ["0.0,,0x0", "5.0,,0x7f", "10.0,,0xff"]
+
+
+def test_raw_table():
+    """Test interleaved little-endian output with NaN for missing axes"""
+    data = b"".join(export_table(("0", "10", "", "", "0", "1"), 5, fmt="raw", dtype="float32", chunk_size=2))
+    points = np.frombuffer(data, dtype="<f4").reshape(-1, 3)
+    assert points.shape == (5, 3)
+    assert np.isnan(points[:, 1]).all()
+    assert points[-1, 2] == 1.0
+
+
+def test_c_table():
+    """Test the C array text"""
+    text = "".join(export_table(RANGES, 2, fmt="c", z_in_hex=True, name="lut"))
+    assert "#define LUT_POINTS 2" in text
+    assert "static const double lut[LUT_POINTS][3] = {" in text
+    assert "    {10.0, 100.0, 0xff},\n};\n" in text
+
+    with pytest.raises(ValueError, match="C identifier"):
+        export_table(RANGES, 2, fmt="c", name="2bad")
+
+
+def test_validation_happens_before_streaming():
+    """Test that bad options raise at once and huge tables start immediately"""
+    for kwargs in ({"fmt": "xml"}, {"dtype": "int8"}, {"scale_from": "w"}, {"count": 0}):
+        options = {"count": 10, **kwargs}
+        with pytest.raises(ValueError):
+            export_table(RANGES, **options)
+    with pytest.raises(ValueError, match="complete y range"):
+        export_table(RANGES[:2] + ("", "") + RANGES[4:], 10, scale_from="y")
+
+    table = export_table(RANGES, MAX_TABLE_POINTS, chunk_size=8)
+    assert next(table) == "x,y,z\n"
+    assert next(table).count("\n") == 8
+
+
+def test_cli(tmp_path):
+    """Test the command-line exporter"""
+    path = tmp_path / "table.h"
+    assert main([str(path), "--x1", "0", "--x2", "1", "--y1", "0", "--y2", "2", "--count", "3"]) == 0
+    assert "{0.5, 1.0, NAN}," in path.read_text()
+    assert main([str(tmp_path / "table.xyz"), "--count", "3"]) == 1
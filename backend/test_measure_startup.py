@@ -0,0 +1,61 @@
+"""
+Unit tests for the cold start measurement script
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+from measure_startup import BACKEND_DIR, READY_LINE, measure_ready, parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | site
+import time:        50 |         50 |     numpy.version
+import time:      1000 |       1050 |   numpy
+import time:       200 |       1250 | scaling_logic
+"""
+
+
+def test_parse_importtime():
+    """Test parsing of python -X importtime output"""
+    assert parse_importtime(IMPORTTIME) == [
+        ("_io", 1, 120, 120),
+        ("site", 0, 300, 420),
+        ("numpy.version", 2, 50, 50),
+        ("numpy", 1, 1000, 1050),
+        ("scaling_logic", 0, 200, 1250),
+    ]
+
+
+def test_measure_ready():
+    """Test that a freshly started backend prints its ready line"""
+    assert measure_ready() > 0
+
+
+def test_measure_ready_times_out():
+    """Test that a backend that never prints gives up at the deadline"""
+    hanging = [sys.executable, "-c", "import time; time.sleep(60)"]
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="within"):
+        measure_ready(timeout=0.5, command=hanging)
+    assert time.perf_counter() - start < 10
+    with pytest.raises(RuntimeError, match="exited"):
+        measure_ready(command=[sys.executable, "-c", "print('starting')"])
+
+
+def test_import_defers_optional_features():
+    """Test that importing the app loads no feature modules and starts no pools or stores"""
+    from tauri_backend import READY_LINE as APP_READY_LINE
+    assert READY_LINE == APP_READY_LINE
+
+    deferred = ["calibration", "grid_interpolation", "history", "jobs", "lookup_table",
+                "parallel_scaling", "rpc", "wire_formats", "cProfile"]
+    code = (
+        "import sys, tauri_backend as app; "
+        f"print([name for name in {deferred!r} if name in sys.modules]); "
+        "print([app.parallel_scaler, app.grid_store, app.history_store, app.job_manager])"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == ["[]", "[None, None, None, None]"]
@@ -0,0 +1,41 @@
+"""
+Unit tests for the metrics registry
+"""
+
+import pytest
+from metrics import MetricsRegistry
+
+
+def test_counter_render():
+    """Test counters with and without labels in the text format"""
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("endpoint",))
+    registry.counter("rejected_total", "Rejected")
+    registry.inc("requests_total", "/scale")
+    registry.inc("requests_total", "/scale", amount=2)
+    registry.inc("rejected_total")
+    
+    assert registry.value("requests_total", "/scale") == 3
+    text = registry.render()
+    assert '# TYPE requests_total counter\nrequests_total{endpoint="/scale"} 3\n' in text
+    assert "rejected_total 1\n" in text
+    
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Again")
+
+
+def test_histogram_buckets():
+    """Test that bucket counts are cumulative and bounds are inclusive"""
+    registry = MetricsRegistry()
+    registry.histogram("latency_seconds", "Latency", ("endpoint",))
+    for value in (0.001, 0.003, 10.0):
+        registry.observe("latency_seconds", value, "/scale")
+    
+    histogram = registry.value("latency_seconds", "/scale")
+    assert histogram.count == 3
+    text = registry.render()
+    assert 'latency_seconds_bucket{endpoint="/scale",le="0.001"} 1\n' in text
+    assert 'latency_seconds_bucket{endpoint="/scale",le="0.005"} 2\n' in text
+    assert 'latency_seconds_bucket{endpoint="/scale",le="5.0"} 2\n' in text
+    assert 'latency_seconds_bucket{endpoint="/scale",le="+Inf"} 3\n' in text
+    assert 'latency_seconds_count{endpoint="/scale"} 3\n' in text
@@ -0,0 +1,75 @@
+"""
+Unit tests for the parallel scaling engine
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from parallel_scaling import ParallelScaler, scale_coordinates_batch_parallel, scale_points_parallel
+from point_cloud import scale_point_file
+from scaling_logic import scale_coordinates_batch
+
+RANGES = ("0", "10", "0", "100", "0", "50")
+
+
+@pytest.fixture(scope="module")
+def scaler():
+    with ParallelScaler(workers=2, chunk_size=7) as pool:
+        yield pool
+
+
+def test_scale_points_parallel_order(scaler):
+    """Test that shards are reassembled in input order"""
+    points = np.zeros((50, 3))
+    points[:, 0] = np.arange(50)
+    result = scaler.scale_points(points, RANGES, scale_from="x", output_dtype="float32")
+    
+    assert result.dtype == np.float32
+    assert result[:, 0].tolist() == list(range(50))
+    assert result[:, 1].tolist() == [10.0 * i for i in range(50)]
+    assert result[:, 2].tolist() == [5.0 * i for i in range(50)]
+
+
+def test_scale_file_parallel_matches_serial(scaler, tmp_path):
+    """Test that the pool writes the same file as the serial path"""
+    source = tmp_path / "in.npy"
+    np.save(source, np.random.default_rng(0).uniform(0, 100, size=(40, 3)))
+    
+    assert scaler.scale_file(source, tmp_path / "parallel.npy", RANGES, scale_from="y", z_in_hex=True) == 40
+    scale_point_file(source, tmp_path / "serial.npy", RANGES, scale_from="y", z_in_hex=True)
+    assert np.array_equal(np.load(tmp_path / "parallel.npy"), np.load(tmp_path / "serial.npy"))
+
+
+def test_scale_coordinates_batch_parallel(scaler):
+    """Test that the parallel batch path matches scale_coordinates_batch"""
+    inputs = ["0", "2.5", "", "abc", "12"] * 4
+    expected = scale_coordinates_batch(inputs, None, None, *RANGES, scale_from="x")
+    result = scale_coordinates_batch_parallel(scaler, inputs, None, None, *RANGES, scale_from="x")
+    
+    for key, value in expected.items():
+        assert np.array_equal(result[key], value)
+
+
+def test_scale_points_parallel_errors():
+    """Test argument validation"""
+    with pytest.raises(ValueError):
+        ParallelScaler(workers=0)
+    with pytest.raises(ValueError):
+        scale_points_parallel(np.zeros((3, 2)), RANGES)
+    with pytest.raises(ValueError):
+        scale_points_parallel(np.zeros((3, 3)), ("1.2.3", "10", "0", "100", "0", "50"), workers=1)
+
+
+def test_scale_column_and_shared_pool():
+    """Test column scaling with a mask, and that concurrent first calls share one pool"""
+    with ParallelScaler(workers=1, chunk_size=2) as pool:
+        with ThreadPoolExecutor(8) as threads:
+            executors = list(threads.map(lambda _: pool.executor, range(8)))
+        assert all(executor is executors[0] for executor in executors)
+
+        result = pool.scale_column([1.0, 2.0, 3.0], RANGES, scale_from="x", valid=[True, False, True])
+        assert result[0].tolist() == [1.0, 10.0, 5.0]
+        assert np.isnan(result[1]).all()
+        with pytest.raises(ValueError):
+            pool.scale_column(np.zeros((2, 2)), RANGES)
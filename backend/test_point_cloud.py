@@ -0,0 +1,82 @@
+"""
+Unit tests for memory-mapped point cloud scaling
+"""
+
+import numpy as np
+import pytest
+from point_cloud import open_points, scale_point_file, scale_points
+from scaling_logic import get_scaling_transform
+from scale_file import main
+
+RANGES = ("0", "10", "0", "100", "0", "50")
+
+
+def test_scale_points_windows():
+    """Test that windowed scaling matches the expected linear map"""
+    points = np.zeros((10, 3))
+    points[:, 0] = np.arange(10)
+    out = np.empty_like(points)
+    scale_points(points, out, get_scaling_transform(*RANGES), scale_from="x", window=3)
+    
+    assert out[:, 0].tolist() == list(range(10))
+    assert out[:, 1].tolist() == [10.0 * i for i in range(10)]
+    assert out[:, 2].tolist() == [5.0 * i for i in range(10)]
+
+
+def test_scale_points_invalid_direction():
+    """Test that directions without a valid range give NaN"""
+    points = np.ones((4, 3))
+    out = np.empty_like(points)
+    scale_points(points, out, get_scaling_transform("0", "10", "", "", "0", "50"), scale_from="x")
+    assert np.isnan(out[:, 1]).all()
+    assert out[:, 2].tolist() == [5.0] * 4
+
+
+def test_scale_point_file_npy(tmp_path):
+    """Test .npy input with float32 output"""
+    source = tmp_path / "in.npy"
+    target = tmp_path / "out.npy"
+    np.save(source, np.array([[0.0, 50.0, 0.0], [0.0, 25.0, 0.0]]))
+    
+    assert scale_point_file(source, target, RANGES, scale_from="y", z_in_hex=True, output_dtype="float32") == 2
+    result = np.load(target)
+    assert result.dtype == np.float32
+    assert result.tolist() == [[5.0, 50.0, 25.0], [2.5, 25.0, 12.0]]
+
+
+def test_scale_point_file_raw(tmp_path):
+    """Test raw interleaved float32 buffers through the file CLI"""
+    source = tmp_path / "in.bin"
+    target = tmp_path / "out.bin"
+    np.array([[5, 0, 0], [10, 0, 0]], dtype=np.float32).tofile(source)
+    
+    args = [str(source), str(target), "--input-dtype", "float32", "--output-dtype", "float32"]
+    args += ["--x1", "0", "--x2", "10", "--y1", "0", "--y2", "100", "--z1", "0", "--z2", "50"]
+    assert main(args) == 0
+    result = np.fromfile(target, dtype=np.float32).reshape(-1, 3)
+    assert result.tolist() == [[5.0, 50.0, 25.0], [10.0, 100.0, 50.0]]
+
+
+def test_scale_point_file_stages(tmp_path):
+    """Test chained range sets collapsed into one matrix through the file CLI"""
+    source = tmp_path / "in.npy"
+    target = tmp_path / "out.npy"
+    np.save(source, np.array([[5.0, 0.0, 0.0], [10.0, 0.0, 0.0]]))
+    
+    args = [str(source), str(target), "--x1", "0", "--x2", "10", "--y1", "0", "--y2", "100", "--z1", "0", "--z2", "50"]
+    assert main(args + ["--then", "y:0,1,0,100,0,1000"]) == 0
+    assert np.load(target).tolist() == [[0.5, 50.0, 500.0], [1.0, 100.0, 1000.0]]
+    assert main(args + ["--then", "y:0,1,0,100,0,1000", "--workers", "2"]) == 1
+
+
+def test_open_points_rejects_bad_shapes(tmp_path):
+    """Test that files not holding xyz points are rejected"""
+    source = tmp_path / "flat.npy"
+    np.save(source, np.zeros(5))
+    with pytest.raises(ValueError):
+        open_points(source)
+    
+    raw = tmp_path / "partial.bin"
+    np.zeros(4, dtype=np.float64).tofile(raw)
+    with pytest.raises(ValueError):
+        open_points(raw, raw_dtype="float64")
@@ -0,0 +1,55 @@
+"""
+Unit tests for the range profile registry
+"""
+
+import json
+import pytest
+from profiles import ProfileStore, profile_id_for
+
+
+def test_register_and_persist(tmp_path):
+    """Test that profiles survive a restart"""
+    path = tmp_path / "profiles.json"
+    store = ProfileStore(path)
+    profile = store.register("bench", "0", "10", "0", "100", "0", "50")
+    
+    assert profile == {"id": profile_id_for(("0", "10", "0", "100", "0", "50")), "name": "bench",
+                       "x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "50"}
+    
+    reloaded = ProfileStore(path)
+    assert reloaded.list() == [profile]
+    assert reloaded.transform(profile["id"]).coefficients("x", "y") == (10.0, 0.0)
+    assert reloaded.transform(profile["id"], z_in_hex=True).z_in_hex
+
+
+def test_register_same_ranges_reuses_id(tmp_path):
+    """Test that registering the same ranges keeps one profile"""
+    store = ProfileStore(tmp_path / "profiles.json")
+    first = store.register("a", "0", "10", "0", "100", "0", "50")
+    second = store.register("b", " 0", "10", "0", "100", "0", "50 ")
+    assert first["id"] == second["id"]
+    assert [profile["name"] for profile in store.list()] == ["b"]
+
+
+def test_register_rejects_invalid_ranges(tmp_path):
+    """Test that invalid range sets are not stored"""
+    store = ProfileStore(tmp_path / "profiles.json")
+    with pytest.raises(ValueError):
+        store.register("empty", "", "10", "0", "100", "0", "50")
+    with pytest.raises(ValueError):
+        store.register("exponent", "1e3", "10", "0", "100", "0", "50")
+    assert store.list() == []
+
+
+def test_delete(tmp_path):
+    """Test deleting profiles"""
+    path = tmp_path / "profiles.json"
+    store = ProfileStore(path)
+    profile = store.register("bench", "0", "10", "0", "100", "0", "50")
+    store.delete(profile["id"])
+    
+    assert json.loads(path.read_text()) == []
+    with pytest.raises(KeyError):
+        store.delete(profile["id"])
+    with pytest.raises(KeyError):
+        store.get(profile["id"])
@@ -0,0 +1,37 @@
+"""
+Unit tests for the response cache
+"""
+
+from response_cache import ResponseCache, etag_for, etag_matches
+
+
+def test_eviction_and_expiry():
+    """Test LRU eviction, TTL expiry and the statistics"""
+    now = [0.0]
+    cache = ResponseCache(maxsize=2, ttl=10.0, clock=lambda: now[0])
+    cache.put("a", {"x": "1"})
+    cache.put("b", {"x": "2"})
+    assert cache.get("a") == (etag_for({"x": "1"}), {"x": "1"})
+    cache.put("c", {"x": "3"})  # evicts b, the least recently used
+    assert cache.get("b") is None
+    
+    now[0] = 10.0
+    assert cache.get("a") is None
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["evictions"], info["expirations"]) == (1, 2, 1, 1)
+    assert info["size"] == 1
+    
+    disabled = ResponseCache(maxsize=0)
+    disabled.put("a", {"x": "1"})
+    assert disabled.get("a") is None
+
+
+def test_etag_matches():
+    """Test If-None-Match parsing"""
+    etag = etag_for({"x": "1", "y": "2", "z": ""})
+    assert etag == etag_for({"z": "", "y": "2", "x": "1"})
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,99 @@
+"""
+Unit tests for the framed JSON-RPC transport
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+from rpc import (FRAME_HEADER, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, JsonRpcServer, RpcClient,
+                 RpcError, encode_frame, read_frame)
+
+
+async def echo(params):
+    await asyncio.sleep(params.get("delay", 0))
+    return params.get("value")
+
+
+async def fail(params):
+    raise RpcError(400, "Bad value", {"value": params.get("value")})
+
+
+SERVER = JsonRpcServer({"echo": echo, "fail": fail})
+
+
+def test_frame_round_trip():
+    """Test that frames carry their length and decode back"""
+    frame = encode_frame({"a": 1})
+    assert FRAME_HEADER.unpack(frame[:4]) == (len(frame) - 4,)
+
+    async def read(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_frame(reader), await read_frame(reader)
+
+    body, end = asyncio.run(read(frame))
+    assert json.loads(body) == {"a": 1} and end is None
+    with pytest.raises(asyncio.IncompleteReadError):
+        asyncio.run(read(frame[:-1]))
+    with pytest.raises(ValueError, match="exceeds"):
+        asyncio.run(read(FRAME_HEADER.pack(1 << 30)))
+
+
+def test_handle_errors():
+    """Test the standard error codes, method errors and notifications"""
+    def handle(body):
+        return asyncio.run(SERVER.handle(body))
+
+    assert handle(b"{")["error"]["code"] == PARSE_ERROR
+    assert handle(b'{"id": 1, "method": "echo"}')["error"]["code"] == INVALID_REQUEST
+    assert handle(b'{"jsonrpc": "2.0", "id": 2, "method": "nope"}')["error"]["code"] == METHOD_NOT_FOUND
+    response = handle(b'{"jsonrpc": "2.0", "id": 3, "method": "fail", "params": {"value": 7}}')
+    assert response == {"jsonrpc": "2.0", "id": 3, "error": {"code": 400, "message": "Bad value", "data": {"value": 7}}}
+    assert handle(b'{"jsonrpc": "2.0", "method": "echo"}') is None
+
+
+def test_failed_notifications_are_not_answered():
+    """Test that notifications get no error frame when they fail"""
+    async def boom(params):
+        raise RuntimeError("boom")
+
+    server = JsonRpcServer({"fail": fail, "boom": boom})
+    for body in (b'{"jsonrpc": "2.0", "method": "nope"}', b'{"jsonrpc": "2.0", "method": "fail"}',
+                 b'{"jsonrpc": "2.0", "method": "boom"}', b'{"jsonrpc": "2.0", "method": "fail", "params": []}'):
+        assert asyncio.run(server.handle(body)) is None
+    assert asyncio.run(server.handle(b'{"jsonrpc": "2.0", "id": 1, "method": "boom"}'))["error"]["code"] == 500
+
+
+def test_pipelined_calls_over_unix_socket(tmp_path):
+    """Test that pipelined calls on one connection are answered as each finishes"""
+    path = str(tmp_path / "rpc.sock")
+
+    async def run():
+        ready = asyncio.Event()
+        server = asyncio.create_task(SERVER.serve_unix(path, on_ready=ready.set))
+        await ready.wait()
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        client = RpcClient(*await asyncio.open_unix_connection(path))
+        finished = []
+
+        async def call(value, delay):
+            result = await client.call("echo", {"value": value, "delay": delay})
+            finished.append(result)
+            return result
+
+        results = await asyncio.gather(call("slow", 0.2), *(call(i, 0) for i in range(10)))
+        with pytest.raises(RpcError) as error:
+            await client.call("fail", {"value": 1})
+        await client.close()
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+        return results, finished, error.value
+
+    results, finished, error = asyncio.run(run())
+    assert results == ["slow", *range(10)]
+    assert finished[-1] == "slow"
+    assert (error.code, error.data) == (400, {"value": 1})
+    assert not os.path.exists(path)
@@ -0,0 +1,85 @@
+"""
+Unit tests for streaming file scaling
+"""
+
+import io
+import json
+import pytest
+from scale_file import detect_format, main, read_chunks, scale_stream
+
+RANGES = ("0", "10", "0", "100", "0", "50")
+
+
+def test_read_chunks():
+    """Test that records are grouped into bounded chunks"""
+    chunks = list(read_chunks(iter(range(7)), chunk_size=3))
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_scale_stream_csv():
+    """Test CSV scaling across several chunks"""
+    source = io.StringIO("id,x,y,z\na,5,,\nb,,,\nc,2.5,,\n")
+    output = io.StringIO()
+    rows = scale_stream(source, output, "csv", RANGES, scale_from="x", chunk_size=2)
+    
+    assert rows == 3
+    assert output.getvalue().splitlines() == [
+        "id,x,y,z",
+        "a,5,50.0,25.0",
+        "b,,,",
+        "c,2.5,25.0,12.5",
+    ]
+
+
+def test_scale_stream_csv_column_mapping():
+    """Test mapped columns and columns added to the header"""
+    source = io.StringIO("depth\n0x19\n")
+    output = io.StringIO()
+    scale_stream(source, output, "csv", RANGES, scale_from="z", z_in_hex=True,
+                 column_names={"z": "depth"})
+    assert output.getvalue().splitlines() == ["depth,x,y", "0x19,5.0,50.0"]
+
+
+def test_scale_stream_ndjson():
+    """Test NDJSON scaling with hex Z output"""
+    source = io.StringIO('{"x": 5}\n{"x": "bad"}\n')
+    output = io.StringIO()
+    scale_stream(source, output, "ndjson", ("0", "10", "0", "100", "0", "10"), scale_from="x", z_in_hex=True)
+    
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert lines[0] == {"x": 5, "y": 50.0, "z": "0x5"}
+    assert lines[1] == {"x": "bad", "y": None, "z": None}
+    
+    with pytest.raises(ValueError, match="must be objects"):
+        scale_stream(io.StringIO('{"x": 5}\n[1, 2]\n'), io.StringIO(), "ndjson", RANGES, scale_from="x")
+
+
+def test_scale_stream_missing_column():
+    """Test that a missing driving column is reported"""
+    with pytest.raises(ValueError):
+        scale_stream(io.StringIO("a,b\n1,2\n"), io.StringIO(), "csv", RANGES, scale_from="x")
+
+
+def test_detect_format():
+    """Test format detection from file extensions"""
+    assert detect_format("points.csv") == "csv"
+    assert detect_format("points.ndjson") == "ndjson"
+    assert detect_format("points.npy") == "npy"
+    assert detect_format("points.bin") == "raw"
+    with pytest.raises(ValueError):
+        detect_format("points.dat")
+
+
+def test_main(tmp_path, capsys):
+    """Test the command-line entry point"""
+    source = tmp_path / "in.csv"
+    target = tmp_path / "out.csv"
+    source.write_text("x,y,z\n5,,\n")
+    
+    assert main([str(source), str(target), "--x1", "0", "--x2", "10", "--y1", "0", "--y2", "100"]) == 0
+    assert target.read_text().splitlines() == ["x,y,z", "5,50.0,"]
+    assert "rows/s" in capsys.readouterr().err
+    
+    assert main([str(tmp_path / "missing.csv"), str(target)]) == 1
+    assert main([str(tmp_path / "missing.npy"), str(tmp_path / "out.npy")]) == 1
+    assert capsys.readouterr().err.startswith("Error: ")
@@ -2,13 +2,26 @@
 Unit tests for scaling logic
 """
 
+import numpy as np
 import pytest
 from scaling_logic import (
     calculate_scaled_value,
     validate_and_convert_input,
     convert_to_hex_if_needed,
     scale_coordinates,
-    validate_range_inputs
+    scale_coordinates_batch,
+    validate_range_inputs,
+    parse_input_array,
+    ScalingTransform,
+    get_scaling_transform,
+    transform_cache_info,
+    clear_transform_cache,
+    parse_hex_array,
+    format_hex_array,
+    PiecewiseLinear,
+    get_piecewise_transform,
+    AffineTransform,
+    compose_affine
 )
 
 
@@ -139,5 +152,224 @@ def test_validate_range_inputs():
         validate_range_inputs("0", "10", "invalid", "100", "0", "50")
 
 
+def test_scale_coordinates_batch_matches_single():
+    """Test that batch scaling matches scale_coordinates point by point"""
+    ranges = dict(x1="0", x2="10", y1="0", y2="100", z1="0", z2="50")
+    inputs = ["0", "2.5", "5", "-3", "12"]
+    result = scale_coordinates_batch(inputs, None, None, scale_from="x", **ranges)
+    
+    for i, value in enumerate(inputs):
+        single = scale_coordinates(value, "", "", scale_from="x", **ranges)
+        assert result["y"][i] == float(single["y"])
+        assert result["z"][i] == float(single["z"])
+    assert result["y_valid"].all() and result["z_valid"].all()
+
+
+def test_scale_coordinates_batch_validity_masks():
+    """Test that invalid inputs and ranges are reported through masks"""
+    result = scale_coordinates_batch(
+        None, ["50", "", "abc", None], None,
+        x1="0", x2="10", y1="0", y2="100", z1="", z2="50",
+        scale_from="y"
+    )
+    assert result["y_valid"].tolist() == [True, False, False, False]
+    assert result["x_valid"].tolist() == [True, False, False, False]
+    assert result["x"][0] == 5.0
+    assert not result["z_valid"].any()  # Z range is incomplete
+
+
+def test_scale_coordinates_batch_hex():
+    """Test hex Z handling in batch scaling"""
+    result = scale_coordinates_batch(
+        [5, 7], None, None,
+        x1="0", x2="10", y1="0", y2="100", z1="0", z2="10",
+        scale_from="x", z_in_hex=True
+    )
+    assert result["z"].tolist() == [5.0, 7.0]
+    
+    result = scale_coordinates_batch(
+        None, None, ["0xA", "19", "GG"],
+        x1="0", x2="10", y1="0", y2="100", z1="0", z2="50",
+        scale_from="z", z_in_hex=True
+    )
+    assert result["z"].tolist() == [10.0, 25.0, 0.0]
+    assert result["x"][:2].tolist() == [2.0, 5.0]
+    assert result["x_valid"].tolist() == [True, True, False]
+
+
+def test_scale_coordinates_batch_errors():
+    """Test batch scaling error handling"""
+    with pytest.raises(ValueError):
+        scale_coordinates_batch(
+            [1], None, None,
+            x1="0", x2="10", y1="0", y2="100", z1="0", z2="50",
+            scale_from="invalid"
+        )
+    
+    with pytest.raises(ValueError):
+        scale_coordinates_batch(
+            None, None, None,
+            x1="0", x2="10", y1="0", y2="100", z1="0", z2="50",
+            scale_from="x"
+        )
+
+
+def test_scaling_transform():
+    """Test precomputed coefficients for every axis-pair direction"""
+    transform = ScalingTransform("0", "10", "0", "100", "", "50")
+    assert transform.coefficients("x", "y") == (10.0, 0.0)
+    assert transform.coefficients("y", "x") == (0.1, 0.0)
+    assert transform.coefficients("x", "z") is None  # Z range is incomplete
+    
+    # Zero-width input range cannot drive scaling
+    transform = ScalingTransform("5", "5", "0", "100", "0", "50")
+    assert transform.coefficients("x", "y") is None
+    assert transform.coefficients("y", "x") == (0.0, 5.0)
+    
+    with pytest.raises(ValueError):
+        ScalingTransform("1.2.3", "10", "0", "100", "0", "50")
+
+
+def test_transform_cache():
+    """Test that repeated range sets are served from the transform cache"""
+    clear_transform_cache()
+    ranges = dict(x1="0", x2="10", y1="0", y2="100", z1="0", z2="50")
+    for value in ("1", "2", "3"):
+        scale_coordinates(value, "", "", scale_from="x", **ranges)
+    
+    info = transform_cache_info()
+    assert info["misses"] == 1
+    assert info["hits"] == 2
+    assert info["size"] == 1
+    
+    # Whitespace differences normalize to the same key
+    assert get_scaling_transform(" 0", "10 ", "0", "100", "0", "50") is get_scaling_transform("0", "10", "0", "100", "0", "50")
+    assert get_scaling_transform("0", "10", "0", "100", "0", "50", True) is not get_scaling_transform("0", "10", "0", "100", "0", "50")
+
+
+def test_scale_many_matches_scale():
+    """Test that the vectorized single-point path gives the same strings as scale"""
+    for transform, scale_from, inputs in (
+        (ScalingTransform("0", "10", "-3", "7.7", "0", "255", z_in_hex=True), "x", ["0.1", "", "-", "1e308", "3", "abc"]),
+        (ScalingTransform("0", "10", "-3", "7.7", "0", "255", z_in_hex=True), "z", ["FF", "0x1a", "zz"]),
+        (get_piecewise_transform({"x": [0, 1, 3], "y": [0, 10, 20]}), "y", ["-5", "15", "nan"]),
+    ):
+        for raw_input, result in zip(inputs, transform.scale_many(inputs, scale_from)):
+            args = [raw_input if axis == scale_from else "" for axis in "xyz"]
+            try:
+                expected = transform.scale(*args, scale_from)
+            except (ValueError, OverflowError) as e:
+                assert type(result) is type(e) and str(result) == str(e)
+            else:
+                assert result == expected
+    
+    with pytest.raises(ValueError):
+        ScalingTransform("0", "1", "0", "1", "", "").scale_many(["1"], "w")
+
+
+def test_parse_hex_array():
+    """Test bulk hex parsing"""
+    values, valid = parse_hex_array(["0xFF", " a ", "ffffffffffffffff", "", "GG", "-5", "1" + "0" * 16, None])
+    assert values.dtype == np.uint64
+    assert valid.tolist() == [True, True, True, False, False, False, False, False]
+    assert [int(v) for v in values[:3]] == [255, 10, 2 ** 64 - 1]
+
+
+def test_bulk_hex_parsing_matches_single_values():
+    """Test that the bulk hex parser accepts exactly what validate_and_convert_input does"""
+    cases = ["ff", "+ff", "-ff", "f_f", "0xf_f", "0x_ff", " 0x_ff", "-0x_f", "_ff", "ff_", "f__f", "0XfF",
+             " ff ", "\u00a0ff", "0x", "0x0xff", "+-ff", "- ff", "-", "", "   ", "GG", "ffffffffffffffff"]
+    expected, expected_valid = [], []
+    for case in cases:
+        try:
+            value = validate_and_convert_input(case, is_hex=True)
+        except ValueError:
+            value = None
+        expected.append(value or 0.0)
+        expected_valid.append(value is not None)
+    
+    values, valid = parse_input_array(cases, is_hex=True)
+    assert valid.tolist() == expected_valid
+    assert values.tolist() == expected
+    magnitudes, valid = parse_hex_array(cases)
+    assert valid.tolist() == [ok and value >= 0 for ok, value in zip(expected_valid, expected)]
+    assert int(magnitudes[cases.index("+ff")]) == int(magnitudes[cases.index("f_f")]) == 255
+
+
+def test_format_hex_array():
+    """Test bulk hex formatting matches hex()"""
+    values = np.array([0, 10, 255, 2 ** 64 - 1], dtype=np.uint64)
+    assert format_hex_array(values).tolist() == [hex(int(v)) for v in values]
+    assert format_hex_array(np.array([-5.5, 5.9])).tolist() == ["-0x5", "0x5"]
+    assert format_hex_array(np.array([1, 2]), valid=np.array([True, False])).tolist() == ["0x1", ""]
+
+
+def test_piecewise_linear():
+    """Test breakpoint curves for single values, arrays, inversion and clamping"""
+    curve = PiecewiseLinear([0, 1, 2, 4], [0, 10, 40, 60])
+    assert curve(0.5) == 5.0
+    assert curve(3) == 50.0
+    assert curve(5) == 70.0  # extrapolated along the last segment
+    assert curve.evaluate([0.5, 1.5, 3, -1]).tolist() == [5.0, 25.0, 50.0, -10.0]
+    assert curve.inverse()(25) == 1.5
+    
+    clamped = PiecewiseLinear([4, 2, 0], [60, 40, 0], extrapolate=False)
+    assert clamped(5) == 60.0
+    assert clamped.evaluate([-1, 1, 5]).tolist() == [0.0, 20.0, 60.0]
+    
+    with pytest.raises(ValueError):
+        PiecewiseLinear([0, 2, 1], [0, 1, 2])
+    with pytest.raises(ValueError):
+        PiecewiseLinear([0, 1, 2], [0, 1, 1]).inverse()
+
+
+def test_piecewise_transform():
+    """Test breakpoint tables through scale_coordinates and scale_batch"""
+    ranges = dict(x1="0", x2="10", y1="0", y2="100", z1="0", z2="50")
+    two_point = {"x": [0, 10], "y": [0, 100], "z": [0, 50]}
+    for value in ("2.5", "7"):
+        assert scale_coordinates(value, "", "", scale_from="x", breakpoints=two_point, **ranges) == \
+            scale_coordinates(value, "", "", scale_from="x", **ranges)
+    
+    transform = get_piecewise_transform({"x": [0, 5, 10], "y": [0, 100, 120], "z": [0, 10, 10]})
+    assert transform.scale("7", "", "", scale_from="x") == {"x": "7", "y": "108.0", "z": "10.0"}
+    # Z is flat over the last segment, so it cannot drive scaling
+    assert transform.scale("", "", "5", scale_from="z") == {"x": "", "y": "", "z": "5"}
+    
+    result = transform.scale_batch(None, [50, 110, None], None, scale_from="y")
+    assert result["x"].tolist() == [2.5, 7.5, 0.0]
+    assert result["x_valid"].tolist() == [True, True, False]
+    
+    with pytest.raises(ValueError):
+        get_piecewise_transform({"x": [0, 1], "y": [0, 1, 2]})
+    with pytest.raises(ValueError):
+        get_piecewise_transform({"w": [0, 1]})
+
+
+def test_affine_transform():
+    """Test that range-set matrices match scale_coordinates and compose into one matrix"""
+    ranges = dict(x1="0", x2="10", y1="0", y2="100", z1="", z2="")
+    transform = get_scaling_transform(*ranges.values())
+    points = np.array([[5.0, np.nan, np.nan], [2.5, 0.0, 0.0]])
+    result = transform.affine("x").apply(points)
+    
+    expected = scale_coordinates("5", "", "", scale_from="x", **ranges)
+    assert result[0, :2].tolist() == [float(expected["x"]), float(expected["y"])]
+    assert np.isnan(result[:, 2]).all()  # Z range is incomplete
+    assert transform.affine("x") is transform.affine("x")  # built once, on first use
+    
+    # sensor -> machine -> display collapses into a single matrix
+    second = get_scaling_transform("0", "100", "0", "1", "0", "2").affine("x")
+    chained = compose_affine(transform.affine("y"), second)
+    assert chained.apply(np.array([[0.0, 50.0, np.nan]])).tolist() == [[5.0, 0.05, 0.1]]
+    
+    scale = AffineTransform(np.diag([2.0, 4.0, 8.0, 1.0]))
+    assert scale.then(scale.inverse()).matrix.tolist() == np.eye(4).tolist()
+    with pytest.raises(ValueError):
+        transform.affine("x").inverse()
+    with pytest.raises(ValueError):
+        AffineTransform(np.ones((4, 4)))
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,101 @@
+"""
+Unit tests for incremental scaling sessions
+"""
+
+from collections import Counter
+
+import pytest
+from scaling_logic import scale_coordinates
+from sessions import SESSION_DEFAULTS, ScalingSession, summarize_counters
+
+RANGES = {"x1": "0", "x2": "10", "y1": "0", "y2": "100", "z1": "0", "z2": "255"}
+
+
+def _stateless(state):
+    return scale_coordinates(
+        state["x_input"], state["y_input"], state["z_input"],
+        state["x1"], state["x2"], state["y1"], state["y2"], state["z1"], state["z2"],
+        scale_from=state["scale_from"], z_in_hex=state["z_in_hex"]
+    )
+
+
+def test_session_matches_scale_coordinates():
+    """Test that every update gives the same result as a stateless calculation"""
+    session = ScalingSession()
+    updates = [
+        dict(RANGES, x_input="5"),
+        {"x_input": "2.5"},
+        {"z_in_hex": True},
+        {"scale_from": "z", "z_input": "FF"},
+        {"z2": "127"},
+        {"scale_from": "y", "y_input": "-40"},
+        {"x1": "10"},
+        {"y_input": ""},
+        {"z_in_hex": False, "scale_from": "x", "x_input": "3"},
+    ]
+    for changes in updates:
+        assert session.update(changes) == _stateless(session.state)
+
+
+def test_session_reuses_unchanged_stages():
+    """Test that only stages depending on changed fields are recomputed"""
+    session = ScalingSession()
+    session.update(dict(RANGES, x_input="5"))
+    assert session.stats["slope_computed"] == 2
+
+    # A new input reuses both slopes and every parsed range
+    session.update({"x_input": "7"})
+    assert session.stats["slope_computed"] == 2
+    assert session.stats["range_computed"] == 3
+    assert session.stats["output_computed"] == 4
+
+    # A new Z range only recomputes the X -> Z slope and the Z output
+    session.update({"z2": "510"})
+    assert session.stats["range_computed"] == 4
+    assert session.stats["slope_computed"] == 3
+    assert session.stats["output_computed"] == 5
+    assert session.stats["output_reused"] == 1
+
+
+def test_session_delta():
+    """Test that update_delta returns only changed coordinates"""
+    counters = Counter()
+    session = ScalingSession(counters=counters)
+    assert session.update_delta(dict(RANGES, x_input="5")) == {"x": "5", "y": "50.0", "z": "127.5"}
+    assert session.update_delta({"z2": "255"}) == {}
+    assert session.update_delta({"x_input": "10"}) == {"x": "10", "y": "100.0", "z": "255.0"}
+    assert counters == session.stats
+    assert counters["fields_sent"] == 6
+    assert counters["fields_skipped"] == 3
+
+
+def test_session_rejected_update():
+    """Test that invalid fields leave the session untouched"""
+    session = ScalingSession()
+    session.update(dict(RANGES, x_input="5"))
+    for changes, message in (
+        ({"bogus": "1"}, "Unknown field: bogus"),
+        ({"x_input": 5}, "Invalid value for x_input"),
+        ({"scale_from": "w", "x_input": "1"}, "scale_from must be 'x', 'y', or 'z'"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            session.update(changes)
+    assert session.state == dict(SESSION_DEFAULTS, **RANGES, x_input="5")
+
+    # Calculation errors keep the new fields, as a stateless request would fail
+    with pytest.raises(ValueError, match="Invalid range values provided"):
+        session.update({"y2": "1-2"})
+    with pytest.raises(ValueError):
+        session.update({"y2": "100", "x_input": "abc"})
+    assert session.update({"x_input": "1"})["y"] == "10.0"
+
+
+def test_summarize_counters():
+    """Test the per-stage summary of session counters"""
+    session = ScalingSession()
+    session.update(dict(RANGES, x_input="5"))
+    session.update({"x_input": "6"})
+    summary = summarize_counters(session.stats)
+    assert summary["updates"] == 2
+    assert summary["slope"] == {"computed": 2, "reused": 2, "reuse_ratio": 0.5}
+    assert summarize_counters(Counter())["output"]["reuse_ratio"] == 0.0
@@ -0,0 +1,40 @@
+"""
+Unit tests for stage timing and the profiler
+"""
+
+import asyncio
+import pytest
+from scaling_logic import scale_coordinates
+from timing import StageTimer, profile_event_loop
+
+
+def test_stage_timer_through_scale_coordinates():
+    """Test that scale_coordinates laps every stage into the header"""
+    timer = StageTimer()
+    scale_coordinates("5", "", "", "0", "10", "0", "100", "0", "50", scale_from="x", timer=timer)
+    assert [name for name, _ in timer.stages] == ["ranges", "input", "math", "format"]
+    
+    header = timer.header()
+    assert header.startswith("ranges;dur=")
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+def test_profile_event_loop():
+    """Test that work on the event loop shows up in the profile"""
+    async def traffic():
+        for _ in range(20):
+            scale_coordinates("5", "", "", "0", "10", "0", "100", "0", "50", scale_from="x")
+            await asyncio.sleep(0.005)
+    
+    async def run():
+        profile, _ = await asyncio.gather(profile_event_loop(0.2, sort="calls", limit=200), traffic())
+        return profile
+    
+    profile = asyncio.run(run())
+    assert profile["total_calls"] > 0
+    assert any("(scale_coordinates)" in row["function"] for row in profile["functions"])
+    
+    with pytest.raises(ValueError):
+        asyncio.run(profile_event_loop(0))
+    with pytest.raises(ValueError):
+        asyncio.run(profile_event_loop(1, sort="name"))
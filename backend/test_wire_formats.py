@@ -0,0 +1,74 @@
+"""
+Unit tests for the binary wire formats
+"""
+
+import numpy as np
+import pytest
+import wire_formats
+from wire_formats import (
+    MEDIA_ARROW,
+    MEDIA_JSON,
+    MEDIA_MSGPACK,
+    decode_batch_request,
+    decode_batch_response,
+    encode_batch_request,
+    encode_batch_response,
+    negotiate,
+    request_media_type,
+)
+
+
+def test_negotiate(monkeypatch):
+    """Test Accept header negotiation with and without the optional packages"""
+    monkeypatch.setattr(wire_formats, "msgpack", object())
+    monkeypatch.setattr(wire_formats, "pa", None)
+    assert negotiate(None) == MEDIA_JSON
+    assert negotiate("*/*", default=MEDIA_MSGPACK) == MEDIA_MSGPACK
+    assert negotiate("application/json;q=0.5, application/x-msgpack") == MEDIA_MSGPACK
+    assert negotiate(f"{MEDIA_ARROW}, application/json;q=0.1") == MEDIA_JSON
+    assert negotiate(MEDIA_ARROW) is None
+    
+    assert request_media_type("application/json; charset=utf-8") == MEDIA_JSON
+    with pytest.raises(ValueError, match="pyarrow"):
+        request_media_type(MEDIA_ARROW)
+    with pytest.raises(ValueError):
+        request_media_type("text/csv")
+
+
+RESULT = {
+    "x": np.array([1.0, 2.0]),
+    "z": np.array([2 ** 63 + 1, 0], dtype=np.uint64),
+    "x_valid": np.array([True, False]),
+}
+
+
+def test_msgpack_round_trip():
+    """Test MessagePack requests and responses keep dtypes and values"""
+    pytest.importorskip("msgpack")
+    body = encode_batch_request({"scale_from": "x", "x1": "0"}, {"x_inputs": np.arange(3.0)}, MEDIA_MSGPACK)
+    fields, inputs = decode_batch_request(body, MEDIA_MSGPACK)
+    assert fields == {"scale_from": "x", "x1": "0"}
+    assert inputs["x_inputs"].tolist() == [0.0, 1.0, 2.0]
+    assert inputs["y_inputs"] is None
+    
+    decoded = decode_batch_response(encode_batch_response(RESULT, MEDIA_MSGPACK), MEDIA_MSGPACK)
+    assert {name: values.tolist() for name, values in decoded.items()} == {name: values.tolist() for name, values in RESULT.items()}
+    assert decoded["z"].dtype == np.uint64
+
+
+def test_arrow_round_trip():
+    """Test Arrow IPC requests and responses keep dtypes and values"""
+    pytest.importorskip("pyarrow")
+    body = encode_batch_request({"scale_from": "z", "z_in_hex": True}, {"z_inputs": ["0x10", None]}, MEDIA_ARROW)
+    fields, inputs = decode_batch_request(body, MEDIA_ARROW)
+    # String columns are left to request validation, like JSON lists
+    assert fields == {"scale_from": "z", "z_in_hex": True, "z_inputs": ["0x10", None]}
+    assert inputs["z_inputs"] is None
+    
+    body = encode_batch_request({"scale_from": "x"}, {"x_inputs": np.array([1, 2], dtype=np.int32)}, MEDIA_ARROW)
+    fields, inputs = decode_batch_request(body, MEDIA_ARROW)
+    assert inputs["x_inputs"].dtype == np.float64 and "x_inputs" not in fields
+    
+    decoded = decode_batch_response(encode_batch_response(RESULT, MEDIA_ARROW), MEDIA_ARROW)
+    assert decoded["z"].dtype == np.uint64
+    assert decoded["z"].tolist() == RESULT["z"].tolist()
@@ -0,0 +1,154 @@
+"""
+Per-stage request timing and on-demand profiling
+Timed requests get a Server-Timing response header with one entry per stage,
+and profile_event_loop runs cProfile over live traffic for a fixed period
+"""
+
+import asyncio
+import time
+
+TIMING_REQUEST_HEADER = b"x-server-timing"
+MAX_PROFILE_SECONDS = 60.0
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+class StageTimer:
+    """
+    Records consecutive named stages of one request.
+
+    Each lap() closes the stage that started at the previous lap (or when
+    the timer was created), so the stages add up to the total time.
+    """
+
+    __slots__ = ('stages', '_start', '_last')
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start: perf_counter() value the first stage starts at (defaults to now)
+        """
+        self._start = self._last = time.perf_counter() if start is None else start
+        self.stages = []
+
+    def lap(self, name):
+        """End the current stage under the given name and start the next one."""
+        now = time.perf_counter()
+        self.stages.append((name, now - self._last))
+        self._last = now
+
+    def header(self):
+        """
+        Format the stages as a Server-Timing header value.
+
+        Returns:
+            str: e.g. "parse;dur=0.210, math;dur=0.004, total;dur=0.250"
+            (durations in milliseconds)
+        """
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={(self._last - self._start) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware adding a Server-Timing header to opted-in requests.
+
+    A request opts in with an "X-Server-Timing: 1" header, or every request
+    does when always is set. The StageTimer is put in the request state as
+    "timer" so handlers can lap their own stages; the time from the last lap
+    until the response starts is recorded as "respond".
+    """
+
+    def __init__(self, app, always=False):
+        self.app = app
+        self.always = always
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.always or _opted_in(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+        scope.setdefault("state", {})["timer"] = timer
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timer.lap("respond")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _opted_in(scope):
+    for name, value in scope["headers"]:
+        if name == TIMING_REQUEST_HEADER:
+            return value.strip() not in (b"", b"0", b"false")
+    return False
+
+
+_profile_lock = asyncio.Lock()
+
+
+async def profile_event_loop(seconds, sort='cumulative', limit=30):
+    """
+    Profile everything the event loop runs for a number of seconds.
+
+    Request handlers run on the event loop thread, so this captures live
+    traffic. Work handed to thread or process pools is not included. Only
+    one profile can run at a time.
+
+    Args:
+        seconds: How long to profile, up to MAX_PROFILE_SECONDS
+        sort: 'cumulative', 'tottime' or 'calls'
+        limit: Number of functions to return
+
+    Returns:
+        dict: seconds, total_calls, total_time and the top functions with
+        their call counts and times
+
+    Raises:
+        ValueError: If the arguments are out of range
+        RuntimeError: If another profile is already running
+    """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ValueError(f"seconds must be between 0 and {MAX_PROFILE_SECONDS:g}")
+    if sort not in PROFILE_SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(PROFILE_SORT_KEYS)}")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    if _profile_lock.locked():
+        raise RuntimeError("A profile is already running")
+
+    # Imported here so the backend does not load the profiler until it is used
+    import cProfile
+    import pstats
+
+    async with _profile_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+
+    stats = pstats.Stats(profiler)
+    sort_index = {'cumulative': 3, 'tottime': 2, 'calls': 1}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][sort_index], reverse=True)
+    return {
+        'seconds': seconds,
+        'total_calls': stats.total_calls,
+        'total_time': stats.total_tt,
+        'functions': [
+            {
+                'function': f"{filename}:{line}({name})",
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'total_time': total_time,
+                'cumulative_time': cumulative_time,
+            }
+            for (filename, line, name), (primitive_calls, calls, total_time, cumulative_time, _) in rows[:limit]
+        ],
+    }
@@ -0,0 +1,295 @@
+"""
+Binary wire formats for bulk scaling
+Batch requests and responses can travel as MessagePack maps holding raw
+little-endian buffers or as Arrow IPC record batches, so numeric columns are
+contiguous buffers that decode without parsing. Both formats are optional and
+only offered when msgpack / pyarrow are installed; they are imported on first
+use, as pyarrow alone would add a large share of the backend's start-up time
+"""
+
+import importlib
+import json
+
+import numpy as np
+
+# Set to the module, or None when it is not installed, on first use
+_NOT_LOADED = object()
+msgpack = _NOT_LOADED
+pa = _NOT_LOADED
+
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+
+# Alternative names clients use for the same formats
+MEDIA_ALIASES = {
+    "application/x-msgpack": MEDIA_MSGPACK,
+    "application/vnd.msgpack": MEDIA_MSGPACK,
+}
+
+INPUT_FIELDS = ('x_inputs', 'y_inputs', 'z_inputs')
+# Schema metadata key holding the non-array request fields of an Arrow request
+ARROW_PARAMS_KEY = b"scaling_request"
+
+
+def _msgpack():
+    global msgpack
+    if msgpack is _NOT_LOADED:
+        msgpack = _import_optional("msgpack")
+    return msgpack
+
+
+def _arrow():
+    global pa
+    if pa is _NOT_LOADED:
+        pa = _import_optional("pyarrow")
+    return pa
+
+
+def _import_optional(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _canonical(media_type):
+    media_type = media_type.split(";")[0].strip().lower()
+    return MEDIA_ALIASES.get(media_type, media_type)
+
+
+def available_media_types():
+    """
+    Get the wire formats usable with the installed packages.
+
+    Returns:
+        list: Media types, JSON first
+    """
+    media_types = [MEDIA_JSON]
+    if _msgpack() is not None:
+        media_types.append(MEDIA_MSGPACK)
+    if _arrow() is not None:
+        media_types.append(MEDIA_ARROW)
+    return media_types
+
+
+def request_media_type(content_type):
+    """
+    Resolve the Content-Type of a batch request.
+
+    Args:
+        content_type: Content-Type header value, or None (treated as JSON)
+
+    Returns:
+        str: MEDIA_JSON, MEDIA_MSGPACK or MEDIA_ARROW
+
+    Raises:
+        ValueError: If the format is unknown or its package is not installed
+    """
+    if not content_type:
+        return MEDIA_JSON
+    media_type = _canonical(content_type)
+    if media_type not in available_media_types():
+        raise ValueError(_unsupported_message(media_type))
+    return media_type
+
+
+def negotiate(accept, default=MEDIA_JSON):
+    """
+    Pick the response format from an Accept header.
+
+    Media types are tried by decreasing q value, then in header order.
+    Wildcards and a missing header select default.
+
+    Returns:
+        str or None: The chosen media type, or None if nothing acceptable
+        is available
+    """
+    if not accept:
+        return default
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *parameters = part.split(";")
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.strip().lower()))
+
+    available = available_media_types()
+    for _, _, media_type in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return default
+        media_type = _canonical(media_type)
+        if media_type in available:
+            return media_type
+    return None
+
+
+def _unsupported_message(media_type):
+    if media_type == MEDIA_MSGPACK:
+        return "MessagePack support requires the msgpack package"
+    if media_type == MEDIA_ARROW:
+        return "Arrow IPC support requires the pyarrow package"
+    return f"Unsupported media type: {media_type}"
+
+
+def decode_batch_request(body, media_type):
+    """
+    Split a binary batch request into its fields and input arrays.
+
+    MessagePack requests are a map with the JSON request fields; each input
+    may be a list or a bytes buffer of little-endian float64 values. Arrow
+    requests are an IPC stream with x_inputs / y_inputs / z_inputs columns
+    and the other fields as JSON in the "scaling_request" schema metadata.
+
+    Only numeric buffers and columns come back as arrays. Every other input
+    value (lists, strings, scalars, Arrow string columns) stays in the
+    fields as plain Python values, so request validation checks it exactly
+    as it checks a JSON body.
+
+    Returns:
+        tuple: (dict of fields, dict of float64 input arrays or None)
+
+    Raises:
+        ValueError: If the body is malformed
+    """
+    if media_type == MEDIA_MSGPACK:
+        msgpack = _msgpack()
+        try:
+            payload = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack body: {e}")
+        if not isinstance(payload, dict):
+            raise ValueError("MessagePack body must be a map")
+        inputs = dict.fromkeys(INPUT_FIELDS)
+        for field in INPUT_FIELDS:
+            value = payload.get(field)
+            if isinstance(value, bytes):
+                if len(value) % 8:
+                    raise ValueError(f"{field} buffer is not a whole number of float64 values")
+                inputs[field] = np.frombuffer(value, dtype="<f8")
+                del payload[field]
+        return payload, inputs
+
+    if media_type == MEDIA_ARROW:
+        pa = _arrow()
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+            params = json.loads((table.schema.metadata or {}).get(ARROW_PARAMS_KEY, b"{}"))
+        except (pa.ArrowException, ValueError) as e:
+            raise ValueError(f"Invalid Arrow IPC body: {e}")
+        if not isinstance(params, dict):
+            raise ValueError("Arrow request metadata must be a JSON object")
+        inputs = dict.fromkeys(INPUT_FIELDS)
+        for field in INPUT_FIELDS:
+            params.pop(field, None)
+            if field not in table.column_names:
+                continue
+            column = table.column(field).combine_chunks()
+            if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+                # Nulls become NaN, which scales to an invalid row like a JSON null
+                inputs[field] = column.to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            else:
+                params[field] = column.to_pylist()
+        return params, inputs
+
+    raise ValueError(_unsupported_message(media_type))
+
+
+def encode_batch_response(result, media_type):
+    """
+    Encode batch scaling arrays in a binary format.
+
+    MessagePack responses are a map with "count", "dtypes" (NumPy dtype
+    string per column) and one bytes buffer per column. Arrow responses are
+    an IPC stream with one record batch. Columns keep their dtype, so exact
+    hex Z stays uint64.
+
+    Args:
+        result: Dict of equal-length arrays (x, y, z and the validity masks)
+        media_type: MEDIA_MSGPACK or MEDIA_ARROW
+
+    Returns:
+        bytes: Encoded response body
+    """
+    columns = {name: np.ascontiguousarray(values) for name, values in result.items()}
+    if media_type == MEDIA_MSGPACK:
+        msgpack = _msgpack()
+        count = len(next(iter(columns.values()))) if columns else 0
+        payload = {'count': count, 'dtypes': {name: values.dtype.str for name, values in columns.items()}}
+        payload.update({name: values.tobytes() for name, values in columns.items()})
+        return msgpack.packb(payload, use_bin_type=True)
+
+    if media_type == MEDIA_ARROW:
+        pa = _arrow()
+        batch = pa.record_batch([pa.array(values) for values in columns.values()], names=list(columns))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    raise ValueError(_unsupported_message(media_type))
+
+
+def decode_batch_response(body, media_type):
+    """
+    Decode a binary batch response into NumPy arrays (client side).
+
+    Numeric MessagePack columns are views on the received buffer, and Arrow
+    float columns without nulls convert without copying.
+
+    Returns:
+        dict: Column name to NumPy array
+    """
+    if media_type == MEDIA_MSGPACK:
+        msgpack = _msgpack()
+        payload = msgpack.unpackb(body, raw=False)
+        return {name: np.frombuffer(payload[name], dtype=dtype) for name, dtype in payload['dtypes'].items()}
+    if media_type == MEDIA_ARROW:
+        pa = _arrow()
+        table = pa.ipc.open_stream(body).read_all()
+        return {
+            name: table.column(name).combine_chunks().to_numpy(zero_copy_only=False)
+            for name in table.column_names
+        }
+    raise ValueError(_unsupported_message(media_type))
+
+
+def encode_batch_request(fields, inputs, media_type):
+    """
+    Encode a batch request in a binary format (client side).
+
+    Args:
+        fields: Non-input request fields (ranges, scale_from, ...)
+        inputs: Dict of input name (x_inputs, ...) to numeric array
+        media_type: MEDIA_MSGPACK or MEDIA_ARROW
+
+    Returns:
+        bytes: Encoded request body
+    """
+    if media_type == MEDIA_MSGPACK:
+        msgpack = _msgpack()
+        payload = dict(fields)
+        for name, values in inputs.items():
+            values = np.asarray(values)
+            payload[name] = values.astype("<f8").tobytes() if values.dtype.kind in "biuf" else values.tolist()
+        return msgpack.packb(payload, use_bin_type=True)
+
+    if media_type == MEDIA_ARROW:
+        pa = _arrow()
+        arrays = [pa.array(np.asarray(values) if not isinstance(values, list) else values) for values in inputs.values()]
+        schema_metadata = {ARROW_PARAMS_KEY: json.dumps(fields).encode("utf-8")}
+        batch = pa.record_batch(arrays, names=list(inputs))
+        batch = batch.replace_schema_metadata(schema_metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    raise ValueError(_unsupported_message(media_type))
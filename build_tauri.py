@@ -35,6 +35,16 @@ def build_frontend():
         print(f"Frontend build failed: {e}")
         return False
 
+def precompile_backend():
+    """Compile the backend to bytecode ahead of time, so the first launch does not pay for it"""
+    print("Precompiling backend...")
+    result = subprocess.run([sys.executable, "-m", "compileall", "-q", "backend"])
+    if result.returncode != 0:
+        print("Backend precompilation failed")
+        return False
+    print("Backend precompiled successfully")
+    return True
+
 def build_tauri_app():
     """Build the Tauri application"""
     print("Building Tauri app...")
@@ -70,6 +80,10 @@ def main():
     if not build_frontend():
         return False
     
+    # Precompile backend
+    if not precompile_backend():
+        return False
+    
     # Build Tauri app
     if not build_tauri_app():
         return False
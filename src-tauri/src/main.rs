@@ -1,22 +1,57 @@
 #![cfg_attr(all(not(debug_assertions), target_os = "windows"), windows_subsystem = "windows")]
 
+use std::io::{BufRead, BufReader};
+use std::process::{Command, Stdio};
+use std::sync::mpsc;
+use std::time::Duration;
+
 use tauri::{Manager, WindowBuilder, WindowUrl};
 
+// Printed by the backend once it accepts connections (READY_LINE in tauri_backend.py)
+const READY_LINE: &str = "SCALING_BACKEND_READY";
+const READY_TIMEOUT: Duration = Duration::from_secs(30);
+
 fn main() {
     tauri::Builder::default()
         .setup(|app| {
+            let (ready_tx, ready_rx) = mpsc::channel();
+
             // Start the Python backend server
-            std::thread::spawn(|| {
-                let backend = std::process::Command::new("python")
+            std::thread::spawn(move || {
+                let mut backend = Command::new("python")
                     .args(&["-m", "backend.tauri_backend"])
                     .current_dir("backend")
+                    .stdout(Stdio::piped())
                     .spawn()
                     .expect("Failed to start backend server");
-                
+
+                // Keep reading stdout after the ready line so the pipe never fills up
+                let stdout = backend.stdout.take().expect("Backend stdout is not piped");
+                let mut ready_tx = Some(ready_tx);
+                for line in BufReader::new(stdout).lines().map_while(Result::ok) {
+                    if line.starts_with(READY_LINE) {
+                        if let Some(tx) = ready_tx.take() {
+                            let _ = tx.send(());
+                        }
+                    }
+                    println!("{}", line);
+                }
+
                 // Wait for the backend process
                 let _ = backend.wait();
             });
 
+            // Open the window once the backend can serve requests
+            match ready_rx.recv_timeout(READY_TIMEOUT) {
+                Ok(()) => {}
+                Err(mpsc::RecvTimeoutError::Timeout) => {
+                    eprintln!("Backend was not ready after {} seconds", READY_TIMEOUT.as_secs())
+                }
+                Err(mpsc::RecvTimeoutError::Disconnected) => {
+                    eprintln!("Backend exited before it was ready")
+                }
+            }
+
             // Create the main window
             let window = WindowBuilder::new(app, "main", WindowUrl::default())
                 .title("Scaling Range")